@@ -0,0 +1,95 @@
+"""Analytics penggunaan command yang di-buffer.
+
+Event dikumpulkan di memori lalu di-flush sekaligus setiap FLUSH_INTERVAL detik
+(atau saat buffer mencapai FLUSH_SIZE): baris mentah ditulis ke analytics.log
+di thread terpisah, dan tabel rollup (per hari, per command, per user) di
+SQLite di-update lewat async_db. analytics.log di-rotate saat melewati
+MAX_LOG_BYTES, jadi ukurannya tidak tumbuh tanpa batas.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import async_db
+
+ANALYTICS_FILE = "analytics.log"
+MAX_LOG_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+FLUSH_INTERVAL = 5.0
+FLUSH_SIZE = 200
+
+
+def _append_raw(path, events):
+    """Tulis event ke file log mentah, rotate kalau sudah kebesaran"""
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(f"{timestamp}|{user_id}|{command}\n" for timestamp, user_id, command in events)
+        size = f.tell()
+
+    if size >= MAX_LOG_BYTES:
+        for i in range(BACKUP_COUNT - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        os.replace(path, f"{path}.1")
+
+
+class Analytics:
+    """Buffer event analytics yang di-flush berkala"""
+
+    def __init__(self, tz, path=ANALYTICS_FILE, flush_interval=FLUSH_INTERVAL, flush_size=FLUSH_SIZE):
+        self.tz = tz
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._buffer = []
+        # Satu thread saja untuk file log: flush berkala, flush karena buffer penuh,
+        # dan close() tidak pernah menulis/rotate analytics.log bersamaan
+        self._file_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics-log")
+        self._full = asyncio.Event()
+        self._task = None
+
+    def record(self, user_id, command_name):
+        """Catat satu event (murah, tanpa I/O)"""
+        timestamp = datetime.now(self.tz).strftime("%Y-%m-%d %H:%M:%S")
+        self._buffer.append((timestamp, user_id, command_name))
+        if len(self._buffer) >= self.flush_size:
+            self._full.set()
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass  # belum ada event loop, di-flush saat close()
+
+    async def flush(self):
+        """Tulis semua event di buffer ke file dan tabel rollup"""
+        events, self._buffer = self._buffer, []
+        if not events:
+            return
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            loop.run_in_executor(self._file_writer, _append_raw, self.path, events),
+            async_db.record_usage(events),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"[ANALYTICS ERROR] {result}")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
@@ -0,0 +1,172 @@
+"""Async facade untuk database.py.
+
+Read dijalankan di thread worker supaya query SQLite tidak memblok event loop.
+Write diantrikan ke satu thread writer yang meng-commit semua write yang sedang
+antri dalam satu transaksi (group commit). Setiap write tetap dapat future
+sendiri, jadi caller bisa `await` hasilnya atau membiarkannya jalan.
+Durasi setiap fungsi (tanpa waktu antri) dicatat ke metrics.DB_SECONDS.
+
+Contoh:
+    rows = await async_db.get_all_schedules()
+    await async_db.add_reminder(user_id, remind_at, "belajar")
+"""
+import asyncio
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+import metrics
+
+# Maksimal write yang digabung dalam satu commit
+WRITE_BATCH_MAX = 64
+READ_WORKERS = 2
+
+_STOP = object()
+_reader = None
+_writer = None
+_start_lock = threading.Lock()
+
+
+class _Writer(threading.Thread):
+    """Thread tunggal yang menjalankan semua write database"""
+
+    def __init__(self):
+        super().__init__(name="db-writer", daemon=True)
+        self.queue = queue.Queue()
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            pending = [item]
+            # Ambil write lain yang sudah antri, tanpa menunggu
+            while len(pending) < WRITE_BATCH_MAX:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                pending.append(item)
+            self._commit(pending)
+
+    def _commit(self, pending):
+        results = []
+        try:
+            with database.batch():
+                for func, args, kwargs, _, _ in pending:
+                    # Tiap write jadi savepoint sendiri, error tidak merusak write lain
+                    try:
+                        with metrics.timed(metrics.DB_SECONDS, func.__name__, "write"):
+                            results.append((True, func(*args, **kwargs)))
+                    except Exception as e:
+                        results.append((False, e))
+        except Exception as e:
+            results = [(False, e)] * len(pending)
+
+        for (_, _, _, loop, future), (ok, value) in zip(pending, results):
+            loop.call_soon_threadsafe(_resolve, future, ok, value)
+
+
+def _resolve(future, ok, value):
+    if future.done():
+        return
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
+
+
+def _ensure_started():
+    global _reader, _writer
+    if _writer is None:
+        with _start_lock:
+            if _writer is None:
+                _reader = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="db-read")
+                _writer = _Writer()
+                _writer.start()
+
+
+def _timed_read(histogram, func, args, kwargs):
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+
+def _read(func):
+    histogram = metrics.DB_SECONDS.labels(func.__name__, "read")
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        _ensure_started()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_reader, _timed_read, histogram, func, args, kwargs)
+
+    return wrapper
+
+
+def _write(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _ensure_started()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        _writer.queue.put((func, args, kwargs, loop, future))
+        return future
+
+    return wrapper
+
+
+async def close():
+    """Selesaikan semua write yang masih antri lalu tutup koneksi"""
+    global _reader, _writer
+    if _writer is None:
+        return
+    writer, reader = _writer, _reader
+    _writer = _reader = None
+    writer.queue.put(_STOP)
+    await asyncio.get_running_loop().run_in_executor(None, writer.join)
+    reader.shutdown(wait=True)
+    database.close_connections()
+
+
+# --- READ ---
+get_schedule_for_day = _read(database.get_schedule_for_day)
+get_due_reminders = _read(database.get_due_reminders)
+get_user_reminders = _read(database.get_user_reminders)
+get_pending_reminders = _read(database.get_pending_reminders)
+get_reminders_by_ids = _read(database.get_reminders_by_ids)
+get_dead_letters = _read(database.get_dead_letters)
+count_dead_letters = _read(database.count_dead_letters)
+get_usage_stats = _read(database.get_usage_stats)
+get_all_schedules = _read(database.get_all_schedules)
+search_schedule_by_subject = _read(database.search_schedule_by_subject)
+get_all_personalities = _read(database.get_all_personalities)
+get_personality = _read(database.get_personality)
+get_user_personality = _read(database.get_user_personality)
+get_sensitive_keywords = _read(database.get_sensitive_keywords)
+
+# --- WRITE (group commit) ---
+add_schedule = _write(database.add_schedule)
+remove_schedule = _write(database.remove_schedule)
+clear_schedule = _write(database.clear_schedule)
+add_reminder = _write(database.add_reminder)
+delete_reminder = _write(database.delete_reminder)
+delete_reminders = _write(database.delete_reminders)
+dead_letter_reminders = _write(database.dead_letter_reminders)
+record_usage = _write(database.record_usage)
+delete_schedule_by_subject = _write(database.delete_schedule_by_subject)
+delete_all_user_reminders = _write(database.delete_all_user_reminders)
+add_personality = _write(database.add_personality)
+seed_personalities = _write(database.seed_personalities)
+set_user_personality = _write(database.set_user_personality)
+add_sensitive_keyword = _write(database.add_sensitive_keyword)
+remove_sensitive_keyword = _write(database.remove_sensitive_keyword)
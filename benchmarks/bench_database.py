@@ -0,0 +1,337 @@
+"""Benchmark skala untuk database.py.
+
+Database sementara diisi data besar (default 100k reminder milik 10k user,
+5k baris jadwal, personality, pilihan personality user, rollup analytics, dead
+letter), lalu setiap fungsi publik database.py dipanggil berulang kali dan
+diukur ops/detik serta latensi p50/p95/p99. SQL yang dijalankan setiap fungsi
+direkam lewat trace callback SQLite dan query plan-nya ditampilkan, jadi
+kelihatan mana yang pakai index dan mana yang full scan.
+
+Fungsi dipanggil langsung (sinkron, tanpa async_db) supaya yang terukur
+murni storage layer. Hasil disimpan sebagai JSON untuk dibandingkan antar commit.
+
+Jalankan dari root repo:
+    python benchmarks/bench_database.py [--reminders 100000] [--users 10000]
+        [--schedules 5000] [--iterations 1000] [--plans] [--compare hasil_lama.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+
+import database  # noqa: E402
+from personalities import DEFAULT_PERSONALITIES, seed_hash  # noqa: E402
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+SUBJECT_WORDS = [
+    "Matematika", "Diskrit", "Basis", "Data", "Algoritma", "Pemrograman", "Sistem", "Informasi",
+    "Manajemen", "Jaringan", "Komputer", "Statistika", "Analisis", "Desain", "Interaksi", "Manusia",
+    "Kecerdasan", "Buatan", "Rekayasa", "Perangkat", "Lunak", "Keamanan", "Etika", "Profesi",
+    "Bahasa", "Inggris", "Indonesia", "Pancasila", "Kewarganegaraan", "Akuntansi", "Bisnis", "Digital",
+]
+# Fungsi infrastruktur (koneksi, migration, helper plan) yang tidak di-benchmark
+INFRA = {
+    "get_connection", "close_connections", "connection_stats", "batch", "schedule_version",
+    "init_db", "schema_version", "migrate", "explain", "check_query_plans",
+}
+
+
+def subject_name(rnd):
+    return " ".join(rnd.sample(SUBJECT_WORDS, rnd.choice((2, 2, 3))))
+
+
+def populate(args, rnd, now):
+    """Isi database dengan data skala besar, return info untuk membuat argumen benchmark"""
+    started = time.perf_counter()
+    personality_rows = [
+        (pid, data["name"], data["description"], data["prompt"], data["emoji"])
+        for pid, data in DEFAULT_PERSONALITIES.items()
+    ]
+    database.seed_personalities(personality_rows, seed_hash(DEFAULT_PERSONALITIES))
+    personality_ids = list(DEFAULT_PERSONALITIES)
+
+    schedule_keys = []
+    with database.batch():
+        for _ in range(args.schedules):
+            day, time_val = rnd.choice(DAYS), f"{rnd.randrange(7, 20):02d}:{rnd.choice((0, 15, 30, 45)):02d}"
+            database.add_schedule(day, time_val, subject_name(rnd))
+            schedule_keys.append((day, time_val))
+
+    reminder_ids = []
+    with database.batch():
+        for i in range(args.reminders):
+            user_id = 10_000 + rnd.randrange(args.users)
+            # ~1% sudah jatuh tempo, sisanya tersebar 30 hari ke depan
+            offset = -rnd.randrange(1, 3600) if rnd.random() < 0.01 else rnd.randrange(60, 30 * 86400)
+            reminder_ids.append(database.add_reminder(user_id, now + offset, f"tugas {i} {subject_name(rnd)}"))
+        for user in range(args.users):
+            if rnd.random() < 0.5:
+                database.set_user_personality(10_000 + user, rnd.choice(personality_ids))
+
+    day = time.strftime("%Y-%m-%d")
+    events = [
+        (f"{day} 10:{i % 60:02d}:00", 10_000 + rnd.randrange(args.users), rnd.choice(("ai_chat", "jadwal", "help", "add_reminder")))
+        for i in range(args.usage_events)
+    ]
+    database.record_usage(events)
+    rnd.shuffle(reminder_ids)
+    return {
+        "reminder_ids": reminder_ids,
+        "schedule_keys": schedule_keys,
+        "personality_ids": personality_ids,
+        "fill_s": time.perf_counter() - started,
+    }
+
+
+def build_cases(args, rnd, now, info):
+    """name -> (fungsi tanpa argumen per iterasi, jumlah iterasi)"""
+    reads, writes = args.iterations, args.write_iterations
+    users = [10_000 + u for u in range(args.users)]
+    ids = iter(info["reminder_ids"])
+    doomed_users = iter(rnd.sample(users, min(len(users), writes)))
+    schedule_keys = iter(rnd.sample(info["schedule_keys"], min(len(info["schedule_keys"]), writes)))
+    search_terms = ["matematika", "basis data", "matdis", "algoritma pemrograman", "jaringan", "sistm informasi", "ai"]
+
+    # Data khusus untuk benchmark yang menghapus, supaya tidak menghabiskan data utama
+    with database.batch():
+        for i in range(writes):
+            database.add_schedule(f"bench{i}", "08:00", f"Kosong {i}")
+            database.add_schedule(f"bench{i}", "10:00", f"Kosong {i}")
+            database.add_schedule("saturday", "21:00", f"Hapusan zq{i:05d}")
+            database.add_sensitive_keyword(f"rahasia{i}", 1)
+
+    counter = iter(range(10 ** 9))
+
+    def n():
+        return next(counter)
+
+    return {
+        # --- jadwal ---
+        "add_schedule": (lambda: database.add_schedule(rnd.choice(DAYS), "07:00", subject_name(rnd)), writes),
+        "get_schedule_for_day": (lambda: database.get_schedule_for_day(rnd.choice(DAYS)), reads),
+        "get_all_schedules": (database.get_all_schedules, max(10, reads // 20)),
+        "search_schedule_by_subject": (lambda: database.search_schedule_by_subject(rnd.choice(search_terms)), reads),
+        "remove_schedule": (lambda: database.remove_schedule(*next(schedule_keys)), writes),
+        "clear_schedule": (lambda: database.clear_schedule(f"bench{n() % writes}"), writes),
+        "delete_schedule_by_subject": (lambda: database.delete_schedule_by_subject(f"zq{n() % writes:05d}"), writes),
+        # --- reminder ---
+        "add_reminder": (lambda: database.add_reminder(rnd.choice(users), now + 3600, "reminder baru"), writes),
+        "get_due_reminders": (database.get_due_reminders, max(10, reads // 10)),
+        "get_pending_reminders": (lambda: database.get_pending_reminders(now + 300, now), reads),
+        "get_reminders_by_ids": (lambda: database.get_reminders_by_ids(rnd.sample(info["reminder_ids"], 20)), reads),
+        "get_user_reminders": (lambda: database.get_user_reminders(rnd.choice(users)), reads),
+        "delete_reminder": (lambda: database.delete_reminder(next(ids)), writes),
+        "delete_reminders": (lambda: database.delete_reminders([next(ids) for _ in range(10)]), writes),
+        "dead_letter_reminders": (lambda: database.dead_letter_reminders([(next(ids), 5, "Forbidden")]), writes),
+        "get_dead_letters": (database.get_dead_letters, reads),
+        "count_dead_letters": (database.count_dead_letters, reads),
+        "delete_all_user_reminders": (lambda: database.delete_all_user_reminders(next(doomed_users)), writes),
+        # --- keyword sensitif ---
+        "get_sensitive_keywords": (database.get_sensitive_keywords, reads),
+        "add_sensitive_keyword": (lambda: database.add_sensitive_keyword(f"kunci{n()}", 1), writes),
+        "remove_sensitive_keyword": (lambda: database.remove_sensitive_keyword(f"rahasia{n() % writes}"), writes),
+        # --- personality ---
+        "add_personality": (lambda: database.add_personality("bench", "Bench", "-", "prompt", "🤖"), writes),
+        "get_all_personalities": (database.get_all_personalities, reads),
+        "seed_personalities": (lambda: database.seed_personalities([], seed_hash(DEFAULT_PERSONALITIES)), writes),
+        "get_personality": (lambda: database.get_personality(rnd.choice(info["personality_ids"])), reads),
+        "set_user_personality": (lambda: database.set_user_personality(rnd.choice(users), "tutor"), writes),
+        "get_user_personality": (lambda: database.get_user_personality(rnd.choice(users)), reads),
+        # --- analytics ---
+        "record_usage": (lambda: database.record_usage(
+            [(time.strftime("%Y-%m-%d %H:%M:%S"), rnd.choice(users), "ai_chat") for _ in range(20)]
+        ), writes),
+        "get_usage_stats": (lambda: database.get_usage_stats(time.strftime("%Y-%m-%d"), rnd.choice(users)), reads),
+    }
+
+
+# Fungsi yang memang membaca seluruh tabel kecil (list/count), SCAN di sini wajar
+EXPECTED_SCANS = {
+    "get_all_schedules", "get_dead_letters", "count_dead_letters", "get_sensitive_keywords",
+    "get_all_personalities", "get_usage_stats",
+}
+
+# Urutan jalan: read dulu (data utuh), lalu write, lalu yang menghapus data
+ORDER_LAST = (
+    "remove_schedule", "clear_schedule", "delete_schedule_by_subject", "delete_reminder",
+    "delete_reminders", "dead_letter_reminders", "delete_all_user_reminders", "remove_sensitive_keyword",
+)
+
+
+def capture_plans(func):
+    """Jalankan func sekali, return [(sql, [detail plan])] untuk statement yang dieksekusi"""
+    conn = database.get_connection()
+    statements = []
+
+    def trace(sql):
+        head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        if head in ("SELECT", "DELETE", "UPDATE", "INSERT", "WITH") and sql not in statements:
+            statements.append(sql)
+
+    conn.set_trace_callback(trace)
+    try:
+        func()
+    finally:
+        conn.set_trace_callback(None)
+    plans = []
+    for sql in statements:
+        try:
+            details = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+        except sqlite3.Error as e:
+            details = [f"(tidak bisa di-explain: {e})"]
+        if details:
+            plans.append((" ".join(sql.split()), details))
+    return plans
+
+
+def is_scan(detail):
+    return detail.startswith("SCAN") and "VIRTUAL TABLE" not in detail
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func, iterations):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_s": iterations / elapsed if elapsed else 0.0,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p95_us": percentile(latencies, 95) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "max_us": latencies[-1] * 1e6 if latencies else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _delta(new, old):
+    return f"{(new - old) / old:+.1%}" if old else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reminders", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--schedules", type=int, default=5_000)
+    parser.add_argument("--usage-events", type=int, default=20_000)
+    parser.add_argument("--iterations", type=int, default=1000, help="iterasi per fungsi read")
+    parser.add_argument("--write-iterations", type=int, default=300, help="iterasi per fungsi write")
+    parser.add_argument("--only", nargs="+", help="hanya fungsi tertentu")
+    parser.add_argument("--plans", action="store_true", help="tampilkan query plan semua fungsi")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="simpan hasil JSON (default benchmarks/results/database_<commit>.json)")
+    parser.add_argument("--compare", help="file JSON hasil sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    output = os.path.abspath(args.output or os.path.join(HERE, "results", f"database_{commit or 'nogit'}.json"))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    workdir = tempfile.mkdtemp(prefix="bench_database_")
+    database.DB_NAME = os.path.join(workdir, "schedule.db")
+    database.init_db()
+    rnd = random.Random(args.seed)
+    now = int(time.time())
+
+    info = populate(args, rnd, now)
+    size_mb = os.path.getsize(database.DB_NAME) / 1e6
+    print(
+        f"Data: {args.reminders} reminder / {args.users} user / {args.schedules} jadwal, "
+        f"diisi dalam {info['fill_s']:.1f} detik ({size_mb:.1f} MB + WAL)"
+    )
+    cases = build_cases(args, rnd, now, info)
+
+    public = {
+        name for name in dir(database)
+        if not name.startswith("_") and callable(getattr(database, name))
+        and getattr(getattr(database, name), "__module__", None) == "database"
+    }
+    missing = sorted(public - INFRA - set(cases))
+    if missing:
+        print(f"⚠️ Fungsi publik tanpa benchmark: {', '.join(missing)}")
+
+    names = [name for name in cases if name not in ORDER_LAST] + [name for name in ORDER_LAST if name in cases]
+    if args.only:
+        names = [name for name in names if name in args.only]
+
+    results = {}
+    print(f"\n{'fungsi':<28}{'ops/s':>10}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}  plan")
+    for name in names:
+        func, iterations = cases[name]
+        plans = capture_plans(func)
+        result = measure(func, max(1, iterations - 1))
+        scans = [detail for _, details in plans for detail in details if is_scan(detail)]
+        result["plans"] = [{"sql": sql, "plan": details} for sql, details in plans]
+        result["full_scans"] = scans
+        results[name] = result
+        flag = ("scan (wajar)" if name in EXPECTED_SCANS else "⚠️ SCAN") if scans else "index"
+        line = (f"{name:<28}{result['ops_per_s']:>10.0f}{result['p50_us']:>10.1f}"
+                f"{result['p95_us']:>10.1f}{result['p99_us']:>10.1f}  {flag}")
+        old = (baseline or {}).get(name)
+        if old:
+            line += f"   ops/s {_delta(result['ops_per_s'], old['ops_per_s'])}, p95 {_delta(result['p95_us'], old['p95_us'])}"
+        print(line)
+
+    print("\nQuery plan:")
+    for name in names:
+        plans = results[name]["plans"]
+        unexpected = results[name]["full_scans"] and name not in EXPECTED_SCANS
+        if not plans or (not args.plans and not unexpected):
+            continue
+        print(f"- {name}")
+        for plan in plans:
+            print(f"    {plan['sql'][:110]}")
+            for detail in plan["plan"]:
+                print(f"      {'⚠️ ' if is_scan(detail) else ''}{detail}")
+
+    report = {
+        "benchmark": "database",
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "db_size_mb": size_mb,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    database.close_connections()
+    print(f"\nHasil disimpan di {output}")
+
+
+if __name__ == "__main__":
+    main()
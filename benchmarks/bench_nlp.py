@@ -0,0 +1,98 @@
+"""Benchmark parser natural language: nlp.py vs parser lama (legacy_nlp.py).
+
+Setiap pesan di nlp_corpus.json diparse dengan urutan yang sama seperti intent
+router (add reminder -> delete reminder -> add jadwal -> delete jadwal); parser
+pertama yang berhasil menentukan intent. Hasilnya dibandingkan dengan
+`intent`/`expected` di korpus, lalu throughput kedua implementasi diukur.
+
+Jalankan dari root repo:
+    python benchmarks/bench_nlp.py [--rounds 200] [--verbose]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import legacy_nlp  # noqa: E402
+import nlp  # noqa: E402
+
+CORPUS_FILE = os.path.join(HERE, "nlp_corpus.json")
+
+
+def classify(parser, text):
+    """Return (intent, hasil) dari parser pertama yang berhasil"""
+    duration, reminder_text = parser.parse_add_reminder_natural(text)
+    if duration and reminder_text:
+        return "add_reminder", [duration, reminder_text]
+    query = parser.parse_delete_reminder_natural(text)
+    if query:
+        return "delete_reminder", query
+    result = parser.parse_add_schedule_natural(text)
+    if result:
+        return "add_schedule", list(result)
+    result = parser.parse_delete_schedule_natural(text)
+    if result:
+        return "delete_schedule", list(result)
+    return "none", None
+
+
+def score(name, parser, corpus, verbose):
+    correct = 0
+    for case in corpus:
+        got = classify(parser, case["text"])
+        if got == (case["intent"], case["expected"]):
+            correct += 1
+        elif verbose:
+            print(f"  [{name}] {case['text']!r}: {got} != {(case['intent'], case['expected'])}")
+    print(f"{name:<8} benar {correct}/{len(corpus)} ({correct / len(corpus):.0%})")
+    return correct
+
+
+def bench(name, parser, texts, rounds):
+    # Cache extract() dikosongkan tiap putaran: setiap pesan tetap di-scan sekali,
+    # yang dihemat hanya scan ulang antar parse_*_natural() untuk pesan yang sama
+    clear_cache = getattr(getattr(parser, "extract", None), "cache_clear", lambda: None)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        clear_cache()
+        for text in texts:
+            classify(parser, text)
+    elapsed = time.perf_counter() - start
+    total = rounds * len(texts)
+    print(f"{name:<8} {total / elapsed:>10,.0f} pesan/s  ({elapsed * 1e6 / total:.1f} µs/pesan)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--verbose", action="store_true", help="tampilkan kasus yang salah")
+    args = parser.parse_args()
+
+    with open(CORPUS_FILE, encoding="utf-8") as f:
+        corpus = json.load(f)
+    texts = [case["text"] for case in corpus]
+
+    print(f"Korpus: {len(corpus)} pesan\n\nKebenaran:")
+    score("legacy", legacy_nlp, corpus, args.verbose)
+    correct = score("nlp", nlp, corpus, args.verbose)
+
+    print("\nThroughput (klasifikasi lengkap per pesan):")
+    bench("legacy", legacy_nlp, texts, args.rounds)
+    bench("nlp", nlp, texts, args.rounds)
+
+    extract = nlp.extract.__wrapped__   # tanpa cache
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for text in texts:
+            extract(text)
+    elapsed = time.perf_counter() - start
+    print(f"{'extract':<8} {args.rounds * len(texts) / elapsed:>10,.0f} pesan/s  (satu scan, semua field)")
+    sys.exit(0 if correct == len(corpus) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Benchmark offline pipeline on_message (tanpa gateway Discord dan API key Groq).
+
+Handler on_message asli dijalankan dengan Message/channel/author palsu dan
+client Groq tiruan yang latensinya bisa diatur. Database SQLite dan
+analytics.log dibuat di folder sementara. Per intent diukur pesan per detik
+dan latensi p50/p95/p99 (dari pesan masuk sampai handler selesai, termasuk
+semua reply/edit ke Discord palsu), lalu hasilnya disimpan sebagai JSON
+supaya bisa dibandingkan antar commit.
+
+Jalankan dari root repo (butuh dependency bot terpasang):
+    python benchmarks/bench_on_message.py [--messages 200] [--concurrency 8]
+        [--groq-latency 0.3] [--output hasil.json] [--compare hasil_lama.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+
+BOT_ID = 424242
+CHANNEL_ID = 1471130420857933937   # salah satu GROQ_ALLOWED_CHANNELS
+
+# intent -> (nama route di intent_router, template pesan; {i} = nomor pesan)
+SCENARIOS = {
+    "reminder_natural": ("add_reminder_natural", [
+        "ingatkan aku dalam {n} menit untuk belajar basis data",
+        "reminder dalam {n} jam untuk kumpul tugas {i}",
+        "ingat {n} menit lagi submit laporan",
+    ]),
+    "jadwal": ("schedule_query", [
+        "jadwal senin",
+        "jadwal matdis",
+        "jadwal basis data",
+    ]),
+    "help": ("help", [
+        "help",
+        "kamu bisa apa aja?",
+    ]),
+    "time": ("time", [
+        "sekarang jam berapa?",
+        "jam berapa sekarang",
+    ]),
+    "ai": ("ai_chat", [
+        "apa itu normalisasi database? ({i})",
+        "jelasin bedanya primary key sama foreign key dong ({i})",
+        "tips belajar algoritma buat pemula ({i})",
+    ]),
+}
+
+SEED_SCHEDULE = [
+    ("monday", "08:00", "Matematika Diskrit"),
+    ("monday", "10:00", "Basis Data"),
+    ("tuesday", "13:00", "Algoritma dan Pemrograman"),
+    ("wednesday", "09:00", "Sistem Informasi Manajemen"),
+]
+
+
+# --- Discord palsu ---
+
+class FakeUser:
+    def __init__(self, user_id, name, is_bot=False):
+        self.id = user_id
+        self.name = name
+        self.bot = is_bot
+        self.guild_permissions = SimpleNamespace(administrator=False)
+
+    def mentioned_in(self, message):
+        return f"<@{self.id}>" in message.content or f"<@!{self.id}>" in message.content
+
+    def __str__(self):
+        return self.name
+
+
+class FakeSentMessage:
+    def __init__(self, channel, content):
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, content=None, **kwargs):
+        self.channel.edits += 1
+        self.content = content
+
+    async def delete(self):
+        pass
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = 0
+        self.edits = 0
+
+    def typing(self):
+        return _Typing()
+
+    async def fetch_message(self, message_id):
+        raise LookupError(message_id)
+
+
+class FakeMessage:
+    def __init__(self, author, channel, content):
+        self.author = author
+        self.channel = channel
+        self.content = content
+        self.reference = None
+        self.guild = None
+        self.replies = []
+
+    async def reply(self, content=None, **kwargs):
+        self.channel.sent += 1
+        sent = FakeSentMessage(self.channel, content)
+        self.replies.append(sent)
+        return sent
+
+
+# --- Groq palsu ---
+
+class FakeGroq:
+    """Client Groq tiruan: `latency` detik sampai token pertama, lalu `chunks` potong teks"""
+
+    def __init__(self, latency, chunks=20, chunk_delay=0.005):
+        self.latency = latency
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def _usage(self, messages):
+        prompt = sum(len(m["content"]) for m in messages) // 4
+        return SimpleNamespace(prompt_tokens=prompt, completion_tokens=self.chunks * 2,
+                               total_tokens=prompt + self.chunks * 2)
+
+    async def create(self, messages, stream=False, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if not stream:
+            text = " ".join(f"kata{i:03d}" for i in range(self.chunks))
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+                usage=self._usage(messages),
+            )
+        return self._stream(messages)
+
+    async def _stream(self, messages):
+        for i in range(self.chunks):
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=f"kata{i:03d} "))])
+        yield SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=self._usage(messages)))
+
+
+def install_bot_user(client, user):
+    """Set bot.user tanpa login (py-cord menyimpannya di ConnectionState)"""
+    state = getattr(client, "_connection", None)
+    if state is not None:
+        state.user = user
+    else:
+        client.user = user
+
+
+def load_bot(workdir, args):
+    """Import bot.py dengan database dan analytics.log di `workdir`"""
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.chdir(workdir)
+    import database
+    database.DB_NAME = os.path.join(workdir, "schedule.db")
+    import bot
+    from rate_limit import RateLimiter
+
+    install_bot_user(bot.bot, FakeUser(BOT_ID, "IS 1 Assistant", is_bot=True))
+    bot.client = FakeGroq(args.groq_latency, chunk_delay=args.chunk_delay)
+    bot.GROQ_STREAMING = not args.no_stream
+    bot.GROQ_STREAM_EDIT_INTERVAL = args.edit_interval
+    # Yang diukur pipeline-nya, bukan rate limit / kuota
+    unlimited = 10 ** 9
+    bot.rate_limiter = RateLimiter(
+        user_rate=unlimited, user_burst=unlimited,
+        channel_rate=unlimited, channel_burst=unlimited,
+        global_rate=unlimited, global_burst=unlimited,
+    )
+    bot.groq_scheduler.max_queue = unlimited
+    bot.groq_scheduler.max_wait = float("inf")
+    for day, time_val, subject in SEED_SCHEDULE:
+        database.add_schedule(day, time_val, subject)
+    return bot
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_scenario(bot, name, route, templates, args):
+    channel = FakeChannel(CHANNEL_ID)
+    users = [FakeUser(100000 + i, f"user{i}") for i in range(args.users)]
+    hits_before = bot.intent_router.hits[route]
+    groq_before = bot.client.calls
+    sent_before = channel.sent
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        nonlocal errors
+        text = templates[i % len(templates)].format(i=i, n=1 + i % 50)
+        message = FakeMessage(users[i % len(users)], channel, f"<@{BOT_ID}> {text}")
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await bot.on_message(message)
+            except Exception as e:
+                errors += 1
+                print(f"[BENCH] {name}: {type(e).__name__}: {e}", file=sys.stderr)
+            latencies.append(time.perf_counter() - started)
+        if any(reply.content and reply.content.startswith("❌") for reply in message.replies):
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.messages)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    routed = bot.intent_router.hits[route] - hits_before
+    return {
+        "route": route,
+        "messages": args.messages,
+        "routed": routed,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "msgs_per_s": args.messages / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "groq_calls": bot.client.calls - groq_before,
+        "discord_sends": channel.sent - sent_before,
+        "discord_edits": channel.edits,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    print(f"{'intent':<18}{'msg/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'routed':>8}{'err':>5}")
+    for name, r in results.items():
+        line = (f"{name:<18}{r['msgs_per_s']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+                f"{r['p99_ms']:>10.2f}{r['routed']:>8}{r['errors']:>5}")
+        old = (baseline or {}).get(name)
+        if old:
+            line += f"   msg/s {_delta(r['msgs_per_s'], old['msgs_per_s'])}, p95 {_delta(r['p95_ms'], old['p95_ms'])}"
+        print(line)
+
+
+def _delta(new, old):
+    return f"{(new - old) / old:+.1%}" if old else "n/a"
+
+
+async def main_async(args):
+    workdir = tempfile.mkdtemp(prefix="bench_on_message_")
+    bot = load_bot(workdir, args)
+    names = args.only or list(SCENARIOS)
+    results = {}
+    try:
+        # Log [LOG]/[AI] bot per pesan disembunyikan kecuali --verbose
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            for name in names:
+                route, templates = SCENARIOS[name]
+                results[name] = await run_scenario(bot, name, route, templates, args)
+    finally:
+        await bot.usage_analytics.close()
+        await bot.log_sink.close()
+        import async_db
+        await async_db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200, help="pesan per intent")
+    parser.add_argument("--concurrency", type=int, default=8, help="pesan yang diproses bersamaan")
+    parser.add_argument("--users", type=int, default=50, help="jumlah user palsu yang bergantian")
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="detik sampai token pertama Groq")
+    parser.add_argument("--chunk-delay", type=float, default=0.005, help="detik antar chunk streaming")
+    parser.add_argument("--edit-interval", type=float, default=1.2, help="GROQ_STREAM_EDIT_INTERVAL")
+    parser.add_argument("--no-stream", action="store_true", help="pakai completion non-streaming")
+    parser.add_argument("--verbose", action="store_true", help="tampilkan log bot per pesan")
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), help="hanya intent tertentu")
+    parser.add_argument("--output", help="simpan hasil JSON (default benchmarks/results/on_message_<commit>.json)")
+    parser.add_argument("--compare", help="file JSON hasil sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+    # load_bot() pindah ke folder sementara, jadi path relatif di-resolve dulu
+    commit = git_commit()
+    output = os.path.abspath(args.output or os.path.join(HERE, "results", f"on_message_{commit or 'nogit'}.json"))
+    compare = os.path.abspath(args.compare) if args.compare else None
+
+    results = asyncio.run(main_async(args))
+    baseline = None
+    if compare:
+        with open(compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+
+    report = {
+        "benchmark": "on_message",
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan di {output}")
+
+
+if __name__ == "__main__":
+    main()
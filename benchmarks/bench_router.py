@@ -0,0 +1,130 @@
+"""Micro-benchmark routing intent on_message.
+
+Membandingkan IntentRouter (regex gabungan, satu pass) dengan if-chain lama
+(re.match/re.search satu per satu + parser di legacy_nlp.py) di korpus pesan
+yang sama, dan memastikan router memilih intent yang benar. Handler tidak
+dijalankan, yang diukur hanya pemilihan intent.
+
+Jalankan dari root repo (butuh dependency bot terpasang):
+    python benchmarks/bench_router.py [--rounds 2000]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bot  # noqa: E402
+import legacy_nlp  # noqa: E402
+import nlp  # noqa: E402
+
+CORPUS = [
+    ("ingatkan aku dalam 5 menit untuk belajar", "add_reminder_natural"),
+    ("reminder dalam 2 jam untuk makan siang", "add_reminder_natural"),
+    ("hapus reminder belajar", "delete_reminder_natural"),
+    ("hapus semua reminder", "delete_reminder_natural"),
+    ("tambahkan jadwal senin jam 08:00 kuliah AI", "add_schedule_natural"),
+    ("tambah jadwal Rabu 14:00 Pemrograman Web", "add_schedule_natural"),
+    ("hapus jadwal senin 08:00", "delete_schedule_natural"),
+    ("tambah jadwal Besok 10:00 Basis Data", "add_schedule"),
+    ("jadwal semua", "schedule_week"),
+    ("jadwal Senin", "schedule_query"),
+    ("jadwal matdis", "schedule_query"),
+    ("jadwal", "schedule_today"),
+    ("cek jadwal", "schedule_today"),
+    ("hapus jadwal Statistika", "delete_schedule"),
+    ("lihat reminder", "list_reminders"),
+    ("daftar reminder", "list_reminders"),
+    ("hapus reminder", "delete_reminders"),
+    ("sekarang jam berapa?", "time"),
+    ("help", "help"),
+    ("kamu bisa apa aja?", "help"),
+    ("apa itu ERD?", "ai_chat"),
+    ("jelasin normalisasi database dong", "ai_chat"),
+    ("makasih ya bot, kamu keren banget", "ai_chat"),
+    ("ingat gak tugas kemarin dikumpul kapan", "ai_chat"),
+    ("bedanya primary key sama foreign key apa sih", "ai_chat"),
+]
+
+
+def legacy_route(text):
+    """If-chain + parser lama dari on_message (hanya bagian pemilihan intent)"""
+    duration, reminder_text = legacy_nlp.parse_add_reminder_natural(text)
+    if duration and reminder_text:
+        return "add_reminder_natural"
+    if legacy_nlp.parse_delete_reminder_natural(text):
+        return "delete_reminder_natural"
+    if legacy_nlp.parse_add_schedule_natural(text):
+        return "add_schedule_natural"
+    if legacy_nlp.parse_delete_schedule_natural(text):
+        return "delete_schedule_natural"
+    if re.match(r"(?i)^(tambah|add)\s+jadwal\s+(\w+)\s+(\d{1,2}:\d{2})\s+(.+)$", text):
+        return "add_schedule"
+    if re.match(r"(?i)^(lihat|cek)?\s*jadwal\s+(semua|keseluruhan|lengkap)$", text):
+        return "schedule_week"
+    if re.match(r"(?i)^jadwal\s+(.+)$", text):
+        return "schedule_query"
+    if re.match(r"(?i)^(lihat|cek)?\s*jadwal$", text):
+        return "schedule_today"
+    if re.match(r"(?i)^(hapus|delete|remove)\s+jadwal\s+(.+)$", text):
+        return "delete_schedule"
+    if re.match(r"(?i)^(tambah|add|buat|pasang)\s+reminder\s+(\S+)\s+(.+)$", text) or \
+            re.match(r"(?i)^ingatkan\s+(\S+)\s+(.+)$", text):
+        return "add_reminder"
+    if re.match(r"(?i)^(lihat|cek)\s+reminder(s)?(\s+saya)?$", text) or \
+            text.lower() in {"reminder saya", "daftar reminder", "list reminder"}:
+        return "list_reminders"
+    if re.match(r"(?i)^(hapus|delete|clear)\s+(semua\s+)?reminder(s)?$", text):
+        return "delete_reminders"
+    if re.search(r"\b(jam|pukul|waktu|time)\b", text, re.IGNORECASE):
+        return "time"
+    if re.match(r"(?i)^(help|bantuan|perintah|command)(\s+(apa|yang|tersedia))?(\s+saja)?$", text) or \
+            "bisa apa" in text.lower() or "command apa" in text.lower():
+        return "help"
+    return "ai_chat"
+
+
+def router_route(text):
+    route, _ = bot.intent_router.resolve(text)
+    return route.name if route else "ai_chat"
+
+
+def bench(name, func, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        nlp.extract.cache_clear()   # tiap putaran dihitung sebagai pesan baru
+        for text in messages:
+            func(text)
+    elapsed = time.perf_counter() - start
+    total = rounds * len(messages)
+    print(f"{name:<14} {total / elapsed:>12,.0f} msg/s  ({elapsed * 1e6 / total:.2f} µs/msg)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for text, expected in CORPUS:
+        got = router_route(text)
+        if got != expected:
+            mismatches += 1
+            print(f"[MISMATCH] {text!r}: router={got} expected={expected} legacy={legacy_route(text)}")
+    print(f"Korpus: {len(CORPUS)} pesan, {mismatches} tidak sesuai\n")
+
+    messages = [text for text, _ in CORPUS]
+    ai_messages = [text for text, expected in CORPUS if expected == "ai_chat"]
+    print("Semua pesan:")
+    bench("legacy chain", legacy_route, messages, args.rounds)
+    bench("IntentRouter", router_route, messages, args.rounds)
+    print("\nPesan AI saja (tidak cocok intent apa pun):")
+    bench("legacy chain", legacy_route, ai_messages, args.rounds)
+    bench("IntentRouter", router_route, ai_messages, args.rounds)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
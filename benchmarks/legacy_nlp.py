@@ -0,0 +1,196 @@
+"""Salinan parser natural language lama dari bot.py (sebelum nlp.py).
+
+Hanya dipakai benchmark sebagai pembanding (bench_nlp.py, bench_router.py);
+jangan diimport dari kode bot.
+"""
+import re
+
+
+def parse_duration_to_seconds(text):
+    total_seconds = 0
+    matches = re.findall(r"(\d+)\s*([dhms])", text.lower())
+    for value, unit in matches:
+        value_int = int(value)
+        if unit == "d":
+            total_seconds += value_int * 86400
+        elif unit == "h":
+            total_seconds += value_int * 3600
+        elif unit == "m":
+            total_seconds += value_int * 60
+        elif unit == "s":
+            total_seconds += value_int
+    return total_seconds
+
+
+def extract_duration_from_text(text):
+    """Extract durasi dari text seperti 'dalam 5 menit', 'dalam 2 jam', dll
+    Return: (duration_seconds, cleaned_text)
+    """
+    # Pattern: "dalam X [menit|jam|hari|detik]"
+    duration_match = re.search(r"dalam\s+(\d+)\s*(menit|jam|hari|detik|m|h|d|s)", text, re.IGNORECASE)
+    if duration_match:
+        value = int(duration_match.group(1))
+        unit = duration_match.group(2).lower()
+        
+        if unit in ["menit", "m"]:
+            seconds = value * 60
+        elif unit in ["jam", "h"]:
+            seconds = value * 3600
+        elif unit in ["hari", "d"]:
+            seconds = value * 86400
+        elif unit in ["detik", "s"]:
+            seconds = value
+        else:
+            seconds = value * 60  # Default menit
+        
+        # Remove duration part dan keywords dari text
+        cleaned = re.sub(r"dalam\s+\d+\s*(menit|jam|hari|detik|m|h|d|s)", "", text, flags=re.IGNORECASE).strip()
+        # Remove connector words: untuk, untuk apa, apa, dsb
+        cleaned = re.sub(r"^(untuk|apa|untuk apa|apa)\s*", "", cleaned, flags=re.IGNORECASE).strip()
+        # Clean up multiple spaces
+        cleaned = re.sub(r"\s+", " ", cleaned).strip()
+        
+        return seconds, cleaned
+    
+    return None, text
+
+
+def extract_day_from_text(text):
+    """Extract nama hari dari text
+    Return: (day_eng, day_indo) atau (None, None) jika tidak ditemukan
+    """
+    day_patterns = [
+        (r"\b(senin|monday|mon)\b", "monday", "Senin"),
+        (r"\b(selasa|tuesday|tue)\b", "tuesday", "Selasa"),
+        (r"\b(rabu|wednesday|wed)\b", "wednesday", "Rabu"),
+        (r"\b(kamis|thursday|thu)\b", "thursday", "Kamis"),
+        (r"\b(jumat|friday|fri)\b", "friday", "Jumat"),
+        (r"\b(sabtu|saturday|sat)\b", "saturday", "Sabtu"),
+        (r"\b(minggu|sunday|sun)\b", "sunday", "Minggu"),
+    ]
+    
+    for pattern, day_eng, day_indo in day_patterns:
+        if re.search(pattern, text, re.IGNORECASE):
+            return day_eng, day_indo
+    
+    return None, None
+
+
+def extract_time_from_text(text):
+    """Extract waktu (HH:MM) dari text seperti 'jam 08:00', 'pukul 10:30', dll
+    Return: waktu string (HH:MM) atau None
+    """
+    # Pattern: "jam/pukul HH:MM" atau langsung "HH:MM"
+    time_match = re.search(r"(?:jam|pukul)?\s*(\d{1,2}):(\d{2})", text, re.IGNORECASE)
+    if time_match:
+        hour = int(time_match.group(1))
+        minute = int(time_match.group(2))
+        
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return f"{hour:02d}:{minute:02d}"
+    
+    return None
+
+
+def parse_add_reminder_natural(text):
+    """Parse natural language: 'ingatkan/reminder dalam 5 menit untuk [teks]'
+    Return: (duration_seconds, reminder_text) atau (None, None) jika parse gagal
+    
+    Examples:
+    - "ingatkan aku dalam 5 menit untuk belajar"
+    - "reminder dalam 2 jam untuk makan siang"
+    - "ingat dalam 30 detik submit tugas"
+    """
+    # Cek pattern: ingatkan/reminder + durasi + teks
+    if not re.search(r"\b(ingatkan|reminder|remind|ingat|ingetin)\b", text, re.IGNORECASE):
+        return None, None
+    
+    # Remove trigger word
+    text_clean = re.sub(r"\b(ingatkan|reminder|remind|ingat|ingetin)\b\s*", "", text, flags=re.IGNORECASE).strip()
+    
+    # Extract durasi
+    duration_seconds, reminder_text = extract_duration_from_text(text_clean)
+    
+    # Jika reminder text kosong atau hanya whitespace, parse gagal
+    if duration_seconds and reminder_text and len(reminder_text.strip()) > 0:
+        return duration_seconds, reminder_text.strip()
+    
+    return None, None
+
+
+def parse_add_schedule_natural(text):
+    """Parse natural language: 'tambah/tambahkan jadwal [hari] [jam] [subject]'
+    Return: (day_eng, day_indo, time, subject) atau None jika parse gagal
+    """
+    # Cek pattern: tambah/tambahkan jadwal
+    if not re.search(r"\b(tambah|tambahkan|add)\b.*\b(jadwal|schedule)\b", text, re.IGNORECASE):
+        return None
+    
+    # Remove trigger words
+    text_clean = re.sub(r"(tambah|tambahkan|add)\s+(jadwal|schedule)\s*", "", text, flags=re.IGNORECASE).strip()
+    
+    # Extract hari
+    day_eng, day_indo = extract_day_from_text(text_clean)
+    if not day_eng:
+        return None
+    
+    # Extract waktu
+    time_val = extract_time_from_text(text_clean)
+    if not time_val:
+        return None
+    
+    # Remove day dan time dari text untuk get subject
+    subject = re.sub(r"\b(senin|selasa|rabu|kamis|jumat|sabtu|minggu|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", "", text_clean, flags=re.IGNORECASE).strip()
+    subject = re.sub(r"(?:jam|pukul)?\s*\d{1,2}:\d{2}", "", subject).strip()
+    
+    if not subject:
+        return None
+    
+    return day_eng, day_indo, time_val, subject
+
+
+def parse_delete_schedule_natural(text):
+    """Parse natural language: 'hapus jadwal [hari] [jam]'
+    Return: (day_eng, day_indo, time) atau None jika parse gagal
+    """
+    # Cek pattern: hapus jadwal
+    if not re.search(r"\b(hapus|delete|remove)\b.*\b(jadwal|schedule)\b", text, re.IGNORECASE):
+        return None
+    
+    # Extract hari
+    day_eng, day_indo = extract_day_from_text(text)
+    if not day_eng:
+        return None
+    
+    # Extract waktu
+    time_val = extract_time_from_text(text)
+    if not time_val:
+        return None
+    
+    return day_eng, day_indo, time_val
+
+
+def parse_delete_reminder_natural(text):
+    """Parse natural language: 'hapus reminder [teks/terbaru]' atau 'clear reminder', etc
+    Return: reminder_text atau 'latest' atau 'all' atau None jika parse gagal
+    """
+    # Cek pattern: hapus reminder, delete reminder, clear reminder
+    if not re.search(r"\b(hapus|delete|remove|clear)\b.*\b(reminder|reminders)\b", text, re.IGNORECASE):
+        return None
+    
+    # Remove trigger words
+    text_clean = re.sub(r"(hapus|delete|remove|clear)\s+(semua\s+)?(reminder|reminders)\s*", "", text, flags=re.IGNORECASE).strip()
+    
+    # Cek untuk "semua" / "all" SEBELUM remove dari text
+    if re.search(r"\b(semua|all)\b", text, re.IGNORECASE):
+        return "all"
+    
+    # Cek untuk "terbaru" / "latest"
+    if re.search(r"\b(terbaru|latest|terakhir)\b", text_clean, re.IGNORECASE):
+        return "latest"
+    
+    # Jika ada sisa text, gunakan sebagai search text
+    if text_clean:
+        return text_clean
+    
+    return None
@@ -20,12 +20,32 @@ else:
 
 from datetime import datetime, timezone, timedelta
 import os
-import re
 import time
 
+import async_db
 import database
+import metrics
+import reminders
+from analytics import Analytics
+from chat_context import build_chat_context, estimate_prompt_tokens, estimate_tokens
+from conversation import ConversationStore
+from llm_cache import ResponseCache, data_version
+from groq_scheduler import GroqScheduler, Overloaded
+from log_sink import LogSink
+from nlp import (
+    parse_add_reminder_natural,
+    parse_add_schedule_natural,
+    parse_delete_reminder_natural,
+    parse_delete_schedule_natural,
+    parse_duration_to_seconds,
+)
+from personalities import PersonalityRegistry
+from rate_limit import RateLimiter
+from router import IntentRouter
+from schedule_cache import ENG_TO_INDO, INDO_TO_ENG, ScheduleCache
+from sensitive import SensitiveFilter
 import discord
-from groq import Groq
+from groq import AsyncGroq, RateLimitError
 from discord import ui
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
@@ -58,9 +78,60 @@ GROQ_SYSTEM_PROMPT = os.getenv(
 )
 GROQ_TEMPERATURE = float(os.getenv("GROQ_TEMPERATURE", "0.7"))
 GROQ_MAX_TOKENS = int(os.getenv("GROQ_MAX_TOKENS", "800"))
-
-# Inisialisasi client di luar loop agar lebih efisien
-client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+# Batas completion yang boleh jalan bersamaan + timeout per request (detik)
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "4"))
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+# Load shedding: tolak ("lagi rame") kalau antrian Groq sepanjang ini / estimasi tunggu lewat dari ini (detik)
+GROQ_MAX_QUEUE = int(os.getenv("GROQ_MAX_QUEUE", "50"))
+GROQ_MAX_WAIT = float(os.getenv("GROQ_MAX_WAIT", "20"))
+# Streaming: kirim placeholder lalu edit bertahap saat token masuk
+GROQ_STREAMING = os.getenv("GROQ_STREAMING", "1") != "0"
+GROQ_STREAM_EDIT_INTERVAL = float(os.getenv("GROQ_STREAM_EDIT_INTERVAL", "1.2"))
+DISCORD_MESSAGE_LIMIT = 2000
+# Batas token untuk blok [DATA DARI DATABASE] (jadwal relevan + reminder)
+GROQ_CONTEXT_TOKEN_BUDGET = int(os.getenv("GROQ_CONTEXT_TOKEN_BUDGET", "600"))
+# Cache jawaban AI untuk pertanyaan yang sama (detik, 0 = tidak disimpan)
+GROQ_CACHE_TTL = float(os.getenv("GROQ_CACHE_TTL", "300"))
+GROQ_CACHE_SIZE = int(os.getenv("GROQ_CACHE_SIZE", "512"))
+# Riwayat obrolan AI per user per channel: jumlah giliran, batas token di prompt, idle (detik), jumlah percakapan
+GROQ_HISTORY_TURNS = int(os.getenv("GROQ_HISTORY_TURNS", "6"))
+GROQ_HISTORY_TOKEN_BUDGET = int(os.getenv("GROQ_HISTORY_TOKEN_BUDGET", "800"))
+GROQ_HISTORY_TTL = float(os.getenv("GROQ_HISTORY_TTL", "1800"))
+GROQ_HISTORY_MAX = int(os.getenv("GROQ_HISTORY_MAX", "2000"))
+# Rate limit AI chat (request per menit + burst) dan budget token Groq harian per user (0 = tanpa batas)
+AI_USER_RATE = float(os.getenv("AI_USER_RATE", "20"))
+AI_USER_BURST = int(os.getenv("AI_USER_BURST", "3"))
+AI_CHANNEL_RATE = float(os.getenv("AI_CHANNEL_RATE", "60"))
+AI_CHANNEL_BURST = int(os.getenv("AI_CHANNEL_BURST", "10"))
+AI_GLOBAL_RATE = float(os.getenv("AI_GLOBAL_RATE", "30"))
+AI_GLOBAL_BURST = int(os.getenv("AI_GLOBAL_BURST", "10"))
+AI_DAILY_TOKEN_BUDGET = int(os.getenv("AI_DAILY_TOKEN_BUDGET", "20000"))
+
+# Endpoint metrics Prometheus lokal (lihat metrics.py), METRICS_PORT=0 untuk mematikan
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Inisialisasi client di luar loop agar lebih efisien.
+# Pakai AsyncGroq supaya request ke Groq tidak memblok event loop Discord.
+# Retry 429 diatur groq_scheduler (pause seluruh antrian), bukan oleh client per request
+client = AsyncGroq(api_key=GROQ_API_KEY, timeout=GROQ_TIMEOUT, max_retries=0) if GROQ_API_KEY else None
+groq_scheduler = GroqScheduler(
+    concurrency=GROQ_MAX_CONCURRENCY,
+    max_queue=GROQ_MAX_QUEUE,
+    max_wait=min(GROQ_MAX_WAIT, GROQ_TIMEOUT),
+    observe_wait=lambda seconds, retry: metrics.GROQ_QUEUE_SECONDS.labels(
+        "retry" if retry else "first"
+    ).observe(seconds),
+)
+# Pertanyaan identik (personality + pertanyaan + data sama) dijawab sekali saja
+response_cache = ResponseCache(max_entries=GROQ_CACHE_SIZE, ttl=GROQ_CACHE_TTL)
+# Riwayat obrolan untuk pertanyaan lanjutan ("terus yang hari Rabu?"), lihat conversation.py
+conversations = ConversationStore(
+    max_turns=GROQ_HISTORY_TURNS,
+    token_budget=GROQ_HISTORY_TOKEN_BUDGET,
+    max_conversations=GROQ_HISTORY_MAX,
+    idle_ttl=GROQ_HISTORY_TTL,
+)
 
 intents = discord.Intents.default()
 intents.members = True
@@ -68,422 +139,472 @@ intents.guilds = True
 intents.message_content = True
 
 bot = discord.Bot(intents=intents)
+# Hitung semua request REST Discord (kirim pesan, edit, DM, dll) per route
+metrics.instrument_discord_http(bot.http)
+metrics_server = metrics.MetricsServer(host=METRICS_HOST, port=METRICS_PORT)
+metrics.REGISTRY.gauge("bot_groq_queued", "Request Groq yang sedang antri", lambda: groq_scheduler.queued)
+metrics.REGISTRY.gauge("bot_groq_active", "Request Groq yang sedang jalan", lambda: groq_scheduler.active)
+metrics.REGISTRY.gauge("bot_reminders_pending", "Reminder di heap scheduler", lambda: len(reminder_scheduler))
+metrics.REGISTRY.gauge("bot_conversations", "Percakapan AI yang diingat", lambda: len(conversations))
 
 database.init_db()
 
-# Rate limiting untuk AI chat (cooldown per user)
-user_cooldowns = {}
-AI_COOLDOWN_SECONDS = 3
-
-# Sensitive data keywords
-SENSITIVE_KEYWORDS = [
-    "password", "pwd", "pass", "kata sandi", "sandi",
-    "pin", "ktp", "nik", "npwp", "rekening", "kartu kredit",
-    "credit card", "cvv", "otp", "token api", "api key",
-    "secret", "private key", "kunci"
-]
-
-INDO_TO_ENG = {
-    "Senin": "monday",
-    "Selasa": "tuesday",
-    "Rabu": "wednesday",
-    "Kamis": "thursday",
-    "Jumat": "friday",
-    "Sabtu": "saturday",
-    "Minggu": "sunday",
-}
+# Rate limiting untuk AI chat (token bucket user/channel/global + budget harian, lihat rate_limit.py)
+rate_limiter = RateLimiter(
+    user_rate=AI_USER_RATE,
+    user_burst=AI_USER_BURST,
+    channel_rate=AI_CHANNEL_RATE,
+    channel_burst=AI_CHANNEL_BURST,
+    global_rate=AI_GLOBAL_RATE,
+    global_burst=AI_GLOBAL_BURST,
+    daily_token_budget=AI_DAILY_TOKEN_BUDGET,
+    day_fn=lambda: datetime.now(WIB).strftime("%Y-%m-%d"),
+)
 
+# Filter data sensitif (keyword default + tambahan admin dari database, lihat sensitive.py)
+sensitive_filter = SensitiveFilter()
 
-def parse_duration_to_seconds(text):
-    total_seconds = 0
-    matches = re.findall(r"(\d+)\s*([dhms])", text.lower())
-    for value, unit in matches:
-        value_int = int(value)
-        if unit == "d":
-            total_seconds += value_int * 86400
-        elif unit == "h":
-            total_seconds += value_int * 3600
-        elif unit == "m":
-            total_seconds += value_int * 60
-        elif unit == "s":
-            total_seconds += value_int
-    return total_seconds
+# Jadwal di-cache di memori, reload hanya saat data berubah (lihat schedule_cache.py)
+schedule_cache = ScheduleCache()
 
+# Personality di memori + cache pilihan personality per user (lihat personalities.py)
+personality_registry = PersonalityRegistry()
 
-# ==================== NATURAL LANGUAGE PARSING ====================
 
-def extract_duration_from_text(text):
-    """Extract durasi dari text seperti 'dalam 5 menit', 'dalam 2 jam', dll
-    Return: (duration_seconds, cleaned_text)
-    """
-    # Pattern: "dalam X [menit|jam|hari|detik]"
-    duration_match = re.search(r"dalam\s+(\d+)\s*(menit|jam|hari|detik|m|h|d|s)", text, re.IGNORECASE)
-    if duration_match:
-        value = int(duration_match.group(1))
-        unit = duration_match.group(2).lower()
-        
-        if unit in ["menit", "m"]:
-            seconds = value * 60
-        elif unit in ["jam", "h"]:
-            seconds = value * 3600
-        elif unit in ["hari", "d"]:
-            seconds = value * 86400
-        elif unit in ["detik", "s"]:
-            seconds = value
-        else:
-            seconds = value * 60  # Default menit
-        
-        # Remove duration part dan keywords dari text
-        cleaned = re.sub(r"dalam\s+\d+\s*(menit|jam|hari|detik|m|h|d|s)", "", text, flags=re.IGNORECASE).strip()
-        # Remove connector words: untuk, untuk apa, apa, dsb
-        cleaned = re.sub(r"^(untuk|apa|untuk apa|apa)\s*", "", cleaned, flags=re.IGNORECASE).strip()
-        # Clean up multiple spaces
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
-        
-        return seconds, cleaned
-    
-    return None, text
+def contains_sensitive_data(text):
+    """Check if text contains sensitive keywords, return (ada, keyword yang terdeteksi)"""
+    hits = sensitive_filter.find_all(text)
+    return bool(hits), ", ".join(hits) or None
 
 
-def extract_day_from_text(text):
-    """Extract nama hari dari text
-    Return: (day_eng, day_indo) atau (None, None) jika tidak ditemukan
-    """
-    day_patterns = [
-        (r"\b(senin|monday|mon)\b", "monday", "Senin"),
-        (r"\b(selasa|tuesday|tue)\b", "tuesday", "Selasa"),
-        (r"\b(rabu|wednesday|wed)\b", "wednesday", "Rabu"),
-        (r"\b(kamis|thursday|thu)\b", "thursday", "Kamis"),
-        (r"\b(jumat|friday|fri)\b", "friday", "Jumat"),
-        (r"\b(sabtu|saturday|sat)\b", "saturday", "Sabtu"),
-        (r"\b(minggu|sunday|sun)\b", "sunday", "Minggu"),
-    ]
-    
-    for pattern, day_eng, day_indo in day_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return day_eng, day_indo
-    
-    return None, None
+# Analytics di-buffer lalu di-flush berkala ke analytics.log + tabel rollup
+usage_analytics = Analytics(WIB)
 
+def log_command_usage(user_id, command_name):
+    """Simple analytics tracking (buffered, lihat analytics.py)"""
+    usage_analytics.record(user_id, command_name)
+
+# Warna dan emoji per log_type
+LOG_COLORS = {
+    'success': discord.Color.green(),
+    'error': discord.Color.red(),
+    'info': discord.Color.blue(),
+    'reminder': discord.Color.yellow(),
+    'schedule': discord.Color.purple(),
+    'warning': discord.Color.orange(),
+}
+
+LOG_EMOJIS = {
+    'success': '✅',
+    'error': '❌',
+    'info': 'ℹ️',
+    'reminder': '⏰',
+    'schedule': '📅',
+    'warning': '⚠️',
+}
 
-def extract_time_from_text(text):
-    """Extract waktu (HH:MM) dari text seperti 'jam 08:00', 'pukul 10:30', dll
-    Return: waktu string (HH:MM) atau None
+# Log dikirim berkelompok (max 10 embed per pesan) lewat sink, lihat log_sink.py
+log_sink = LogSink(bot, LOG_CHANNEL_ID)
+
+async def log_to_channel(log_type: str, title: str, description: str, details: dict = None):
     """
-    # Pattern: "jam/pukul HH:MM" atau langsung "HH:MM"
-    time_match = re.search(r"(?:jam|pukul)?\s*(\d{1,2}):(\d{2})", text, re.IGNORECASE)
-    if time_match:
-        hour = int(time_match.group(1))
-        minute = int(time_match.group(2))
+    Queue formatted log ke Discord channel (dikirim berkelompok oleh log_sink)
+    log_type: 'success', 'error', 'info', 'reminder', 'schedule', 'warning'
+    """
+    try:
+        embed = discord.Embed(
+            title=f"{LOG_EMOJIS.get(log_type, '📝')} {title}",
+            description=description,
+            color=LOG_COLORS.get(log_type, discord.Color.greyple()),
+            timestamp=datetime.now(WIB)
+        )
         
-        if 0 <= hour <= 23 and 0 <= minute <= 59:
-            return f"{hour:02d}:{minute:02d}"
-    
-    return None
+        # Tambah details sebagai fields
+        if details:
+            for key, value in details.items():
+                embed.add_field(name=key, value=str(value), inline=True)
+        
+        embed.set_footer(text="IS 1 Assistant Bot Logger")
+        log_sink.emit(embed)
+    except Exception as e:
+        print(f"[LOG ERROR] Failed to queue log: {e}")
+
+def groq_timed(call, mode):
+    """Bungkus call Groq untuk metrics: durasi request per attempt (waktu antri
+    dicatat groq_scheduler lewat observe_wait)"""
+    async def _timed():
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call()
+            outcome = "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "timeout"
+            raise
+        finally:
+            metrics.GROQ_SECONDS.labels(mode, outcome).observe(time.perf_counter() - started)
 
+    return _timed
 
-def parse_add_reminder_natural(text):
-    """Parse natural language: 'ingatkan/reminder dalam 5 menit untuk [teks]'
-    Return: (duration_seconds, reminder_text) atau (None, None) jika parse gagal
-    
-    Examples:
-    - "ingatkan aku dalam 5 menit untuk belajar"
-    - "reminder dalam 2 jam untuk makan siang"
-    - "ingat dalam 30 detik submit tugas"
-    """
-    # Cek pattern: ingatkan/reminder + durasi + teks
-    if not re.search(r"\b(ingatkan|reminder|remind|ingat|ingetin)\b", text, re.IGNORECASE):
-        return None, None
-    
-    # Remove trigger word
-    text_clean = re.sub(r"\b(ingatkan|reminder|remind|ingat|ingetin)\b\s*", "", text, flags=re.IGNORECASE).strip()
-    
-    # Extract durasi
-    duration_seconds, reminder_text = extract_duration_from_text(text_clean)
-    
-    # Jika reminder text kosong atau hanya whitespace, parse gagal
-    if duration_seconds and reminder_text and len(reminder_text.strip()) > 0:
-        return duration_seconds, reminder_text.strip()
-    
-    return None, None
 
+async def groq_chat_completion(messages, user_id=None, channel_id=None):
+    """Kirim chat completion ke Groq secara async.
 
-def parse_add_schedule_natural(text):
-    """Parse natural language: 'tambah/tambahkan jadwal [hari] [jam] [subject]'
-    Return: (day_eng, day_indo, time, subject) atau None jika parse gagal
+    Request antri di groq_scheduler (giliran per channel/user, maksimal
+    GROQ_MAX_CONCURRENCY jalan bersamaan, raise Overloaded kalau antrian penuh).
+    Seluruh request (termasuk antri) dibatasi GROQ_TIMEOUT detik, lewat dari itu
+    raise asyncio.TimeoutError.
     """
-    # Cek pattern: tambah/tambahkan jadwal
-    if not re.search(r"\b(tambah|tambahkan|add)\b.*\b(jadwal|schedule)\b", text, re.IGNORECASE):
-        return None
-    
-    # Remove trigger words
-    text_clean = re.sub(r"(tambah|tambahkan|add)\s+(jadwal|schedule)\s*", "", text, flags=re.IGNORECASE).strip()
-    
-    # Extract hari
-    day_eng, day_indo = extract_day_from_text(text_clean)
-    if not day_eng:
-        return None
-    
-    # Extract waktu
-    time_val = extract_time_from_text(text_clean)
-    if not time_val:
-        return None
-    
-    # Remove day dan time dari text untuk get subject
-    subject = re.sub(r"\b(senin|selasa|rabu|kamis|jumat|sabtu|minggu|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", "", text_clean, flags=re.IGNORECASE).strip()
-    subject = re.sub(r"(?:jam|pukul)?\s*\d{1,2}:\d{2}", "", subject).strip()
-    
-    if not subject:
-        return None
-    
-    return day_eng, day_indo, time_val, subject
+    async def _call():
+        return await client.chat.completions.create(
+            model=GROQ_MODEL,
+            temperature=GROQ_TEMPERATURE,
+            max_tokens=GROQ_MAX_TOKENS,
+            messages=messages,
+        )
 
+    return await asyncio.wait_for(
+        groq_scheduler.run(user_id, channel_id, groq_timed(_call, "complete")), timeout=GROQ_TIMEOUT
+    )
 
-def parse_delete_schedule_natural(text):
-    """Parse natural language: 'hapus jadwal [hari] [jam]'
-    Return: (day_eng, day_indo, time) atau None jika parse gagal
-    """
-    # Cek pattern: hapus jadwal
-    if not re.search(r"\b(hapus|delete|remove)\b.*\b(jadwal|schedule)\b", text, re.IGNORECASE):
-        return None
-    
-    # Extract hari
-    day_eng, day_indo = extract_day_from_text(text)
-    if not day_eng:
-        return None
-    
-    # Extract waktu
-    time_val = extract_time_from_text(text)
-    if not time_val:
-        return None
-    
-    return day_eng, day_indo, time_val
 
+class StreamingReply:
+    """Balasan Discord yang di-edit bertahap selama token Groq masuk.
 
-def parse_delete_reminder_natural(text):
-    """Parse natural language: 'hapus reminder [teks/terbaru]' atau 'clear reminder', etc
-    Return: reminder_text atau 'latest' atau 'all' atau None jika parse gagal
+    Edit dibatasi maksimal satu kali per GROQ_STREAM_EDIT_INTERVAL detik supaya
+    tidak menghabiskan budget edit Discord. Kalau teks melewati 2000 karakter,
+    sisa jawaban lanjut di pesan reply baru.
     """
-    # Cek pattern: hapus reminder, delete reminder, clear reminder
-    if not re.search(r"\b(hapus|delete|remove|clear)\b.*\b(reminder|reminders)\b", text, re.IGNORECASE):
-        return None
-    
-    # Remove trigger words
-    text_clean = re.sub(r"(hapus|delete|remove|clear)\s+(semua\s+)?(reminder|reminders)\s*", "", text, flags=re.IGNORECASE).strip()
-    
-    # Cek untuk "semua" / "all" SEBELUM remove dari text
-    if re.search(r"\b(semua|all)\b", text, re.IGNORECASE):
-        return "all"
-    
-    # Cek untuk "terbaru" / "latest"
-    if re.search(r"\b(terbaru|latest|terakhir)\b", text_clean, re.IGNORECASE):
-        return "latest"
-    
-    # Jika ada sisa text, gunakan sebagai search text
-    if text_clean:
-        return text_clean
-    
-    return None
 
+    PLACEHOLDER = "💭 ..."
+
+    def __init__(self, source: discord.Message):
+        self.source = source
+        self.messages = []   # pesan Discord yang sudah dikirim
+        self.parts = [""]    # isi teks per pesan
+        self.text = ""
+        self._shown = []     # isi yang terakhir kali tampil per pesan
+        self._last_edit = 0.0
+
+    async def start(self):
+        """Kirim placeholder secepatnya"""
+        msg = await self.source.reply(self.PLACEHOLDER, mention_author=False)
+        self.messages.append(msg)
+        self._shown.append(self.PLACEHOLDER)
+
+    async def feed(self, delta: str):
+        """Tambah potongan teks, edit pesan kalau sudah waktunya"""
+        self.text += delta
+        self.parts[-1] += delta
+        while len(self.parts[-1]) > DISCORD_MESSAGE_LIMIT:
+            await self._rollover()
+        if time.monotonic() - self._last_edit >= GROQ_STREAM_EDIT_INTERVAL:
+            await self._flush()
+
+    async def finish(self):
+        """Tampilkan sisa teks yang belum ter-edit"""
+        await self._flush()
+
+    async def discard(self):
+        """Hapus placeholder kalau belum ada teks yang sempat tampil"""
+        if self.text:
+            return
+        for msg in self.messages:
+            try:
+                await msg.delete()
+            except discord.HTTPException:
+                pass
+        self.messages.clear()
+
+    async def _rollover(self):
+        current = self.parts[-1]
+        # Potong di baris/spasi terakhir supaya kata tidak terbelah
+        cut = max(current.rfind("\n", 0, DISCORD_MESSAGE_LIMIT), current.rfind(" ", 0, DISCORD_MESSAGE_LIMIT))
+        if cut < DISCORD_MESSAGE_LIMIT // 2:
+            cut = DISCORD_MESSAGE_LIMIT
+        self.parts[-1], rest = current[:cut], current[cut:].lstrip()
+        await self._edit(len(self.parts) - 1, self.parts[-1])
+        self.parts.append(rest)
+        msg = await self.source.reply(rest or self.PLACEHOLDER, mention_author=False)
+        self.messages.append(msg)
+        self._shown.append(rest or self.PLACEHOLDER)
+        self._last_edit = time.monotonic()
+
+    async def _flush(self):
+        for index, part in enumerate(self.parts):
+            if part and part != self._shown[index]:
+                await self._edit(index, part)
+        self._last_edit = time.monotonic()
+
+    async def _edit(self, index, content):
+        await self.messages[index].edit(content=content)
+        self._shown[index] = content
+
+
+async def stream_ai_reply(message: discord.Message, messages):
+    """Stream jawaban Groq langsung ke Discord, return (teks, lengkap, usage).
+
+    Placeholder dikirim sebelum antri slot Groq supaya user langsung lihat respon.
+    Kalau timeout setelah sebagian teks tampil, jawaban ditandai terpotong
+    (lengkap=False); kalau belum ada teks sama sekali, placeholder dihapus dan
+    error di-raise.
+    """
+    # Antrian sudah penuh: langsung tolak sebelum placeholder terkirim
+    groq_scheduler.check_load()
+    reply = StreamingReply(message)
+    await reply.start()
+    usage = None
+
+    async def _consume():
+        nonlocal usage
+        stream = await client.chat.completions.create(
+            model=GROQ_MODEL,
+            temperature=GROQ_TEMPERATURE,
+            max_tokens=GROQ_MAX_TOKENS,
+            messages=messages,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                await reply.feed(chunk.choices[0].delta.content)
+            # Groq mengirim usage di chunk terakhir (x_groq.usage)
+            usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
 
-# ==================== END NATURAL LANGUAGE PARSING ====================
+    complete = True
+    try:
+        await asyncio.wait_for(
+            groq_scheduler.run(message.author.id, message.channel.id, groq_timed(_consume, "stream")),
+            timeout=GROQ_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        if not reply.text:
+            await reply.discard()
+            raise
+        complete = False
+        await reply.feed("\n\n⌛ _(jawaban terpotong, AI kelamaan merespons)_")
+    except Exception:
+        await reply.discard()
+        raise
 
+    if not reply.text:
+        complete = False
+        await reply.feed("❌ Groq tidak mengembalikan respons.")
+    await reply.finish()
+    return reply.text, complete, usage
 
-def contains_sensitive_data(text):
-    """Check if text contains sensitive keywords"""
-    text_lower = text.lower()
-    for keyword in SENSITIVE_KEYWORDS:
-        if keyword in text_lower:
-            return True, keyword
-    return False, None
 
+async def reply_ai_text(message: discord.Message, ai_response):
+    """Kirim jawaban AI yang sudah jadi, dipecah per 2000 karakter"""
+    for i in range(0, len(ai_response), DISCORD_MESSAGE_LIMIT):
+        await message.reply(ai_response[i:i+DISCORD_MESSAGE_LIMIT], mention_author=False)
 
-def log_command_usage(user_id, command_name):
-    """Simple analytics tracking"""
-    try:
-        with open("analytics.log", "a", encoding="utf-8") as f:
-            timestamp = datetime.now(WIB).strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"{timestamp}|{user_id}|{command_name}\n")
-    except Exception as e:
-        print(f"[ANALYTICS ERROR] {e}")
 
-async def log_to_channel(log_type: str, title: str, description: str, details: dict = None):
+async def answer_ai(message: discord.Message, messages):
+    """Minta jawaban ke Groq dan kirim ke user, return (teks, lengkap).
+
+    Token yang dipakai dicatat ke budget harian user (rate_limiter).
     """
-    Send formatted log to Discord channel
-    log_type: 'success', 'error', 'info', 'reminder', 'schedule'
+    if GROQ_STREAMING:
+        ai_response, complete, usage = await stream_ai_reply(message, messages)
+    else:
+        response = await groq_chat_completion(messages, message.author.id, message.channel.id)
+        ai_response = response.choices[0].message.content or ""
+        complete, usage = bool(ai_response), getattr(response, "usage", None)
+        if ai_response:
+            await reply_ai_text(message, ai_response)
+        else:
+            await message.reply("❌ Groq tidak mengembalikan respons.", mention_author=False)
+
+    # Kalau Groq tidak mengirim usage (mis. stream terpotong), pakai estimasi
+    tokens = getattr(usage, "total_tokens", None)
+    if tokens is None:
+        tokens = estimate_prompt_tokens(messages) + estimate_tokens(ai_response)
+    else:
+        metrics.GROQ_TOKENS.labels("prompt").observe(getattr(usage, "prompt_tokens", 0) or 0)
+        metrics.GROQ_TOKENS.labels("completion").observe(getattr(usage, "completion_tokens", 0) or 0)
+    metrics.GROQ_TOKENS.labels("total").observe(tokens)
+    rate_limiter.record_usage(message.author.id, tokens)
+    return ai_response, complete
+
+
+def rate_limit_text(decision):
+    """Balasan untuk pertanyaan AI yang kena rate limit"""
+    if decision.scope == "budget":
+        return (
+            f"🪫 Kuota AI harian kamu sudah habis ({AI_DAILY_TOKEN_BUDGET} token). "
+            "Reset jam 00:00 WIB, sementara itu command jadwal/reminder tetap bisa dipakai ya!"
+        )
+    if decision.scope == "user":
+        return f"⏳ Tunggu {decision.retry_after:.1f} detik sebelum bertanya lagi ya!"
+    if decision.scope == "channel":
+        return f"⏳ Channel ini lagi rame, coba tanya lagi {decision.retry_after:.1f} detik lagi ya!"
+    return f"⏳ Lagi banyak yang nanya ke AI, coba lagi {decision.retry_after:.1f} detik lagi ya!"
+
+# --- RENDER JADWAL (di-cache per versi data jadwal) ---
+
+def render_day_schedule(cache, day_eng):
+    """Teks jadwal satu hari, None kalau kosong"""
+    def build():
+        data = cache.day(day_eng)
+        if not data:
+            return None
+        lines = [f"- {t_val} {sub}" for t_val, sub in data]
+        return f"📅 Jadwal {ENG_TO_INDO[day_eng]}:\n" + "\n".join(lines)
+    return cache.render(("day", day_eng), build)
+
+
+def render_week_schedule(cache):
+    """Teks jadwal seminggu, None kalau kosong"""
+    def build():
+        if not cache.rows:
+            return None
+        lines = []
+        for day_eng, data in cache.by_day.items():
+            lines.append(f"**{ENG_TO_INDO[day_eng]}:**")
+            lines.extend(f"  - {time_val} {subject}" for time_val, subject in data)
+        return f"📅 Jadwal Lengkap:\n" + "\n".join(lines)
+    return cache.render(("week",), build)
+
+
+async def render_subject_search(cache, query):
+    """Teks hasil cari jadwal by mata kuliah, None kalau tidak ada.
+
+    Hasil fuzzy (singkatan/typo, nama matkul tidak mengandung semua kata kunci)
+    ditampilkan sebagai saran, bukan sebagai jadwal yang cocok.
     """
-    try:
-        channel = bot.get_channel(LOG_CHANNEL_ID)
-        if not channel:
-            channel = await bot.fetch_channel(LOG_CHANNEL_ID)
-        
-        if not channel:
-            print(f"[LOG] Channel {LOG_CHANNEL_ID} tidak ditemukan")
-            return
-        
-        # Tentukan warna dan emoji berdasarkan log_type
-        colors = {
-            'success': discord.Color.green(),
-            'error': discord.Color.red(),
-            'info': discord.Color.blue(),
-            'reminder': discord.Color.yellow(),
-            'schedule': discord.Color.purple(),
-            'warning': discord.Color.orange(),
-        }
-        
-        emojis = {
-            'success': '✅',
-            'error': '❌',
-            'info': 'ℹ️',
-            'reminder': '⏰',
-            'schedule': '📅',
-            'warning': '⚠️',
-        }
-        
+    results = await cache.search(query)
+
+    def build():
+        if not results:
+            return None
+        words = query.lower().split()
+        exact, fuzzy = [], []
+        for day_eng, time_val, subject in results:
+            line = f"- {ENG_TO_INDO[day_eng]} {time_val} | {subject}"
+            (exact if all(word in subject.lower() for word in words) else fuzzy).append(line)
+        sections = []
+        if exact:
+            sections.append(f"📅 Jadwal '{query}':\n" + "\n".join(exact))
+        if fuzzy:
+            header = "🔎 Mungkin maksudnya:" if exact else (
+                f"🔎 Gak ada jadwal yang persis cocok dengan '{query}'. Mungkin maksudnya:"
+            )
+            sections.append(header + "\n" + "\n".join(fuzzy))
+        return "\n\n".join(sections)
+    return cache.render(("search", query), build)
+
+
+def build_day_schedule_embed(cache, day_eng):
+    """Embed jadwal hari ini untuk announcement, None kalau kosong"""
+    def build():
+        data = cache.day(day_eng)
+        if not data:
+            return None
         embed = discord.Embed(
-            title=f"{emojis.get(log_type, '📝')} {title}",
-            description=description,
-            color=colors.get(log_type, discord.Color.greyple()),
-            timestamp=datetime.now(WIB)
+            title=f"📅 Jadwal Kuliah Hari Ini",
+            color=discord.Color.blue(),
         )
-        
-        # Tambah details sebagai fields
-        if details:
-            for key, value in details.items():
-                embed.add_field(name=key, value=str(value), inline=True)
-        
-        embed.set_footer(text="IS 1 Assistant Bot Logger")
-        await channel.send(embed=embed)
+        for time_val, subject in data:
+            embed.add_field(name=f"🕒 {time_val}", value=subject, inline=False)
+        return embed
+    embed = cache.render(("embed", day_eng), build)
+    if embed is None:
+        return None
+    # Copy supaya timestamp tidak mengubah embed yang di-cache
+    embed = embed.copy()
+    embed.timestamp = datetime.now(WIB)
+    return embed
+
+# --- TASKS ---
+
+def format_reminder_dm(items):
+    """Gabungkan beberapa reminder jadi isi DM (dipecah per 2000 karakter)"""
+    if len(items) == 1:
+        lines = [f"⏰ **Reminder:** {items[0][1]}"]
+    else:
+        lines = [f"⏰ **{len(items)} Reminder:**"] + [f"• {message}" for _, message, _ in items]
+
+    chunks = [""]
+    for line in lines:
+        if chunks[-1] and len(chunks[-1]) + len(line) + 1 > DISCORD_MESSAGE_LIMIT:
+            chunks.append("")
+        chunks[-1] = f"{chunks[-1]}\n{line}" if chunks[-1] else line[:DISCORD_MESSAGE_LIMIT]
+    return chunks
+
+
+def classify_delivery_error(error):
+    """Ubah exception Discord jadi error permanen/sementara untuk ReminderDispatcher"""
+    if isinstance(error, (discord.Forbidden, discord.NotFound)):
+        return reminders.PermanentDeliveryError(f"{type(error).__name__}: {error}")
+    if isinstance(error, discord.HTTPException):
+        if error.status == 429:
+            headers = getattr(error.response, "headers", None) or {}
+            try:
+                retry_after = float(headers.get("Retry-After", 0)) or None
+            except ValueError:
+                retry_after = None
+            is_global = headers.get("X-RateLimit-Global") == "true" or headers.get("X-RateLimit-Scope") == "global"
+            return reminders.TransientDeliveryError("Rate limited (429)", retry_after, is_global)
+        if error.status >= 500:
+            return reminders.TransientDeliveryError(f"Discord {error.status}")
+        return reminders.PermanentDeliveryError(f"HTTP {error.status}: {error}")
+    return reminders.TransientDeliveryError(f"{type(error).__name__}: {error}")
+
+
+async def deliver_reminder_dm(user_id, items):
+    """Kirim semua reminder jatuh tempo milik satu user dalam satu DM"""
+    try:
+        user = bot.get_user(user_id)
+        if not user:
+            user = await bot.fetch_user(user_id)
+        for chunk in format_reminder_dm(items):
+            await user.send(chunk)
     except Exception as e:
-        print(f"[LOG ERROR] Failed to send log: {e}")
-
-# --- PERSONALITY SYSTEM ---
-
-def init_personalities():
-    """Initialize default AI personalities"""
-    personalities = {
-        "friendly": {
-            "name": "Teman Baik",
-            "description": "Ramah, ceria, dan santai",
-            "emoji": "😊",
-            "prompt": "Kamu adalah asisten friendly untuk mahasiswa Sistem Informasi IS 1 bernama IS 1 Assistant! "
-                     "Kamu ramah, ceria, perhatian, dan suka ngobrol santai dengan teman-teman IS 1. "
-                     "Kamu bisa jawab pertanyaan umum, diskusi topik kuliah, atau sekadar ngobrol. "
-                     "Jawab dengan natural dan enak dibaca, boleh pakai emoji sesekali. "
-                     "PENTING: Untuk data jadwal/reminder, HANYA gunakan data dari database yang diberikan. "
-                     "Jangan mengarang jadwal atau reminder yang tidak ada. Kalau tidak ada data, bilang terus terang."
-        },
-        "professional": {
-            "name": "Asisten Profesional",
-            "description": "Formal, informatif, fokus data",
-            "emoji": "💼",
-            "prompt": "Kamu adalah IS 1 Assistant, asisten profesional untuk mahasiswa Sistem Informasi IS 1. "
-                     "Berikan jawaban yang terstruktur, spesifik, dan berbasis data. "
-                     "Hindari obrolan santai dan fokus pada informasi yang akurat. "
-                     "Gunakan format yang jelas dengan poin-poin. "
-                     "PENTING: Hanya gunakan data jadwal/reminder dari database. Tidak ada spekulasi atau data fiktif. "
-                     "Jika data tidak tersedia, katakan dengan jelas."
-        },
-        "tutor": {
-            "name": "Tutor Edukatif",
-            "description": "Mengajar, menjelaskan konsep dengan detail",
-            "emoji": "📚",
-            "prompt": "Kamu adalah IS 1 Assistant yang berperan sebagai tutor untuk mahasiswa IS 1. "
-                     "Ketika menjawab pertanyaan, jelaskan konsep dengan detail dan berikan contoh nyata. "
-                     "Gunakan analogi yang mudah dipahami. Dorong critical thinking dengan memberikan pertanyaan balik. "
-                     "Pecah topik kompleks menjadi bagian-bagian yang lebih kecil. "
-                     "PENTING: Untuk jadwal/reminder, hanya gunakan data dari database. Tunjukkan sumbernya jika relevan."
-        },
-        "energik": {
-            "name": "Motivator Energik",
-            "description": "Motivasi, semangat, penuh energi",
-            "emoji": "🚀",
-            "prompt": "Kamu adalah IS 1 Assistant dengan kepribadian yang super energik dan motivatif! "
-                     "Berikan semangat dan dorongan positif kepada mahasiswa IS 1 dalam setiap interaksi. "
-                     "Gunakan banyak emoji yang menyenangkan dan kata-kata inspiratif. "
-                     "Jadilah cheerleader yang mendukung semangat belajar mereka! "
-                     "PENTING: Untuk info jadwal/reminder, tetap akurat dan gunakan data dari database saja. "
-                     "Delivery semangat, tapi content tetap berdasarkan data nyata."
-        },
-        "helpful": {
-            "name": "Asisten Membantu",
-            "description": "Fokus solusi, praktis, action-oriented",
-            "emoji": "🤝",
-            "prompt": "Kamu adalah IS 1 Assistant yang berfokus pada solusi praktis. "
-                     "Ketika mahasiswa IS 1 minta bantuan, berikan langkah-langkah konkret dan actionable. "
-                     "Ringkas poin penting dan berikan rekomendasi spesifik. "
-                     "Setiap jawaban harus membawa nilai dan membantu mereka mengambil aksi nyata. "
-                     "PENTING: Jadwal dan reminder hanya dari database. Tawarkan bantuan konkret berdasarkan data tersebut."
+        raise classify_delivery_error(e) from e
+
+    sent_at = time.time()
+    for _, _, remind_at in items:
+        metrics.REMINDER_LAG_SECONDS.observe(max(0.0, sent_at - remind_at))
+
+    await log_to_channel(
+        'reminder',
+        'Reminder Terkirim',
+        f'{len(items)} reminder berhasil dikirim ke user',
+        {
+            'User ID': user_id,
+            'Username': user.name,
+            'Pesan': "\n".join(message for _, message, _ in items)[:1024]
         }
-    }
-    
-    for personality_id, data in personalities.items():
-        database.add_personality(
-            personality_id,
-            data["name"],
-            data["description"],
-            data["prompt"],
-            data["emoji"]
-        )
+    )
 
-# --- TASKS ---
 
-@tasks.loop(seconds=15)
-async def check_reminders():
-    await bot.wait_until_ready()
-    due_reminders = database.get_due_reminders()
-    for reminder_id, user_id, message in due_reminders:
-        try:
-            user = bot.get_user(user_id)
-            if not user:
-                user = await bot.fetch_user(user_id)
-            if user:
-                await user.send(f"⏰ **Reminder:** {message}")
-                await log_to_channel(
-                    'reminder',
-                    'Reminder Terkirim',
-                    f'Reminder berhasil dikirim ke user',
-                    {
-                        'User ID': user_id,
-                        'Username': user.name,
-                        'Pesan': message
-                    }
-                )
-            else:
-                await log_to_channel(
-                    'warning',
-                    'User Tidak Ditemukan',
-                    f'Reminder tidak bisa dikirim, user tidak ada di cache',
-                    {
-                        'User ID': user_id,
-                        'Reminder ID': reminder_id,
-                        'Pesan': message
-                    }
-                )
-        except discord.Forbidden:
-            await log_to_channel(
-                'error',
-                'DM Tertutup',
-                f'User tidak memungkinkan menerima DM',
-                {
-                    'User ID': user_id,
-                    'Reminder ID': reminder_id,
-                    'Pesan': message
-                }
-            )
-        except Exception as e:
-            await log_to_channel(
-                'error',
-                'Error Mengirim Reminder',
-                f'Gagal mengirim reminder: {str(e)}',
-                {
-                    'Reminder ID': reminder_id,
-                    'User ID': user_id,
-                    'Error': type(e).__name__
-                }
-            )
-        finally:
-            database.delete_reminder(reminder_id)
+async def report_reminder_failure(kind, user_id, items, error):
+    """Log reminder yang dijadwal ulang atau masuk dead letter"""
+    details = {
+        'User ID': user_id,
+        'Reminder ID': ", ".join(str(reminder_id) for reminder_id, _, _ in items),
+        'Pesan': "\n".join(message for _, message, _ in items)[:1024],
+        'Error': str(error)[:1024],
+    }
+    if kind == "retry":
+        await log_to_channel('warning', 'Reminder Dicoba Lagi', 'Gagal sementara, reminder dijadwal ulang', details)
+    elif isinstance(error, reminders.PermanentDeliveryError):
+        await log_to_channel('error', 'Reminder Tidak Terkirim', 'DM tertutup atau user tidak ditemukan, dipindah ke dead letter', details)
+    else:
+        await log_to_channel('error', 'Reminder Gagal Terkirim', 'Retry habis, dipindah ke dead letter', details)
+
+# Reminder dikirim tepat waktu oleh scheduler berbasis heap, lalu DM dikirim
+# paralel per user oleh dispatcher (lihat reminders.py)
+REMINDER_DISPATCH_WORKERS = int(os.getenv("REMINDER_DISPATCH_WORKERS", "8"))
+REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "5"))
+reminder_dispatcher = reminders.ReminderDispatcher(
+    deliver_reminder_dm,
+    workers=REMINDER_DISPATCH_WORKERS,
+    report=report_reminder_failure,
+    max_attempts=REMINDER_MAX_ATTEMPTS,
+)
+reminder_scheduler = reminders.ReminderScheduler(reminder_dispatcher)
 
 @tasks.loop(hours=24)
 async def announce_schedule():
@@ -491,32 +612,382 @@ async def announce_schedule():
     channel = bot.get_channel(SCHEDULE_CHANNEL_ID)
     if channel:
         day_eng = datetime.now(WIB).strftime("%A").lower()
-        schedule_data = database.get_schedule_for_day(day_eng)
-        if schedule_data:
-            embed = discord.Embed(
-                title=f"📅 Jadwal Kuliah Hari Ini",
-                color=discord.Color.blue(),
-                timestamp=datetime.now(WIB),
-            )
-            for time_val, subject in schedule_data:
-                embed.add_field(name=f"🕒 {time_val}", value=subject, inline=False)
+        embed = build_day_schedule_embed(await schedule_cache.refresh(), day_eng)
+        if embed:
             await channel.send(embed=embed)
 
+# --- INTENT TEKS (on_message) ---
+# Dicek berurutan sesuai prioritas (angka kecil duluan), lihat router.py.
+# Pesan yang tidak cocok dengan intent mana pun diteruskan ke AI chat.
+
+intent_router = IntentRouter(
+    observe=lambda intent, seconds: metrics.INTENT_SECONDS.labels(intent).observe(seconds)
+)
+
+
+def _natural_reminder(match, text):
+    reminder_duration, reminder_text = parse_add_reminder_natural(text)
+    if reminder_duration and reminder_text:
+        return reminder_duration, reminder_text
+    return None
+
+
+async def reply_sensitive(message, keyword, what="data sensitif"):
+    await message.reply(
+        f"❌ Tidak dapat menyimpan {what} (terdeteksi: '{keyword}'). Jaga privasi kamu ya!",
+        mention_author=False,
+    )
+
+
+@intent_router.route(
+    "add_reminder_natural", 10,
+    keywords=("ingatkan", "reminder", "remind", "ingat", "ingetin"),
+    parse=_natural_reminder,
+)
+async def intent_add_reminder_natural(message, user_message, args):
+    # Contoh: "ingatkan aku dalam 5 menit untuk belajar", "reminder dalam 2 jam untuk makan"
+    reminder_duration, reminder_text = args
+    is_sensitive, keyword = contains_sensitive_data(reminder_text)
+    if is_sensitive:
+        await reply_sensitive(message, keyword, "reminder dengan data sensitif")
+        return
+
+    remind_at = int(time.time()) + reminder_duration
+    reminder_id = await async_db.add_reminder(message.author.id, remind_at, reminder_text)
+    reminder_scheduler.add(reminder_id, remind_at)
+    log_command_usage(message.author.id, "add_reminder_natural")
+    await message.reply(
+        f"⏰ Reminder ditambahkan! Akan mengingatkan kamu dalam {reminder_duration // 60} menit untuk: {reminder_text}",
+        mention_author=False,
+    )
+
+
+@intent_router.route(
+    "delete_reminder_natural", 20,
+    r"\b(?:hapus|delete|remove|clear)\b.*\breminders?\b",
+    keywords=("hapus", "delete", "remove", "clear"),
+    parse=lambda match, text: parse_delete_reminder_natural(text),
+)
+async def intent_delete_reminder_natural(message, user_message, delete_reminder_query):
+    # Contoh: "hapus reminder belajar", "hapus semua reminder", "hapus reminder terbaru"
+    reminders = await async_db.get_user_reminders(message.author.id)
+    if delete_reminder_query == "all":
+        if not reminders:
+            await message.reply("Belum ada reminder untuk dihapus.", mention_author=False)
+            return
+        await async_db.delete_all_user_reminders(message.author.id)
+        log_command_usage(message.author.id, "delete_all_reminders_natural")
+        await message.reply(f"✅ Semua reminder kamu berhasil dihapus ({len(reminders)} reminder).", mention_author=False)
+
+    elif delete_reminder_query == "latest":
+        if not reminders:
+            await message.reply("Belum ada reminder untuk dihapus.", mention_author=False)
+            return
+        reminder_id, _, reminder_text = reminders[-1]
+        await async_db.delete_reminder(reminder_id)
+        reminder_scheduler.discard(reminder_id)
+        log_command_usage(message.author.id, "delete_latest_reminder_natural")
+        await message.reply(
+            f"✅ Reminder '{reminder_text}' berhasil dihapus.",
+            mention_author=False,
+        )
+
+    else:
+        # Search reminder by text
+        matched = [r for r in reminders if delete_reminder_query.lower() in r[2].lower()]
+        if not matched:
+            await message.reply(f"Reminder '{delete_reminder_query}' tidak ditemukan.", mention_author=False)
+            return
+        await async_db.delete_reminders([reminder_id for reminder_id, _, _ in matched])
+        for reminder_id, _, _ in matched:
+            reminder_scheduler.discard(reminder_id)
+        log_command_usage(message.author.id, "delete_reminder_natural")
+        await message.reply(
+            f"✅ {len(matched)} reminder berhasil dihapus.",
+            mention_author=False,
+        )
+
+
+@intent_router.route(
+    "add_schedule_natural", 30,
+    r"\b(?:tambah|tambahkan|add)\b.*\b(?:jadwal|schedule)\b",
+    keywords=("tambah", "tambahkan", "add"),
+    parse=lambda match, text: parse_add_schedule_natural(text),
+)
+async def intent_add_schedule_natural(message, user_message, args):
+    # Contoh: "tambahkan jadwal senin jam 08:00 kuliah AI", "tambah jadwal rabu 14:00 pemrograman"
+    day_eng, day_indo, time_val, subject = args
+    is_sensitive, keyword = contains_sensitive_data(subject)
+    if is_sensitive:
+        await reply_sensitive(message, keyword)
+        return
+
+    await async_db.add_schedule(day_eng, time_val, subject)
+    log_command_usage(message.author.id, "add_schedule_natural")
+    await message.reply(
+        f"✅ Jadwal {day_indo} jam {time_val} berhasil ditambah: {subject}",
+        mention_author=False,
+    )
+
+
+@intent_router.route(
+    "delete_schedule_natural", 40,
+    r"\b(?:hapus|delete|remove)\b.*\b(?:jadwal|schedule)\b",
+    keywords=("hapus", "delete", "remove"),
+    parse=lambda match, text: parse_delete_schedule_natural(text),
+)
+async def intent_delete_schedule_natural(message, user_message, args):
+    # Contoh: "hapus jadwal senin jam 08:00", "delete schedule rabu 14:00"
+    day_eng, day_indo, time_val = args
+    data = (await schedule_cache.refresh()).day(day_eng)
+    if not data:
+        await message.reply(f"Gak ada jadwal di hari {day_indo}.", mention_author=False)
+        return
+
+    if not any(entry_time == time_val for entry_time, _ in data):
+        await message.reply(f"Jadwal jam {time_val} di {day_indo} tidak ditemukan.", mention_author=False)
+        return
+
+    await async_db.remove_schedule(day_eng, time_val)
+    log_command_usage(message.author.id, "delete_schedule_natural")
+    await message.reply(
+        f"✅ Jadwal {day_indo} jam {time_val} berhasil dihapus.",
+        mention_author=False,
+    )
+
+
+@intent_router.route("add_schedule", 50, r"(tambah|add)\s+jadwal\s+(\w+)\s+(\d{1,2}:\d{2})\s+(.+)$")
+async def intent_add_schedule(message, user_message, schedule_add):
+    day_raw = schedule_add.group(2).strip().capitalize()
+    time_val = schedule_add.group(3).strip()
+    subject = schedule_add.group(4).strip()
+
+    is_sensitive, keyword = contains_sensitive_data(subject)
+    if is_sensitive:
+        await reply_sensitive(message, keyword)
+        return
+
+    if day_raw not in INDO_TO_ENG:
+        await message.reply(
+            "❌ Hari tidak valid. Gunakan: Senin, Selasa, Rabu, Kamis, Jumat, Sabtu, Minggu.",
+            mention_author=False,
+        )
+        return
+    await async_db.add_schedule(INDO_TO_ENG[day_raw], time_val, subject)
+    log_command_usage(message.author.id, "add_schedule")
+    await message.reply(
+        f"✅ Jadwal {day_raw} jam {time_val} berhasil ditambah.",
+        mention_author=False,
+    )
+
+
+@intent_router.route("schedule_week", 60, r"(lihat|cek)?\s*jadwal\s+(semua|keseluruhan|lengkap)$")
+async def intent_schedule_week(message, user_message, match):
+    text = render_week_schedule(await schedule_cache.refresh())
+    if not text:
+        await message.reply("Belum ada jadwal tersimpan.", mention_author=False)
+        return
+    await message.reply(text, mention_author=False)
+
+
+@intent_router.route("schedule_query", 70, r"jadwal\s+(.+)$")
+async def intent_schedule_query(message, user_message, matkul_search):
+    query = matkul_search.group(1).strip()
+
+    # Cek apakah query adalah hari
+    cache = await schedule_cache.refresh()
+    day_query = query.capitalize()
+    if day_query == "Hari ini" or day_query in INDO_TO_ENG:
+        if day_query == "Hari ini":
+            day_eng = datetime.now(WIB).strftime("%A").lower()
+        else:
+            day_eng = INDO_TO_ENG[day_query]
+        text = render_day_schedule(cache, day_eng)
+        if not text:
+            await message.reply(f"Gak ada jadwal buat hari {ENG_TO_INDO[day_eng]}.", mention_author=False)
+            return
+        await message.reply(text, mention_author=False)
+        return
+
+    # Kalau bukan hari, cari by subject
+    text = await render_subject_search(cache, query)
+    if not text:
+        await message.reply(
+            f"Gak ada jadwal yang cocok dengan '{query}'.",
+            mention_author=False,
+        )
+        return
+    await message.reply(text, mention_author=False)
+
+
+@intent_router.route("schedule_today", 80, r"(lihat|cek)?\s*jadwal$")
+async def intent_schedule_today(message, user_message, match):
+    day_eng = datetime.now(WIB).strftime("%A").lower()
+    text = render_day_schedule(await schedule_cache.refresh(), day_eng)
+    if not text:
+        await message.reply(f"Gak ada jadwal buat hari {ENG_TO_INDO[day_eng]}.", mention_author=False)
+        return
+    await message.reply(text, mention_author=False)
+
+
+@intent_router.route("delete_schedule", 90, r"(hapus|delete|remove)\s+jadwal\s+(.+)$")
+async def intent_delete_schedule(message, user_message, schedule_remove):
+    subject_query = schedule_remove.group(2).strip()
+
+    # Hapus semua yang namanya mengandung kata kunci (tidak fuzzy)
+    count = await async_db.delete_schedule_by_subject(subject_query)
+    if not count:
+        # Kasih saran dari search fuzzy, tapi jangan hapus otomatis
+        suggestions = await schedule_cache.search(subject_query)
+        text = f"❌ Tidak ada jadwal yang cocok dengan '{subject_query}'."
+        if suggestions:
+            names = ", ".join(dict.fromkeys(subject for _, _, subject in suggestions[:3]))
+            text += f" Mungkin maksudnya: {names}?"
+        await message.reply(text, mention_author=False)
+        return
+
+    log_command_usage(message.author.id, "delete_schedule")
+    await message.reply(
+        f"✅ Berhasil menghapus {count} jadwal dengan kata kunci '{subject_query}'.",
+        mention_author=False,
+    )
+
+
+@intent_router.route("add_reminder", 100, r"(?:(tambah|add|buat|pasang)\s+reminder|(ingatkan))\s+(\S+)\s+(.+)$")
+async def intent_add_reminder(message, user_message, reminder_add):
+    duration_str = reminder_add.group(3).strip()
+    reminder_message = reminder_add.group(4).strip()
+
+    is_sensitive, keyword = contains_sensitive_data(reminder_message)
+    if is_sensitive:
+        await reply_sensitive(message, keyword)
+        return
+
+    seconds = parse_duration_to_seconds(duration_str)
+    if seconds <= 0:
+        await message.reply(
+            "❌ Format waktu salah. Contoh: 1h30m, 2d, 45m, 10s.",
+            mention_author=False,
+        )
+        return
+    remind_at = int(time.time()) + seconds
+    reminder_id = await async_db.add_reminder(message.author.id, remind_at, reminder_message)
+    reminder_scheduler.add(reminder_id, remind_at)
+    log_command_usage(message.author.id, "add_reminder")
+    await message.reply("✅ Reminder berhasil ditambahkan.", mention_author=False)
+
+
+@intent_router.route(
+    "list_reminders", 110,
+    r"(?:(lihat|cek)\s+reminders?(\s+saya)?|reminder saya|daftar reminder|list reminder)$",
+)
+async def intent_list_reminders(message, user_message, match):
+    reminders = await async_db.get_user_reminders(int(message.author.id), limit=5)
+    if not reminders:
+        await message.reply("Belum ada reminder aktif.", mention_author=False)
+        return
+    lines = []
+    for reminder_id, remind_at, reminder_message in reminders:
+        time_str = datetime.fromtimestamp(int(remind_at)).strftime("%d-%m %H:%M")
+        lines.append(f"- {time_str} | {reminder_message}")
+    await message.reply(
+        "⏰ Reminder kamu:\n" + "\n".join(lines),
+        mention_author=False,
+    )
+
+
+@intent_router.route("delete_reminders", 120, r"(hapus|delete|clear)\s+(semua\s+)?reminders?$")
+async def intent_delete_reminders(message, user_message, match):
+    count = await async_db.delete_all_user_reminders(message.author.id)
+    log_command_usage(message.author.id, "delete_reminders")
+    if count > 0:
+        await message.reply(
+            f"✅ Berhasil menghapus {count} reminder.",
+            mention_author=False,
+        )
+    else:
+        await message.reply(
+            "❌ Tidak ada reminder aktif untuk dihapus.",
+            mention_author=False,
+        )
+
+
+@intent_router.route("time", 130, keywords=("jam", "pukul", "waktu", "time"))
+async def intent_time(message, user_message, match):
+    # Jawab pertanyaan waktu secara deterministik
+    now = datetime.now(WIB).strftime("%H:%M")
+    await message.reply(f"Sekarang pukul {now} WIB.", mention_author=False)
+
+
+@intent_router.route("help", 140, r"(help|bantuan|perintah|command)(\s+(apa|yang|tersedia))?(\s+saja)?$")
+@intent_router.route("help", 141, keywords=("bisa apa", "command apa"))
+async def intent_help(message, user_message, match):
+    # Help/Bantuan - berikan list command sesuai role user
+    is_admin = message.author.guild_permissions.administrator if message.guild else False
+    
+    help_text = "📖 **Perintah yang Bisa Kamu Gunakan**\n\n"
+    
+    # Text commands (semua user)
+    help_text += "**📝 Text Commands (lewat chat):**\n"
+    help_text += "• `tambah jadwal [Hari] [HH:MM] [Mata Kuliah]` - Tambah jadwal kuliah\n"
+    help_text += "• `jadwal` - Lihat jadwal hari ini\n"
+    help_text += "• `jadwal [Hari]` - Lihat jadwal hari tertentu (contoh: jadwal Senin)\n"
+    help_text += "• `jadwal [Matkul]` - Cari jadwal mata kuliah (contoh: jadwal Matdis)\n"
+    help_text += "• `jadwal semua` - Lihat semua jadwal\n"
+    help_text += "• `hapus jadwal [Matkul]` - Hapus jadwal by mata kuliah\n"
+    help_text += "• `tambah reminder [durasi] [pesan]` - Buat reminder (contoh: tambah reminder 1h30m belajar)\n"
+    help_text += "• `lihat reminder` - Lihat reminder kamu\n"
+    help_text += "• `hapus reminder` - Hapus semua reminder kamu\n"
+    help_text += "• `jam` / `waktu` - Cek waktu sekarang\n"
+    help_text += "• Tanya apa saja ke AI - Chat bebas dengan AI asisten IS 1\n\n"
+    
+    # Slash commands untuk semua user
+    help_text += "**⚡ Slash Commands (untuk semua):**\n"
+    help_text += "• `/isschedule [hari]` - Lihat jadwal kuliah\n"
+    help_text += "• `/isremind` - Pasang reminder pribadi (via form)\n"
+    help_text += "• `/ishelp` - Daftar perintah lengkap\n"
+    help_text += "• `/ping` - Cek latensi bot\n\n"
+    
+    # Admin commands
+    if is_admin:
+        help_text += "**🔐 Admin Commands (khusus admin):**\n"
+        help_text += "• `/isinfo [pesan]` - Kirim pengumuman dengan tag role SI-1\n"
+        help_text += "• `/isaddschedule` - Tambah jadwal kuliah (via form)\n"
+        help_text += "• `/isremovetime [hari] [jam]` - Hapus jadwal jam tertentu\n"
+        help_text += "• `/isclearschedule [hari]` - Hapus semua jadwal di hari tertentu\n"
+        help_text += "• `/isannounce` - Kirim pesan ke channel lain (via form)\n\n"
+    
+    help_text += "💡 **Tips:** Mention aku (@bot) atau reply pesan aku untuk chat!"
+    
+    await message.reply(help_text, mention_author=False)
+
+
 @bot.event
 async def on_ready():
     print(f"--- IS 1 Assistant is Online! ---") # Tanda kehidupan di terminal
     print(f"Logged in as {bot.user.name} (ID: {bot.user.id})")
     
-    # Initialize personalities on startup
-    init_personalities()
-    print("[PERSONALITIES] Initialized 5 AI personalities")
+    # Seed personality default (hanya kalau berubah) + muat ke memori, sekali per proses
+    await personality_registry.load()
+    print(
+        f"[PERSONALITIES] {len(personality_registry.by_id)} personality dimuat"
+        + (" (default di-seed ulang)" if personality_registry.seeded else "")
+    )
+
+    sensitive_filter.load(await async_db.get_sensitive_keywords())
+    print(f"[SENSITIVE] {len(sensitive_filter.keywords)} keyword aktif")
     
     # Set rich presence
     activity = discord.Activity(type=discord.ActivityType.listening, name="IS ONLY ONE")
     await bot.change_presence(activity=activity, status=discord.Status.online)
     
-    if not check_reminders.is_running():
-        check_reminders.start()
+    if not reminder_scheduler.is_running():
+        reminder_scheduler.start()
+    if METRICS_PORT and not metrics_server.is_running():
+        try:
+            await metrics_server.start()
+        except OSError as e:
+            print(f"[METRICS] Gagal membuka port {METRICS_PORT}: {e}")
     if not announce_schedule.is_running():
         announce_schedule.start()
 
@@ -564,476 +1035,110 @@ async def on_message(message: discord.Message):
     elif not user_message:
         return
 
-    # ==================== NATURAL LANGUAGE COMMAND PARSING ====================
-    
-    # Parse: Tambah Reminder dengan natural language
-    # Contoh: "ingatkan aku dalam 5 menit untuk belajar", "reminder dalam 2 jam untuk makan"
-    reminder_duration, reminder_text = parse_add_reminder_natural(user_message)
-    if reminder_duration and reminder_text:
-        is_sensitive, keyword = contains_sensitive_data(reminder_text)
-        if is_sensitive:
-            await message.reply(
-                f"❌ Tidak dapat menyimpan reminder dengan data sensitif (terdeteksi: '{keyword}'). Jaga privasi kamu ya!",
-                mention_author=False,
-            )
-            return
-        
-        remind_at = int(time.time()) + reminder_duration
-        database.add_reminder(message.author.id, remind_at, reminder_text)
-        log_command_usage(message.author.id, "add_reminder_natural")
-        await message.reply(
-            f"⏰ Reminder ditambahkan! Akan mengingatkan kamu dalam {reminder_duration // 60} menit untuk: {reminder_text}",
-            mention_author=False,
-        )
-        return
-
-    # Parse: Hapus Reminder dengan natural language
-    # Contoh: "hapus reminder", "hapus reminder belajar", "hapus semua reminder"
-    delete_reminder_query = parse_delete_reminder_natural(user_message)
-    if delete_reminder_query:
-        if delete_reminder_query == "all":
-            # Hapus semua reminder user
-            reminders = database.get_user_reminders(message.author.id)
-            if not reminders:
-                await message.reply("Belum ada reminder untuk dihapus.", mention_author=False)
-                return
-            database.delete_all_user_reminders(message.author.id)
-            log_command_usage(message.author.id, "delete_all_reminders_natural")
-            await message.reply(f"✅ Semua reminder kamu berhasil dihapus ({len(reminders)} reminder).", mention_author=False)
-            return
-        
-        elif delete_reminder_query == "latest":
-            # Hapus reminder terbaru
-            reminders = database.get_user_reminders(message.author.id)
-            if not reminders:
-                await message.reply("Belum ada reminder untuk dihapus.", mention_author=False)
-                return
-            latest_reminder = reminders[-1]
-            reminder_id, _, reminder_text = latest_reminder
-            database.delete_reminder(reminder_id)
-            log_command_usage(message.author.id, "delete_latest_reminder_natural")
-            await message.reply(
-                f"✅ Reminder '{reminder_text}' berhasil dihapus.",
-                mention_author=False,
-            )
-            return
-        
-        else:
-            # Search reminder by text
-            reminders = database.get_user_reminders(message.author.id)
-            matched = [r for r in reminders if delete_reminder_query.lower() in r[2].lower()]
-            if not matched:
-                await message.reply(f"Reminder '{delete_reminder_query}' tidak ditemukan.", mention_author=False)
-                return
-            for reminder_id, _, _ in matched:
-                database.delete_reminder(reminder_id)
-            log_command_usage(message.author.id, "delete_reminder_natural")
-            await message.reply(
-                f"✅ {len(matched)} reminder berhasil dihapus.",
-                mention_author=False,
-            )
-            return
-
-    # Parse: Tambah Jadwal dengan natural language
-    # Contoh: "tambahkan jadwal senin jam 08:00 kuliah AI", "tambah jadwal rabu 14:00 pemrograman"
-    schedule_result = parse_add_schedule_natural(user_message)
-    if schedule_result:
-        day_eng, day_indo, time_val, subject = schedule_result
-        
-        # Check sensitive data
-        is_sensitive, keyword = contains_sensitive_data(subject)
-        if is_sensitive:
-            await message.reply(
-                f"❌ Tidak dapat menyimpan data sensitif (terdeteksi: '{keyword}'). Jaga privasi kamu ya!",
-                mention_author=False,
-            )
-            return
-        
-        database.add_schedule(day_eng, time_val, subject)
-        log_command_usage(message.author.id, "add_schedule_natural")
-        await message.reply(
-            f"✅ Jadwal {day_indo} jam {time_val} berhasil ditambah: {subject}",
-            mention_author=False,
-        )
-        return
-
-    # Parse: Hapus Jadwal dengan natural language
-    # Contoh: "hapus jadwal senin jam 08:00", "delete schedule rabu 14:00"
-    delete_schedule_result = parse_delete_schedule_natural(user_message)
-    if delete_schedule_result:
-        day_eng, day_indo, time_val = delete_schedule_result
-        
-        # Cek apakah jadwal ada
-        data = database.get_schedule_for_day(day_eng)
-        if not data:
-            await message.reply(f"Gak ada jadwal di hari {day_indo}.", mention_author=False)
-            return
-        
-        # Find dan delete jadwal dengan jam yang sama
-        matched = [s for s in data if s[0] == time_val]
-        if not matched:
-            await message.reply(f"Jadwal jam {time_val} di {day_indo} tidak ditemukan.", mention_author=False)
-            return
-        
-        database.delete_schedule_by_subject(day_eng, matched[0][1])
-        log_command_usage(message.author.id, "delete_schedule_natural")
-        await message.reply(
-            f"✅ Jadwal {day_indo} jam {time_val} berhasil dihapus.",
-            mention_author=False,
-        )
-        return
-
-    # ==================== END NATURAL LANGUAGE PARSING ====================
-
-    schedule_add = re.match(
-        r"(?i)^(tambah|add)\s+jadwal\s+(\w+)\s+(\d{1,2}:\d{2})\s+(.+)$",
-        user_message,
-    )
-    if schedule_add:
-        day_raw = schedule_add.group(2).strip().capitalize()
-        time_val = schedule_add.group(3).strip()
-        subject = schedule_add.group(4).strip()
-        
-        # Check sensitive data
-        is_sensitive, keyword = contains_sensitive_data(subject)
-        if is_sensitive:
-            await message.reply(
-                f"❌ Tidak dapat menyimpan data sensitif (terdeteksi: '{keyword}'). Jaga privasi kamu ya!",
-                mention_author=False,
-            )
-            return
-        
-        if day_raw not in INDO_TO_ENG:
-            await message.reply(
-                "❌ Hari tidak valid. Gunakan: Senin, Selasa, Rabu, Kamis, Jumat, Sabtu, Minggu.",
-                mention_author=False,
-            )
-            return
-        database.add_schedule(INDO_TO_ENG[day_raw], time_val, subject)
-        log_command_usage(message.author.id, "add_schedule")
-        await message.reply(
-            f"✅ Jadwal {day_raw} jam {time_val} berhasil ditambah.",
-            mention_author=False,
-        )
+    # Command teks (lihat INTENT TEKS di atas); kalau tidak ada yang cocok, lanjut ke AI
+    if await intent_router.dispatch(message, user_message):
         return
 
-    # Check untuk lihat semua jadwal
-    if re.match(r"(?i)^(lihat|cek)?\s*jadwal\s+(semua|keseluruhan|lengkap)$", user_message):
-        all_data = database.get_all_schedules()
-        if not all_data:
-            await message.reply("Belum ada jadwal tersimpan.", mention_author=False)
-            return
-        
-        # Group by day
-        from collections import defaultdict
-        by_day = defaultdict(list)
-        for day_eng, time_val, subject in all_data:
-            day_name = [k for k, v in INDO_TO_ENG.items() if v == day_eng][0]
-            by_day[day_name].append(f"  - {time_val} {subject}")
-        
-        lines = []
-        for day in ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]:
-            if day in by_day:
-                lines.append(f"**{day}:**")
-                lines.extend(by_day[day])
-        
+    # Jangan kirim password/PIN/OTP dll ke Groq. Yang diblok hanya keyword yang
+    # diikuti nilai ("pin: 1234"), pertanyaan seperti "apa itu OTP?" tetap lewat.
+    secrets = sensitive_filter.find_secrets(user_message)
+    if secrets:
+        log_command_usage(message.author.id, "ai_chat_sensitive_blocked")
         await message.reply(
-            f"📅 Jadwal Lengkap:\n" + "\n".join(lines),
+            f"🔒 Pesan kamu sepertinya berisi data sensitif (terdeteksi: '{', '.join(secrets)}'), "
+            "jadi tidak aku teruskan ke AI. Hapus datanya lalu tanya lagi ya!",
             mention_author=False,
         )
         return
 
-    # Check untuk search by mata kuliah
-    matkul_search = re.match(r"(?i)^jadwal\s+(.+)$", user_message)
-    if matkul_search:
-        query = matkul_search.group(1).strip()
-        
-        # Cek apakah query adalah hari
-        day_query = query.capitalize()
-        if day_query == "Hari ini":
-            day_eng = datetime.now(WIB).strftime("%A").lower()
-            day_name = [k for k, v in INDO_TO_ENG.items() if v == day_eng][0]
-            data = database.get_schedule_for_day(day_eng)
-            if not data:
-                await message.reply(f"Gak ada jadwal buat hari {day_name}.", mention_author=False)
-                return
-            lines = [f"- {t_val} {sub}" for t_val, sub in data]
-            await message.reply(
-                f"📅 Jadwal {day_name}:\n" + "\n".join(lines),
-                mention_author=False,
-            )
-            return
-        elif day_query in INDO_TO_ENG:
-            day_eng = INDO_TO_ENG[day_query]
-            data = database.get_schedule_for_day(day_eng)
-            if not data:
-                await message.reply(f"Gak ada jadwal buat hari {day_query}.", mention_author=False)
-                return
-            lines = [f"- {t_val} {sub}" for t_val, sub in data]
-            await message.reply(
-                f"📅 Jadwal {day_query}:\n" + "\n".join(lines),
-                mention_author=False,
-            )
-            return
-        
-        # Kalau bukan hari, cari by subject
-        results = database.search_schedule_by_subject(query)
-        if not results:
-            await message.reply(
-                f"Gak ada jadwal yang cocok dengan '{query}'.",
-                mention_author=False,
-            )
-            return
-        
-        lines = []
-        for day_eng, time_val, subject in results:
-            day_name = [k for k, v in INDO_TO_ENG.items() if v == day_eng][0]
-            lines.append(f"- {day_name} {time_val} | {subject}")
-        
-        await message.reply(
-            f"📅 Jadwal '{query}':\n" + "\n".join(lines),
-            mention_author=False,
-        )
+    # Rate limiting check
+    decision = rate_limiter.check(message.author.id, message.channel.id)
+    if not decision.allowed:
+        await message.reply(rate_limit_text(decision), mention_author=False)
         return
 
-    # Default: lihat jadwal hari ini
-    if re.match(r"(?i)^(lihat|cek)?\s*jadwal$", user_message):
-        day_eng = datetime.now(WIB).strftime("%A").lower()
-        day_name = [k for k, v in INDO_TO_ENG.items() if v == day_eng][0]
-        data = database.get_schedule_for_day(day_eng)
-        if not data:
-            await message.reply(f"Gak ada jadwal buat hari {day_name}.", mention_author=False)
-            return
-        lines = [f"- {t_val} {sub}" for t_val, sub in data]
-        await message.reply(
-            f"📅 Jadwal {day_name}:\n" + "\n".join(lines),
-            mention_author=False,
-        )
-        return
+    ai_started = time.perf_counter()
+    async with message.channel.typing():
+        try:
+            # Log aktivitas ke terminal Azure kamu
+            print(f"[LOG] {message.author} bertanya: {user_message}")
+            log_command_usage(int(message.author.id), "ai_chat")
 
-    # Hapus jadwal by mata kuliah
-    schedule_remove = re.match(
-        r"(?i)^(hapus|delete|remove)\s+jadwal\s+(.+)$",
-        user_message,
-    )
-    if schedule_remove:
-        subject_query = schedule_remove.group(2).strip()
-        results = database.search_schedule_by_subject(subject_query)
-        if not results:
-            await message.reply(
-                f"❌ Tidak ada jadwal yang cocok dengan '{subject_query}'.",
-                mention_author=False,
+            # Inject database context untuk AI (jadwal dan personality dari cache,
+            # reminder user dalam satu query, lihat chat_context.py)
+            chat_context = await build_chat_context(
+                schedule_cache,
+                personality_registry,
+                message.author.id,
+                GROQ_SYSTEM_PROMPT,
+                question=user_message,
+                now=datetime.now(WIB),
+                token_budget=GROQ_CONTEXT_TOKEN_BUDGET,
             )
-            return
-        
-        # Hapus semua yang cocok
-        count = database.delete_schedule_by_subject(subject_query)
-        log_command_usage(message.author.id, "delete_schedule")
-        await message.reply(
-            f"✅ Berhasil menghapus {count} jadwal dengan kata kunci '{subject_query}'.",
-            mention_author=False,
-        )
-        return
-
-    reminder_add = re.match(
-        r"(?i)^(tambah|add|buat|pasang)\s+reminder\s+(\S+)\s+(.+)$",
-        user_message,
-    )
-    if not reminder_add:
-        reminder_add = re.match(r"(?i)^ingatkan\s+(\S+)\s+(.+)$", user_message)
 
-    if reminder_add:
-        duration_str = reminder_add.group(2).strip()
-        reminder_message = reminder_add.group(3).strip()
-        
-        # Check sensitive data
-        is_sensitive, keyword = contains_sensitive_data(reminder_message)
-        if is_sensitive:
-            await message.reply(
-                f"❌ Tidak dapat menyimpan data sensitif (terdeteksi: '{keyword}'). Jaga privasi kamu ya!",
-                mention_author=False,
+            # Riwayat obrolan user di channel ini (giliran terbaru, dibatasi token)
+            conversation_key = (message.channel.id, message.author.id)
+            history = conversations.history(conversation_key)
+            ai_messages = [
+                {"role": "system", "content": chat_context.system_prompt},
+                {"role": "system", "content": f"[DATA DARI DATABASE]\n{chat_context.data_block}"},
+                *history,
+                {"role": "user", "content": user_message},
+            ]
+            print(
+                f"[AI] Estimasi prompt ~{estimate_prompt_tokens(ai_messages)} token "
+                f"(data {chat_context.data_tokens}, riwayat {len(history) // 2} giliran)"
             )
-            return
-        
-        seconds = parse_duration_to_seconds(duration_str)
-        if seconds <= 0:
-            await message.reply(
-                "❌ Format waktu salah. Contoh: 1h30m, 2d, 45m, 10s.",
-                mention_author=False,
-            )
-            return
-        remind_at = int(time.time()) + seconds
-        database.add_reminder(message.author.id, remind_at, reminder_message)
-        log_command_usage(message.author.id, "add_reminder")
-        await message.reply("✅ Reminder berhasil ditambahkan.", mention_author=False)
-        return
-
-    reminder_list = re.match(
-        r"(?i)^(lihat|cek)\s+reminder(s)?(\s+saya)?$",
-        user_message,
-    )
-    if reminder_list or user_message.lower() in {"reminder saya", "daftar reminder", "list reminder"}:
-        reminders = database.get_user_reminders(int(message.author.id), limit=5)
-        if not reminders:
-            await message.reply("Belum ada reminder aktif.", mention_author=False)
-            return
-        lines = []
-        for reminder_id, remind_at, reminder_message in reminders:
-            time_str = datetime.fromtimestamp(int(remind_at)).strftime("%d-%m %H:%M")
-            lines.append(f"- {time_str} | {reminder_message}")
-        await message.reply(
-            "⏰ Reminder kamu:\n" + "\n".join(lines),
-            mention_author=False,
-        )
-        return
 
-    # Hapus semua reminder user
-    reminder_delete = re.match(
-        r"(?i)^(hapus|delete|clear)\s+(semua\s+)?reminder(s)?$",
-        user_message,
-    )
-    if reminder_delete:
-        count = database.delete_all_user_reminders(message.author.id)
-        log_command_usage(message.author.id, "delete_reminders")
-        if count > 0:
+            if history:
+                # Jawaban tergantung riwayat, jadi tidak lewat cache jawaban
+                ai_response, complete = await answer_ai(message, ai_messages)
+            else:
+                # Yang pertama (miss) menjawab lewat Groq; pertanyaan sama yang datang
+                # bersamaan / dalam GROQ_CACHE_TTL detik pakai jawaban itu
+                cache_key = response_cache.make_key(
+                    chat_context.personality_id,
+                    user_message,
+                    data_version(chat_context.system_prompt, chat_context.data_block),
+                )
+                (ai_response, complete), source = await response_cache.get_or_compute(
+                    cache_key,
+                    lambda: answer_ai(message, ai_messages),
+                    cacheable=lambda result: result[1],
+                )
+                if source != "miss":
+                    print(f"[AI] Jawaban dari cache ({source})")
+                    if ai_response:
+                        await reply_ai_text(message, ai_response)
+                    else:
+                        await message.reply("❌ Groq tidak mengembalikan respons.", mention_author=False)
+
+            # Jawaban terpotong / kosong (teks berisi penanda UI) tidak disimpan sebagai riwayat
+            if complete:
+                conversations.add(conversation_key, user_message, ai_response)
+
+        except Overloaded as e:
+            print(f"[GROQ] Load shedding: {e}")
             await message.reply(
-                f"✅ Berhasil menghapus {count} reminder.",
+                "🚦 Wah, AI lagi rame banget nih. Coba tanya lagi sebentar ya!",
                 mention_author=False,
             )
-        else:
+        except RateLimitError:
+            print("[GROQ] Masih kena rate limit setelah retry")
             await message.reply(
-                "❌ Tidak ada reminder aktif untuk dihapus.",
+                "🚦 AI lagi rame (limit Groq tercapai), coba tanya lagi sebentar ya!",
                 mention_author=False,
             )
-        return
-
-    # Jawab pertanyaan waktu secara deterministik
-    time_pattern = r"\b(jam|pukul|waktu|time)\b"
-    if re.search(time_pattern, user_message, re.IGNORECASE):
-        now = datetime.now(WIB).strftime("%H:%M")
-        await message.reply(f"Sekarang pukul {now} WIB.", mention_author=False)
-        return
-
-    # Help/Bantuan - berikan list command sesuai role user
-    help_pattern = r"(?i)^(help|bantuan|perintah|command)(\s+(apa|yang|tersedia))?(\s+saja)?$"
-    if re.match(help_pattern, user_message) or "bisa apa" in user_message.lower() or "command apa" in user_message.lower():
-        is_admin = message.author.guild_permissions.administrator if message.guild else False
-        
-        help_text = "📖 **Perintah yang Bisa Kamu Gunakan**\n\n"
-        
-        # Text commands (semua user)
-        help_text += "**📝 Text Commands (lewat chat):**\n"
-        help_text += "• `tambah jadwal [Hari] [HH:MM] [Mata Kuliah]` - Tambah jadwal kuliah\n"
-        help_text += "• `jadwal` - Lihat jadwal hari ini\n"
-        help_text += "• `jadwal [Hari]` - Lihat jadwal hari tertentu (contoh: jadwal Senin)\n"
-        help_text += "• `jadwal [Matkul]` - Cari jadwal mata kuliah (contoh: jadwal Matdis)\n"
-        help_text += "• `jadwal semua` - Lihat semua jadwal\n"
-        help_text += "• `hapus jadwal [Matkul]` - Hapus jadwal by mata kuliah\n"
-        help_text += "• `tambah reminder [durasi] [pesan]` - Buat reminder (contoh: tambah reminder 1h30m belajar)\n"
-        help_text += "• `lihat reminder` - Lihat reminder kamu\n"
-        help_text += "• `hapus reminder` - Hapus semua reminder kamu\n"
-        help_text += "• `jam` / `waktu` - Cek waktu sekarang\n"
-        help_text += "• Tanya apa saja ke AI - Chat bebas dengan AI asisten IS 1\n\n"
-        
-        # Slash commands untuk semua user
-        help_text += "**⚡ Slash Commands (untuk semua):**\n"
-        help_text += "• `/isschedule [hari]` - Lihat jadwal kuliah\n"
-        help_text += "• `/isremind` - Pasang reminder pribadi (via form)\n"
-        help_text += "• `/ishelp` - Daftar perintah lengkap\n"
-        help_text += "• `/ping` - Cek latensi bot\n\n"
-        
-        # Admin commands
-        if is_admin:
-            help_text += "**🔐 Admin Commands (khusus admin):**\n"
-            help_text += "• `/isinfo [pesan]` - Kirim pengumuman dengan tag role SI-1\n"
-            help_text += "• `/isaddschedule` - Tambah jadwal kuliah (via form)\n"
-            help_text += "• `/isremovetime [hari] [jam]` - Hapus jadwal jam tertentu\n"
-            help_text += "• `/isclearschedule [hari]` - Hapus semua jadwal di hari tertentu\n"
-            help_text += "• `/isannounce` - Kirim pesan ke channel lain (via form)\n\n"
-        
-        help_text += "💡 **Tips:** Mention aku (@bot) atau reply pesan aku untuk chat!"
-        
-        await message.reply(help_text, mention_author=False)
-        return
-
-    # Rate limiting check
-    user_id = message.author.id
-    current_time = time.time()
-    if user_id in user_cooldowns:
-        time_since_last = current_time - user_cooldowns[user_id]
-        if time_since_last < AI_COOLDOWN_SECONDS:
-            remaining = AI_COOLDOWN_SECONDS - time_since_last
+        except asyncio.TimeoutError:
+            print(f"[ERROR] Groq timeout setelah {GROQ_TIMEOUT} detik")
             await message.reply(
-                f"⏳ Tunggu {remaining:.1f} detik sebelum bertanya lagi ya!",
+                "⌛ AI lagi lambat merespons, coba tanya lagi sebentar ya.",
                 mention_author=False,
             )
-            return
-    
-    user_cooldowns[user_id] = current_time
-
-    async with message.channel.typing():
-        try:
-            # Log aktivitas ke terminal Azure kamu
-            print(f"[LOG] {message.author} bertanya: {user_message}")
-            log_command_usage(int(message.author.id), "ai_chat")
-
-            # Inject database context untuk AI
-            db_context = []
-            
-            # Ambil semua jadwal dari database
-            all_schedules = database.get_all_schedules()
-            if all_schedules:
-                schedule_lines = []
-                for day_eng, time_val, subject in all_schedules:
-                    day_name = [k for k, v in INDO_TO_ENG.items() if v == day_eng][0]
-                    schedule_lines.append(f"{day_name} {time_val}: {subject}")
-                db_context.append(f"Jadwal kuliah yang tersimpan:\n" + "\n".join(schedule_lines))
-            else:
-                db_context.append("Jadwal kuliah: BELUM ADA (database kosong)")
-            
-            # Ambil reminder user
-            user_reminders = database.get_user_reminders(message.author.id, limit=3)
-            if user_reminders:
-                reminder_lines = []
-                for reminder_id, remind_at, reminder_msg in user_reminders:
-                    time_str = datetime.fromtimestamp(int(remind_at)).strftime("%d-%m %H:%M")
-                    reminder_lines.append(f"{time_str}: {reminder_msg}")
-                db_context.append(f"Reminder user ini:\n" + "\n".join(reminder_lines))
-            else:
-                db_context.append("Reminder user ini: BELUM ADA")
-            
-            context_message = "\n\n".join(db_context)
-
-            # Get user's personality preference
-            user_personality_id = database.get_user_personality(message.author.id)
-            user_personality = database.get_personality(user_personality_id) or GROQ_SYSTEM_PROMPT
-
-            response = client.chat.completions.create(
-                model=GROQ_MODEL,
-                temperature=GROQ_TEMPERATURE,
-                max_tokens=GROQ_MAX_TOKENS,
-                messages=[
-                    {"role": "system", "content": user_personality},
-                    {"role": "system", "content": f"[DATA DARI DATABASE]\n{context_message}"},
-                    {"role": "user", "content": user_message},
-                ],
-            )
-            ai_response = response.choices[0].message.content or ""
-
-            if not ai_response:
-                await message.reply("❌ Groq tidak mengembalikan respons.", mention_author=False)
-                return
-
-            # Split response jika > 2000 karakter
-            if len(ai_response) > 2000:
-                for i in range(0, len(ai_response), 2000):
-                    await message.reply(ai_response[i:i+2000], mention_author=False)
-            else:
-                await message.reply(ai_response, mention_author=False)
-
         except Exception as e:
             print(f"[ERROR] {str(e)}")
             await message.reply(f"❌ Error: {str(e)}", mention_author=False)
+    metrics.INTENT_SECONDS.labels("ai_chat").observe(time.perf_counter() - ai_started)
 
 
 # --- MODALS (AnnounceModal, ScheduleModal, RemindModal tetap sama) ---
@@ -1047,7 +1152,7 @@ async def on_message(message: discord.Message):
 @bot.slash_command(name="personality", description="Lihat semua personality AI yang tersedia")
 async def personality_list(ctx):
     """List all available personalities"""
-    personalities = database.get_all_personalities()
+    personalities = personality_registry.all()
     if not personalities:
         await ctx.respond("Belum ada personality yang tersedia.", ephemeral=True)
         return
@@ -1058,10 +1163,10 @@ async def personality_list(ctx):
         color=discord.Color.blue()
     )
     
-    for personality_id, name, description, emoji in personalities:
+    for p in personalities:
         embed.add_field(
-            name=f"{emoji} {name}",
-            value=f"`{personality_id}`\n{description}",
+            name=f"{p.emoji} {p.name}",
+            value=f"`{p.id}`\n{p.description}",
             inline=False
         )
     
@@ -1071,50 +1176,209 @@ async def personality_list(ctx):
 @bot.slash_command(name="set_personality", description="Pilih personality AI kesukaan kamu")
 async def set_personality(ctx, personality: str):
     """Set user's personality preference"""
-    personalities = database.get_all_personalities()
-    valid_ids = [p[0] for p in personalities]
+    personality_data = personality_registry.get(personality)
     
-    if personality.lower() not in valid_ids:
-        available = ", ".join([f"`{p[0]}`" for p in personalities])
+    if personality_data is None:
+        available = ", ".join([f"`{p.id}`" for p in personality_registry.all()])
         await ctx.respond(
             f"❌ Personality '{personality}' tidak ada.\n\nYang tersedia: {available}",
             ephemeral=True
         )
         return
     
-    database.set_user_personality(int(ctx.author.id), personality.lower())
+    await personality_registry.set_user_personality(int(ctx.author.id), personality_data.id)
     
-    # Find personality details for response
-    personality_data = next((p for p in personalities if p[0] == personality.lower()), None)
-    if personality_data:
-        name, desc, emoji = personality_data[1], personality_data[2], personality_data[3]
-        embed = discord.Embed(
-            title=f"{emoji} Personality Diubah!",
-            description=f"Kamu sekarang menggunakan personality: **{name}**\n\n{desc}",
-            color=discord.Color.green()
-        )
-        await ctx.respond(embed=embed)
+    embed = discord.Embed(
+        title=f"{personality_data.emoji} Personality Diubah!",
+        description=f"Kamu sekarang menggunakan personality: **{personality_data.name}**\n\n{personality_data.description}",
+        color=discord.Color.green()
+    )
+    await ctx.respond(embed=embed)
 
 
 @bot.slash_command(name="my_personality", description="Lihat personality AI kamu yang sekarang")
 async def my_personality(ctx):
     """Check current user's personality"""
-    user_personality_id = database.get_user_personality(int(ctx.author.id))
-    personalities = database.get_all_personalities()
-    
-    personality_data = next((p for p in personalities if p[0] == user_personality_id), None)
+    personality_data = await personality_registry.user_personality(int(ctx.author.id))
     
     if personality_data:
-        personality_id, name, description, emoji = personality_data
         embed = discord.Embed(
             title=f"😎 Personality Kamu Sekarang",
-            description=f"{emoji} **{name}**\n\n{description}",
+            description=f"{personality_data.emoji} **{personality_data.name}**\n\n{personality_data.description}",
             color=discord.Color.purple()
         )
-        embed.add_field(name="ID", value=f"`{personality_id}`", inline=False)
+        embed.add_field(name="ID", value=f"`{personality_data.id}`", inline=False)
         embed.set_footer(text="Ketik /set_personality untuk mengubah")
         await ctx.respond(embed=embed)
     else:
         await ctx.respond("❌ Personality kamu tidak ditemukan.", ephemeral=True)
 
-bot.run(BOT_TOKEN)
\ No newline at end of file
+
+@bot.slash_command(name="reset_chat", description="Lupakan riwayat obrolan AI kamu di channel ini")
+async def reset_chat(ctx):
+    """Hapus riwayat obrolan AI user di channel ini"""
+    if conversations.clear((ctx.channel.id, ctx.author.id)):
+        await ctx.respond("🧹 Riwayat obrolan kamu di channel ini sudah dihapus. Mulai dari awal ya!", ephemeral=True)
+    else:
+        await ctx.respond("Belum ada riwayat obrolan di channel ini.", ephemeral=True)
+
+
+# --- STATISTIK PENGGUNAAN ---
+
+@bot.slash_command(name="isstats", description="Lihat statistik penggunaan bot")
+async def usage_stats(ctx):
+    """Statistik dari tabel rollup analytics (tanpa scan analytics.log)"""
+    await usage_analytics.flush()
+    today = datetime.now(WIB).strftime("%Y-%m-%d")
+    stats = await async_db.get_usage_stats(today, int(ctx.author.id))
+
+    embed = discord.Embed(
+        title="📊 Statistik Penggunaan",
+        description=f"Total semua command: **{stats['total']}**",
+        color=discord.Color.teal(),
+        timestamp=datetime.now(WIB)
+    )
+    today_total = sum(count for _, count in stats["today"])
+    today_lines = [f"`{command}` × {count}" for command, count in stats["today"][:5]]
+    embed.add_field(
+        name=f"📅 Hari Ini ({today_total})",
+        value="\n".join(today_lines) or "Belum ada",
+        inline=False
+    )
+    top_lines = [f"`{command}` × {count}" for command, count, _ in stats["top_commands"]]
+    embed.add_field(name="🔥 Command Terpopuler", value="\n".join(top_lines) or "Belum ada", inline=True)
+    user_lines = [f"`{command}` × {count}" for command, count in stats["user"]]
+    embed.add_field(name="🙋 Command Kamu", value="\n".join(user_lines) or "Belum ada", inline=True)
+    intent_lines = [f"`{name}` × {count}" for name, count in intent_router.stats()[:5]]
+    embed.add_field(name="🧭 Intent Pesan (sejak bot start)", value="\n".join(intent_lines) or "Belum ada", inline=False)
+    cache_stats = response_cache.stats()
+    embed.add_field(
+        name="🧠 Cache Jawaban AI",
+        value=(
+            f"Hit {cache_stats['hits']} • Gabung {cache_stats['coalesced']} • Miss {cache_stats['misses']}\n"
+            f"Hemat {cache_stats['hit_rate']:.0%} request Groq • {cache_stats['entries']} entry"
+        ),
+        inline=False
+    )
+    queue_stats = groq_scheduler.stats()
+    embed.add_field(
+        name="🚥 Antrian Groq",
+        value=(
+            f"Jalan {queue_stats['active']}/{GROQ_MAX_CONCURRENCY} • Antri {queue_stats['queued']} • "
+            f"Tunggu rata-rata {queue_stats['avg_wait']:.1f}s (p95 {queue_stats['p95_wait']:.1f}s)\n"
+            f"Selesai {queue_stats['completed']} • Retry 429 {queue_stats['retries']} • Ditolak (rame) {queue_stats['shed']}"
+        ),
+        inline=False
+    )
+    limit_stats = rate_limiter.stats()
+    denied = ", ".join(f"{scope} {count}" for scope, count in limit_stats["denied"].items()) or "belum ada"
+    embed.add_field(
+        name="🚦 Rate Limit AI",
+        value=(
+            f"Ditolak: {denied}\n"
+            f"Token kamu hari ini: {rate_limiter.tokens_used(ctx.author.id)}"
+            + (f"/{AI_DAILY_TOKEN_BUDGET}" if AI_DAILY_TOKEN_BUDGET else "")
+        ),
+        inline=False
+    )
+    await ctx.respond(embed=embed)
+
+
+# --- ADMIN: REMINDER DEAD LETTER ---
+
+def is_admin_ctx(ctx):
+    return ctx.author.guild_permissions.administrator if ctx.guild else False
+
+
+@bot.slash_command(name="isdeadletters", description="[Admin] Lihat reminder yang gagal terkirim")
+async def dead_letters(ctx, jumlah: int = 10):
+    """List reminder yang masuk dead letter"""
+    if not is_admin_ctx(ctx):
+        await ctx.respond("❌ Command ini khusus admin.", ephemeral=True)
+        return
+
+    rows = await async_db.get_dead_letters(limit=max(1, min(jumlah, 25)))
+    total = await async_db.count_dead_letters()
+    if not rows:
+        await ctx.respond("✅ Tidak ada reminder yang gagal terkirim.", ephemeral=True)
+        return
+
+    embed = discord.Embed(
+        title="📭 Reminder Gagal Terkirim",
+        description=f"Menampilkan {len(rows)} dari {total} reminder",
+        color=discord.Color.orange()
+    )
+    for reminder_id, user_id, remind_at, reminder_msg, attempts, error, failed_at in rows:
+        failed_str = datetime.fromtimestamp(int(failed_at), WIB).strftime("%d-%m %H:%M")
+        embed.add_field(
+            name=f"#{reminder_id} • User {user_id} • {failed_str}",
+            value=f"{reminder_msg[:200]}\n`{attempts}x` {error[:200]}",
+            inline=False
+        )
+    await ctx.respond(embed=embed, ephemeral=True)
+
+
+# --- ADMIN: KEYWORD SENSITIF ---
+
+@bot.slash_command(name="issensitive", description="[Admin] Kelola keyword data sensitif (lihat/tambah/hapus)")
+async def sensitive_keywords(ctx, aksi: str = "lihat", keyword: str = ""):
+    """Lihat, tambah, atau hapus keyword sensitif tambahan"""
+    if not is_admin_ctx(ctx):
+        await ctx.respond("❌ Command ini khusus admin.", ephemeral=True)
+        return
+
+    aksi = aksi.lower()
+    keyword = " ".join(keyword.lower().split())
+    if aksi in ("tambah", "hapus") and not keyword:
+        await ctx.respond("❌ Isi keyword-nya dulu. Contoh: `/issensitive tambah nomor hp`", ephemeral=True)
+        return
+
+    if aksi == "tambah":
+        added = await async_db.add_sensitive_keyword(keyword, int(ctx.author.id))
+        sensitive_filter.add(keyword)
+        await ctx.respond(
+            f"✅ Keyword '{keyword}' ditambahkan." if added else f"ℹ️ Keyword '{keyword}' sudah ada.",
+            ephemeral=True
+        )
+    elif aksi == "hapus":
+        if keyword in sensitive_filter.defaults:
+            await ctx.respond(f"❌ '{keyword}' keyword bawaan, tidak bisa dihapus.", ephemeral=True)
+            return
+        removed = await async_db.remove_sensitive_keyword(keyword)
+        sensitive_filter.remove(keyword)
+        await ctx.respond(
+            f"✅ Keyword '{keyword}' dihapus." if removed else f"❌ Keyword '{keyword}' tidak ditemukan.",
+            ephemeral=True
+        )
+    elif aksi == "lihat":
+        custom = sorted(sensitive_filter.custom)
+        embed = discord.Embed(
+            title="🔐 Keyword Data Sensitif",
+            description=f"Total {len(sensitive_filter.keywords)} keyword aktif",
+            color=discord.Color.red()
+        )
+        embed.add_field(name="Bawaan", value=", ".join(sensitive_filter.defaults)[:1024], inline=False)
+        embed.add_field(name="Tambahan Admin", value=", ".join(custom)[:1024] or "Belum ada", inline=False)
+        await ctx.respond(embed=embed, ephemeral=True)
+    else:
+        await ctx.respond("❌ Aksi tidak valid. Gunakan: `lihat`, `tambah`, atau `hapus`.", ephemeral=True)
+
+
+async def shutdown():
+    """Flush log, tutup koneksi Discord, lalu selesaikan write database yang masih antri"""
+    await reminder_scheduler.stop()
+    await metrics_server.stop()
+    await log_sink.close()
+    await usage_analytics.close()
+    if not bot.is_closed():
+        await bot.close()
+    await async_db.close()
+
+
+if __name__ == "__main__":
+    try:
+        bot.loop.run_until_complete(bot.start(BOT_TOKEN))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bot.loop.run_until_complete(shutdown())
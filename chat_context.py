@@ -0,0 +1,170 @@
+"""Penyusun konteks database untuk AI chat.
+
+Blok `[DATA DARI DATABASE]` terdiri dari dua bagian:
+- jadwal kuliah: hanya bagian yang relevan dengan pertanyaan (hari yang
+  disebut, "hari ini"/"besok", atau mata kuliah yang cocok). Kalau tidak ada
+  yang relevan, pakai ringkasan per hari. Teks yang sama untuk semua user
+  di-cache per versi data jadwal lewat ScheduleCache.render().
+- reminder user: satu query lewat covering index idx_reminders_user;
+  personality user diambil dari PersonalityRegistry (di memori)
+
+Total blok dibatasi token_budget (estimasi kasar ~4 karakter per token).
+"""
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import async_db
+from schedule_cache import DAY_ORDER, ENG_TO_INDO, INDO_TO_ENG
+
+ChatContext = namedtuple("ChatContext", "personality_id system_prompt data_block data_tokens")
+
+REMINDER_LIMIT = 3
+DEFAULT_TOKEN_BUDGET = 600
+
+_DAY_WORDS = {indo.lower(): eng for indo, eng in INDO_TO_ENG.items()}
+_DAY_WORDS.update({eng: eng for eng in DAY_ORDER})
+_DAY_WORDS.update({"jum'at": "friday", "ahad": "sunday"})
+# "minggu ini/depan/lalu/ke-2" artinya pekan, bukan hari Minggu. Hari lain tetap
+# cocok walaupun diikuti ini/depan/lalu ("senin ini", "rabu depan", "kamis lalu").
+_WEEK_SENSE = r"(?!\s+(?:ini|depan|lalu|kemarin|ke\s*-?\s*\d))"
+_DAY_PATTERN = re.compile(
+    r"\b(" + "|".join(
+        re.escape(w) + (_WEEK_SENSE if w == "minggu" else "")
+        for w in sorted(_DAY_WORDS, key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE,
+)
+_RELATIVE_DAYS = {"hari ini": 0, "sekarang": 0, "today": 0, "besok": 1, "tomorrow": 1, "lusa": 2, "kemarin": -1}
+_RELATIVE_PATTERN = re.compile(r"\b(" + "|".join(_RELATIVE_DAYS) + r")\b", re.IGNORECASE)
+_WEEK_PATTERN = re.compile(r"\b(minggu ini|seminggu|pekan ini|semua jadwal|jadwal (?:semua|lengkap))\b", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = {
+    "jadwal", "kuliah", "matkul", "kelas", "apa", "aja", "saja", "ada", "yang", "kapan", "jam", "hari",
+    "ini", "itu", "besok", "lusa", "aku", "saya", "kamu", "gue", "dong", "sih", "nggak", "gak", "tidak",
+    "dan", "atau", "untuk", "dari", "dengan", "berapa", "mana", "gimana", "bagaimana", "tolong", "bisa",
+    "mau", "lagi", "the", "what", "when", "schedule", "class", "reminder", "pukul", "mulai", "selesai",
+}
+
+
+def estimate_tokens(text):
+    """Estimasi kasar jumlah token (~4 karakter per token)"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def estimate_prompt_tokens(messages):
+    """Estimasi token prompt untuk list message Groq (+4 token overhead per message)"""
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+
+def detect_days(question, now):
+    """Hari (english, lowercase) yang disebut di pertanyaan, urut kemunculan"""
+    days = []
+    for match in _RELATIVE_PATTERN.finditer(question):
+        day = (now + timedelta(days=_RELATIVE_DAYS[match.group(1).lower()])).strftime("%A").lower()
+        if day not in days:
+            days.append(day)
+    for match in _DAY_PATTERN.finditer(question):
+        day = _DAY_WORDS[match.group(1).lower()]
+        if day not in days:
+            days.append(day)
+    return days
+
+
+def match_subjects(cache, question):
+    """Baris jadwal yang nama mata kuliahnya cocok dengan kata di pertanyaan"""
+    words = [w for w in _WORD_PATTERN.findall(question.lower()) if w not in _STOPWORDS and w not in _DAY_WORDS]
+    if not words:
+        return []
+    return [row for row in cache.rows if any(w in row[2].lower() for w in words)]
+
+
+def _fit(header, lines, budget):
+    """Gabung header + lines sebanyak yang muat di budget token"""
+    text = header
+    for i, line in enumerate(lines):
+        candidate = f"{text}\n{line}"
+        if estimate_tokens(candidate) > budget:
+            return f"{text}\n... (+{len(lines) - i} lagi)"
+        text = candidate
+    return text
+
+
+def render_schedule_block(cache):
+    """Bagian jadwal lengkap dari blok data (di-cache per versi jadwal)"""
+    def build():
+        if not cache.rows:
+            return "Jadwal kuliah: BELUM ADA (database kosong)"
+        schedule_lines = [
+            f"{ENG_TO_INDO[day_eng]} {time_val}: {subject}"
+            for day_eng, time_val, subject in cache.rows
+        ]
+        return f"Jadwal kuliah yang tersimpan:\n" + "\n".join(schedule_lines)
+    return cache.render(("ai_context",), build)
+
+
+def render_schedule_summary(cache):
+    """Ringkasan jadwal per hari (tanpa jam), dipakai kalau tidak ada yang relevan"""
+    def build():
+        lines = [
+            f"{ENG_TO_INDO[day_eng]} ({len(entries)}): " + ", ".join(subject for _, subject in entries)
+            for day_eng, entries in cache.by_day.items()
+        ]
+        return "Ringkasan jadwal kuliah (tanya hari/mata kuliah tertentu untuk jam detail):\n" + "\n".join(lines)
+    return cache.render(("ai_summary",), build)
+
+
+def select_schedule_block(cache, question, now, budget):
+    """Pilih bagian jadwal yang relevan dengan pertanyaan, maksimal `budget` token"""
+    if not cache.rows:
+        return render_schedule_block(cache)
+
+    days = detect_days(question, now)
+    subject_rows = match_subjects(cache, question)
+    if days or subject_rows:
+        lines = []
+        for day_eng in days:
+            entries = cache.day(day_eng)
+            if entries:
+                lines.extend(f"{ENG_TO_INDO[day_eng]} {time_val}: {subject}" for time_val, subject in entries)
+            else:
+                lines.append(f"{ENG_TO_INDO[day_eng]}: TIDAK ADA JADWAL")
+        lines.extend(
+            f"{ENG_TO_INDO[day_eng]} {time_val}: {subject}"
+            for day_eng, time_val, subject in subject_rows
+            if day_eng not in days
+        )
+        return _fit("Jadwal kuliah yang relevan:", lines, budget)
+
+    full = render_schedule_block(cache)
+    if _WEEK_PATTERN.search(question) and estimate_tokens(full) <= budget:
+        return full
+    summary = render_schedule_summary(cache)
+    if estimate_tokens(summary) <= budget:
+        return summary
+    header, *lines = summary.split("\n")
+    return _fit(header, lines, budget)
+
+
+def render_reminder_block(user_reminders):
+    if not user_reminders:
+        return "Reminder user ini: BELUM ADA"
+    reminder_lines = [
+        f"{datetime.fromtimestamp(int(remind_at)).strftime('%d-%m %H:%M')}: {reminder_msg}"
+        for remind_at, reminder_msg in user_reminders
+    ]
+    return f"Reminder user ini:\n" + "\n".join(reminder_lines)
+
+
+async def build_chat_context(schedule_cache, personalities, user_id, default_prompt, question="", now=None,
+                             token_budget=DEFAULT_TOKEN_BUDGET):
+    """Susun personality + blok data database untuk satu AI chat"""
+    cache = await schedule_cache.refresh()
+    personality_id = await personalities.user_personality_id(user_id)
+    system_prompt = personalities.prompt(personality_id)
+    user_reminders = await async_db.get_user_reminders(user_id, limit=REMINDER_LIMIT)
+    reminder_block = render_reminder_block([(remind_at, msg) for _, remind_at, msg in user_reminders])
+    schedule_budget = max(0, token_budget - estimate_tokens(reminder_block))
+    schedule_block = select_schedule_block(cache, question, now or datetime.now(), schedule_budget)
+    data_block = schedule_block + "\n\n" + reminder_block
+    return ChatContext(personality_id, system_prompt or default_prompt, data_block, estimate_tokens(data_block))
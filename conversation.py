@@ -0,0 +1,96 @@
+"""Riwayat obrolan AI per user per channel.
+
+Tiap percakapan adalah ring buffer (deque dengan maxlen) berisi pasangan
+pertanyaan-jawaban beserta estimasi tokennya, jadi pertanyaan lanjutan seperti
+"terus yang hari Rabu?" punya konteks tanpa user mengulang pertanyaannya.
+history() hanya mengambil giliran terbaru yang muat di `token_budget`.
+
+Percakapan yang idle lebih dari `idle_ttl` detik dibuang, dan jumlah
+percakapan dibatasi `max_conversations` (LRU), jadi memori tetap terbatas
+walaupun yang chat ribuan user.
+"""
+import time
+from collections import OrderedDict, deque, namedtuple
+
+from chat_context import estimate_tokens
+
+Turn = namedtuple("Turn", "question answer tokens")
+
+# Overhead token per message di prompt (role, pemisah)
+MESSAGE_OVERHEAD = 4
+
+
+class ConversationStore:
+    """Ring buffer giliran chat per key (channel_id, user_id) dengan eviction LRU + TTL"""
+
+    def __init__(self, max_turns=6, token_budget=800, max_conversations=2000, idle_ttl=1800,
+                 max_turn_chars=1500, clock=time.monotonic):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.max_conversations = max_conversations
+        self.idle_ttl = idle_ttl
+        self.max_turn_chars = max_turn_chars
+        self._clock = clock
+        self._conversations = OrderedDict()   # key -> [deque[Turn], last_used]
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._conversations)
+
+    def history(self, key):
+        """Messages Groq (user/assistant) dari giliran terbaru yang muat di token_budget"""
+        self._evict()
+        entry = self._conversations.get(key)
+        if entry is None:
+            return []
+        turns = []
+        used = 0
+        for turn in reversed(entry[0]):
+            if used + turn.tokens > self.token_budget:
+                break
+            turns.append(turn)
+            used += turn.tokens
+        messages = []
+        for turn in reversed(turns):
+            messages.append({"role": "user", "content": turn.question})
+            messages.append({"role": "assistant", "content": turn.answer})
+        return messages
+
+    def add(self, key, question, answer):
+        """Simpan satu giliran tanya-jawab (teks panjang dipotong max_turn_chars)"""
+        if self.max_turns <= 0 or not answer:
+            return
+        question = question[:self.max_turn_chars]
+        answer = answer[:self.max_turn_chars]
+        tokens = estimate_tokens(question) + estimate_tokens(answer) + 2 * MESSAGE_OVERHEAD
+        entry = self._conversations.get(key)
+        if entry is None:
+            entry = self._conversations[key] = [deque(maxlen=self.max_turns), 0.0]
+        entry[0].append(Turn(question, answer, tokens))
+        entry[1] = self._clock()
+        self._conversations.move_to_end(key)
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self, key):
+        """Hapus riwayat satu percakapan, return True kalau ada"""
+        return self._conversations.pop(key, None) is not None
+
+    def _evict(self):
+        """Buang percakapan yang idle lebih dari idle_ttl (paling lama di depan)"""
+        now = self._clock()
+        while self._conversations:
+            key, (_, last_used) = next(iter(self._conversations.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._conversations[key]
+            self.evictions += 1
+
+    def stats(self):
+        self._evict()
+        return {
+            "conversations": len(self._conversations),
+            "turns": sum(len(turns) for turns, _ in self._conversations.values()),
+            "evictions": self.evictions,
+        }
@@ -1,143 +1,628 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 
 DB_NAME = "schedule.db"
 
+# Pragma untuk koneksi long-lived: WAL supaya reader tidak ketahan writer,
+# synchronous=NORMAL cukup aman di mode WAL dan jauh lebih murah dari FULL.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA busy_timeout=5000",
+)
+# Jumlah prepared statement yang di-cache per koneksi
+STATEMENT_CACHE_SIZE = 128
+
+# Satu koneksi per thread (sqlite3.Connection tidak boleh dipakai lintas thread)
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+_connect_count = 0
+# Naik setiap close_connections(), supaya thread lain tahu koneksinya sudah ditutup
+_generation = 0
+
+
+def _connect():
+    global _connect_count
+    conn = sqlite3.connect(
+        DB_NAME,
+        isolation_level=None,  # transaksi diatur manual lewat _transaction()
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    with _connections_lock:
+        _connections.append(conn)
+        _connect_count += 1
+    return conn
+
+
+def get_connection():
+    """Get koneksi persistent milik thread ini (dibuat saat pertama dipakai)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.db_name != DB_NAME or _local.generation != _generation:
+        conn = _connect()
+        _local.conn = conn
+        _local.db_name = DB_NAME
+        _local.generation = _generation
+    return conn
+
+
+def close_connections():
+    """Tutup semua koneksi yang dibuka modul ini (dipanggil saat shutdown)"""
+    global _generation
+    with _connections_lock:
+        _generation += 1
+        for conn in _connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        _connections.clear()
+
+
+def connection_stats():
+    """Jumlah connect sejak start dan koneksi yang masih terbuka"""
+    with _connections_lock:
+        return {"connects": _connect_count, "open": len(_connections)}
+
+
+@contextmanager
+def _transaction():
+    """Jalankan beberapa statement dalam satu transaksi (commit sekali).
+
+    Kalau dipanggil di dalam transaksi lain (mis. dari batch()), jadi SAVEPOINT:
+    error hanya me-rollback bagian ini, commit tetap ikut transaksi luar.
+    """
+    conn = get_connection()
+    depth = getattr(_local, "depth", 0)
+    if depth:
+        savepoint = f"sp{depth}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+    else:
+        conn.execute("BEGIN IMMEDIATE")
+        _local.on_commit = []
+    hooks_before = len(_local.on_commit)
+    _local.depth = depth + 1
+    try:
+        yield conn.cursor()
+        # COMMIT di dalam try: kalau gagal (I/O error, SQLITE_BUSY) tetap di-rollback,
+        # supaya koneksi writer tidak tertinggal di transaksi yang masih terbuka
+        conn.execute(f"RELEASE {savepoint}" if depth else "COMMIT")
+    except BaseException:
+        del _local.on_commit[hooks_before:]
+        if depth:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        elif conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        _local.depth = depth
+    if not depth:
+        # Data sudah ter-commit: hook yang error tidak boleh membuat write dianggap gagal
+        hooks, _local.on_commit = _local.on_commit, []
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                print(f"[DB ERROR] Hook setelah commit gagal: {e}")
+
+
+def _on_commit(hook):
+    """Jalankan hook setelah transaksi terluar berhasil di-commit"""
+    _local.on_commit.append(hook)
+
+
+def batch():
+    """Gabungkan beberapa write (add_reminder, delete_reminder, ...) dalam satu commit.
+
+    Contoh:
+        with database.batch():
+            database.add_schedule("monday", "08:00", "AI")
+            database.delete_reminder(12)
+    """
+    return _transaction()
+
+
+# --- SCHEDULE VERSION ---
+# Naik setiap kali tabel schedule berubah (setelah commit), dipakai cache jadwal
+# untuk tahu kapan data di memori sudah basi.
+_schedule_version = 0
+
+
+def _bump_schedule_version():
+    global _schedule_version
+    _schedule_version += 1
+
+
+def schedule_version():
+    return _schedule_version
+
+
+def _query(sql, params=()):
+    return get_connection().execute(sql, params).fetchall()
+
+
+def _query_one(sql, params=()):
+    return get_connection().execute(sql, params).fetchone()
+
 
 def init_db():
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-        c.execute(
-            """CREATE TABLE IF NOT EXISTS schedule (day_of_week TEXT, time TEXT, subject TEXT)"""
-        )
-        c.execute(
-            """CREATE TABLE IF NOT EXISTS reminders (id INTEGER PRIMARY KEY, user_id INTEGER, remind_at INTEGER, message TEXT)"""
-        )
-        c.execute(
-            """CREATE TABLE IF NOT EXISTS personalities (id TEXT PRIMARY KEY, name TEXT, description TEXT, system_prompt TEXT, emoji TEXT)"""
-        )
-        c.execute(
-            """CREATE TABLE IF NOT EXISTS user_personality (user_id INTEGER PRIMARY KEY, personality_id TEXT)"""
-        )
-        conn.commit()
+    """Jalankan migration yang belum diterapkan, siapkan index FTS, cek query plan"""
+    migrate()
+    with _transaction() as c:
+        _init_subject_index(c)
+    for name, detail in check_query_plans():
+        print(f"[DB] ⚠️ Query {name} tidak pakai index: {detail}")
+
+
+# --- MIGRATIONS ---
+# Versi schema disimpan di PRAGMA user_version. Migration ke-N membawa database
+# dari versi N-1 ke N; jangan mengubah migration yang sudah dirilis, tambahkan
+# yang baru di akhir MIGRATIONS.
+
+def _migration_1_baseline(c):
+    """Schema awal (database lama tanpa user_version juga lewat sini)"""
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS schedule (day_of_week TEXT, time TEXT, subject TEXT)"""
+    )
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS reminders (id INTEGER PRIMARY KEY, user_id INTEGER, remind_at INTEGER, message TEXT)"""
+    )
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS personalities (id TEXT PRIMARY KEY, name TEXT, description TEXT, system_prompt TEXT, emoji TEXT)"""
+    )
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS user_personality (user_id INTEGER PRIMARY KEY, personality_id TEXT)"""
+    )
+    c.execute(
+        """CREATE INDEX IF NOT EXISTS idx_reminders_remind_at ON reminders (remind_at)"""
+    )
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS usage_daily (day TEXT, command TEXT, count INTEGER, PRIMARY KEY (day, command))"""
+    )
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS usage_commands (command TEXT PRIMARY KEY, count INTEGER, last_used TEXT)"""
+    )
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS usage_users (user_id INTEGER, command TEXT, count INTEGER, PRIMARY KEY (user_id, command))"""
+    )
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS reminder_dead_letters (id INTEGER PRIMARY KEY, reminder_id INTEGER, user_id INTEGER, remind_at INTEGER, message TEXT, attempts INTEGER, error TEXT, failed_at INTEGER)"""
+    )
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS sensitive_keywords (keyword TEXT PRIMARY KEY, added_by INTEGER, added_at INTEGER)"""
+    )
+
+
+def _migration_2_keys_and_indexes(c):
+    """Primary key schedule.id + index untuk query jadwal dan reminder per user"""
+    # Tabel dibuat ulang karena SQLite tidak bisa menambah PRIMARY KEY lewat
+    # ALTER TABLE. id diisi rowid lama supaya index schedule_fts tetap sinkron;
+    # trigger FTS ikut terhapus dan dibuat lagi oleh _init_subject_index().
+    c.execute(
+        """CREATE TABLE schedule_new (id INTEGER PRIMARY KEY, day_of_week TEXT, time TEXT, subject TEXT)"""
+    )
+    c.execute(
+        """INSERT INTO schedule_new (id, day_of_week, time, subject) SELECT rowid, day_of_week, time, subject FROM schedule"""
+    )
+    c.execute("DROP TABLE schedule")
+    c.execute("ALTER TABLE schedule_new RENAME TO schedule")
+    c.execute(
+        """CREATE INDEX IF NOT EXISTS idx_schedule_day_time ON schedule (day_of_week, time)"""
+    )
+    # Covering index untuk get_user_reminders (juga dipakai konteks AI chat)
+    c.execute(
+        """CREATE INDEX IF NOT EXISTS idx_reminders_user ON reminders (user_id, remind_at, message)"""
+    )
+
+
+def _migration_3_meta(c):
+    """Tabel meta (key-value) untuk state internal, mis. hash seed personality"""
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"""
+    )
+
+
+MIGRATIONS = [
+    _migration_1_baseline,
+    _migration_2_keys_and_indexes,
+    _migration_3_meta,
+]
+
+
+def schema_version():
+    return _query_one("PRAGMA user_version")[0]
+
+
+def migrate():
+    """Terapkan migration yang belum ada di database, return versi schema akhir"""
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        with _transaction() as c:
+            # Dicek di dalam transaksi: proses lain bisa saja sudah menjalankannya
+            if c.execute("PRAGMA user_version").fetchone()[0] >= version:
+                continue
+            migration(c)
+            c.execute(f"PRAGMA user_version = {version}")
+        print(f"[DB] Migration {version}: {migration.__doc__}")
+    current = schema_version()
+    if current > len(MIGRATIONS):
+        print(f"[DB] ⚠️ Schema database versi {current}, kode ini hanya kenal sampai {len(MIGRATIONS)}")
+    return current
+
+
+# Query yang jalan terus (command user, scheduler reminder); harus pakai index.
+# Nama = fungsi yang memakainya, params hanya contoh untuk EXPLAIN QUERY PLAN.
+HOT_QUERIES = {
+    "get_schedule_for_day": (
+        "SELECT time, subject FROM schedule WHERE day_of_week = ? ORDER BY time", ("monday",)
+    ),
+    "remove_schedule": (
+        "DELETE FROM schedule WHERE day_of_week = ? AND time = ?", ("monday", "08:00")
+    ),
+    "get_due_reminders": (
+        "SELECT id, user_id, message FROM reminders WHERE remind_at <= ?", (0,)
+    ),
+    "get_pending_reminders": (
+        "SELECT id, remind_at FROM reminders WHERE remind_at > ? AND remind_at <= ?", (0, 0)
+    ),
+    "get_user_reminders": (
+        "SELECT id, remind_at, message FROM reminders WHERE user_id = ? ORDER BY remind_at LIMIT ?", (0, 5)
+    ),
+    "delete_all_user_reminders": (
+        "DELETE FROM reminders WHERE user_id = ?", (0,)
+    ),
+}
+
+
+def explain(sql, params=()):
+    """Detail EXPLAIN QUERY PLAN untuk satu query"""
+    return [row[3] for row in _query(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def check_query_plans(queries=None):
+    """Return [(nama, detail)] untuk query yang full scan atau butuh sort sementara"""
+    problems = []
+    for name, (sql, params) in (queries or HOT_QUERIES).items():
+        for detail in explain(sql, params):
+            if detail.startswith("SCAN") or "TEMP B-TREE" in detail:
+                problems.append((name, detail))
+    return problems
 
 
 def add_schedule(day, time, subject):
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    with _transaction() as c:
+        _on_commit(_bump_schedule_version)
         c.execute(
             "INSERT INTO schedule (day_of_week, time, subject) VALUES (?, ?, ?)",
             (day, time, subject),
         )
-        conn.commit()
 
 
 def get_schedule_for_day(day):
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-        c.execute(
-            "SELECT time, subject FROM schedule WHERE day_of_week = ? ORDER BY time",
-            (day.lower(),),
-        )
-        return c.fetchall()
+    return _query(
+        "SELECT time, subject FROM schedule WHERE day_of_week = ? ORDER BY time",
+        (day.lower(),),
+    )
 
 
 def remove_schedule(day, time):
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    with _transaction() as c:
+        _on_commit(_bump_schedule_version)
         c.execute(
             "DELETE FROM schedule WHERE day_of_week = ? AND time = ?",
             (day.lower(), time),
         )
-        conn.commit()
         return c.rowcount
 
 
 def clear_schedule(day):
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    with _transaction() as c:
+        _on_commit(_bump_schedule_version)
         c.execute("DELETE FROM schedule WHERE day_of_week = ?", (day.lower(),))
-        conn.commit()
         return c.rowcount
 
 
 def add_reminder(user_id, remind_at, message):
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    with _transaction() as c:
         c.execute(
             "INSERT INTO reminders (user_id, remind_at, message) VALUES (?, ?, ?)",
             (user_id, remind_at, message),
         )
-        conn.commit()
+        return c.lastrowid
 
 
 def get_due_reminders():
     import time
 
     now = int(time.time())
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-        c.execute(
-            "SELECT id, user_id, message FROM reminders WHERE remind_at <= ?", (now,)
+    return _query(
+        "SELECT id, user_id, message FROM reminders WHERE remind_at <= ?", (now,)
+    )
+
+
+def get_pending_reminders(until, after=None):
+    """Get (id, remind_at) reminder yang jatuh tempo di rentang (after, until]"""
+    if after is None:
+        return _query(
+            "SELECT id, remind_at FROM reminders WHERE remind_at <= ?", (until,)
         )
-        return c.fetchall()
+    return _query(
+        "SELECT id, remind_at FROM reminders WHERE remind_at > ? AND remind_at <= ?",
+        (after, until),
+    )
+
+
+def get_reminders_by_ids(reminder_ids):
+    """Get (id, user_id, message, remind_at) untuk id yang masih ada di database"""
+    rows = []
+    reminder_ids = list(reminder_ids)
+    # SQLite membatasi jumlah parameter per query
+    for i in range(0, len(reminder_ids), 500):
+        chunk = reminder_ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows.extend(_query(
+            f"SELECT id, user_id, message, remind_at FROM reminders WHERE id IN ({placeholders}) ORDER BY remind_at",
+            chunk,
+        ))
+    return rows
 
 
 def delete_reminder(reminder_id):
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    with _transaction() as c:
         c.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
-        conn.commit()
 
 
-def get_user_reminders(user_id, limit=5):
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+def delete_reminders(reminder_ids):
+    """Delete banyak reminder sekaligus dalam satu transaksi"""
+    with _transaction() as c:
+        c.executemany("DELETE FROM reminders WHERE id = ?", [(rid,) for rid in reminder_ids])
+        return c.rowcount
+
+
+def dead_letter_reminders(entries):
+    """Pindahkan reminder yang gagal terkirim ke tabel reminder_dead_letters.
+
+    entries: list (reminder_id, attempts, error)
+    """
+    import time
+
+    failed_at = int(time.time())
+    with _transaction() as c:
+        for reminder_id, attempts, error in entries:
+            c.execute(
+                """INSERT INTO reminder_dead_letters (reminder_id, user_id, remind_at, message, attempts, error, failed_at)
+                   SELECT id, user_id, remind_at, message, ?, ?, ? FROM reminders WHERE id = ?""",
+                (attempts, error, failed_at, reminder_id),
+            )
+            c.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+
+
+def get_dead_letters(limit=10):
+    """Get reminder gagal terbaru (reminder_id, user_id, remind_at, message, attempts, error, failed_at)"""
+    return _query(
+        "SELECT reminder_id, user_id, remind_at, message, attempts, error, failed_at FROM reminder_dead_letters ORDER BY id DESC LIMIT ?",
+        (limit,),
+    )
+
+
+def count_dead_letters():
+    return _query_one("SELECT COUNT(*) FROM reminder_dead_letters")[0]
+
+
+def get_sensitive_keywords():
+    """Keyword sensitif tambahan dari admin (di luar daftar default)"""
+    return [row[0] for row in _query("SELECT keyword FROM sensitive_keywords ORDER BY keyword")]
+
+
+def add_sensitive_keyword(keyword, added_by):
+    """Return True kalau keyword baru ditambahkan"""
+    import time
+
+    with _transaction() as c:
         c.execute(
-            "SELECT id, remind_at, message FROM reminders WHERE user_id = ? ORDER BY remind_at LIMIT ?",
-            (user_id, limit),
+            "INSERT OR IGNORE INTO sensitive_keywords (keyword, added_by, added_at) VALUES (?, ?, ?)",
+            (keyword, added_by, int(time.time())),
         )
-        return c.fetchall()
+        return c.rowcount > 0
+
+
+def remove_sensitive_keyword(keyword):
+    """Return True kalau keyword ada dan dihapus"""
+    with _transaction() as c:
+        c.execute("DELETE FROM sensitive_keywords WHERE keyword = ?", (keyword,))
+        return c.rowcount > 0
+
+
+def get_user_reminders(user_id, limit=5):
+    return _query(
+        "SELECT id, remind_at, message FROM reminders WHERE user_id = ? ORDER BY remind_at LIMIT ?",
+        (user_id, limit),
+    )
 
 
 def get_all_schedules():
     """Get all schedules grouped by day"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-        c.execute(
-            "SELECT day_of_week, time, subject FROM schedule ORDER BY day_of_week, time"
-        )
-        return c.fetchall()
+    return _query(
+        "SELECT day_of_week, time, subject FROM schedule ORDER BY day_of_week, time"
+    )
 
 
 def search_schedule_by_subject(subject_keyword):
-    """Search schedules by subject name (case-insensitive)"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-        c.execute(
-            "SELECT day_of_week, time, subject FROM schedule WHERE LOWER(subject) LIKE ? ORDER BY day_of_week, time",
-            (f"%{subject_keyword.lower()}%",),
-        )
-        return c.fetchall()
+    """Search schedules by subject name (case-insensitive)
+
+    Semua kata harus muncul di nama mata kuliah (substring), diurutkan bm25.
+    Kalau tidak ada yang cocok, fallback fuzzy: singkatan ("matdis" ->
+    Matematika Diskrit) atau typo ("matematka"), lihat _search_subject_fuzzy.
+    """
+    keyword = " ".join(subject_keyword.lower().split())
+    words = keyword.split()
+    if not _fts_enabled or not words or min(map(len, words)) < TRIGRAM:
+        return _search_subject_like(keyword)
+    rows = _query(
+        "SELECT s.day_of_week, s.time, s.subject FROM schedule_fts JOIN schedule s ON s.rowid = schedule_fts.rowid "
+        "WHERE schedule_fts MATCH ? ORDER BY bm25(schedule_fts), s.day_of_week, s.time",
+        (" AND ".join(map(_fts_phrase, words)),),
+    )
+    return rows or _search_subject_fuzzy(keyword)
 
 
 def delete_schedule_by_subject(subject_keyword):
-    """Delete all schedules matching subject keyword"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    """Delete all schedules matching subject keyword
+
+    Sengaja tidak fuzzy: hanya jadwal yang namanya mengandung kata kunci persis.
+    """
+    keyword = subject_keyword.lower()
+    with _transaction() as c:
+        if _fts_enabled and len(keyword) >= TRIGRAM:
+            c.execute(
+                "DELETE FROM schedule WHERE rowid IN (SELECT rowid FROM schedule_fts WHERE schedule_fts MATCH ?)",
+                (_fts_phrase(keyword),),
+            )
+        else:
+            c.execute(
+                "DELETE FROM schedule WHERE LOWER(subject) LIKE ?",
+                (f"%{keyword}%",),
+            )
+        if c.rowcount:
+            _on_commit(_bump_schedule_version)
+        return c.rowcount
+
+
+# --- SUBJECT SEARCH (FTS5) ---
+# schedule_fts: index trigram (FTS5) untuk kolom schedule.subject, disinkronkan
+# lewat trigger. Query phrase di tokenizer trigram = substring case-insensitive
+# yang memakai index, bukan full scan seperti LOWER(subject) LIKE '%x%'. Kata
+# kunci < 3 huruf tidak bisa dicari lewat trigram, jadi tetap pakai LIKE.
+TRIGRAM = 3
+FUZZY_MIN_SIMILARITY = 0.4   # Jaccard trigram satu kata kunci vs satu kata nama matkul
+FUZZY_MIN_SHARED = 2         # minimal trigram yang sama per kata
+FUZZY_CANDIDATES = 50
+
+# False kalau SQLite tidak punya FTS5/trigram (< 3.34), semua search pakai LIKE
+_fts_enabled = False
+
+
+def _init_subject_index(c):
+    global _fts_enabled
+    exists = c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schedule_fts'"
+    ).fetchone()
+    try:
         c.execute(
-            "DELETE FROM schedule WHERE LOWER(subject) LIKE ?",
-            (f"%{subject_keyword.lower()}%",),
+            """CREATE VIRTUAL TABLE IF NOT EXISTS schedule_fts USING fts5(subject, content='schedule', content_rowid='rowid', tokenize='trigram')"""
         )
-        conn.commit()
-        return c.rowcount
+    except sqlite3.OperationalError as e:
+        print(f"[DB] FTS5 trigram tidak tersedia ({e}), search jadwal pakai LIKE")
+        _fts_enabled = False
+        return
+    c.execute(
+        """CREATE TRIGGER IF NOT EXISTS schedule_fts_insert AFTER INSERT ON schedule BEGIN
+            INSERT INTO schedule_fts (rowid, subject) VALUES (new.rowid, new.subject);
+        END"""
+    )
+    c.execute(
+        """CREATE TRIGGER IF NOT EXISTS schedule_fts_delete AFTER DELETE ON schedule BEGIN
+            INSERT INTO schedule_fts (schedule_fts, rowid, subject) VALUES ('delete', old.rowid, old.subject);
+        END"""
+    )
+    c.execute(
+        """CREATE TRIGGER IF NOT EXISTS schedule_fts_update AFTER UPDATE OF subject ON schedule BEGIN
+            INSERT INTO schedule_fts (schedule_fts, rowid, subject) VALUES ('delete', old.rowid, old.subject);
+            INSERT INTO schedule_fts (rowid, subject) VALUES (new.rowid, new.subject);
+        END"""
+    )
+    if not exists:
+        # Index baru di database lama: isi dari baris schedule yang sudah ada
+        c.execute("INSERT INTO schedule_fts (schedule_fts) VALUES ('rebuild')")
+    _fts_enabled = True
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _trigrams(words):
+    return {word[i:i + TRIGRAM] for word in words for i in range(len(word) - TRIGRAM + 1)}
+
+
+def _is_abbreviation(query, words):
+    """True kalau `query` = gabungan prefix kata-kata `words` berurutan ("matdis")"""
+    def match(q, w):
+        if q == len(query):
+            return True
+        if w == len(words):
+            return False
+        word = words[w]
+        k = 0
+        while k < len(word) and q + k < len(query) and word[k] == query[q + k]:
+            k += 1
+            if match(q + k, w + 1):
+                return True
+        return match(q, w + 1)
+    return match(0, 0)
+
+
+def _word_similarity(grams, subject_grams):
+    """Jaccard trigram terbaik antara satu kata kunci dan satu kata nama matkul.
+
+    0 kalau trigram yang sama kurang dari FUZZY_MIN_SHARED, supaya kata pendek
+    tidak cocok hanya karena satu-dua trigram umum ("basis" vs "sistem").
+    """
+    best = 0.0
+    for other in subject_grams:
+        shared = len(grams & other)
+        if shared >= FUZZY_MIN_SHARED:
+            best = max(best, shared / len(grams | other))
+    return best
+
+
+def _search_subject_fuzzy(keyword):
+    """Kandidat = jadwal yang punya minimal satu trigram kata kunci (pakai index),
+    lalu disaring: singkatan dari nama matkul, atau setiap kata kunci mirip
+    (typo) dengan salah satu kata di nama matkul."""
+    words = keyword.split()
+    grams = _trigrams(words)
+    if not grams:
+        return []
+    candidates = _query(
+        "SELECT s.day_of_week, s.time, s.subject FROM schedule_fts JOIN schedule s ON s.rowid = schedule_fts.rowid "
+        "WHERE schedule_fts MATCH ? ORDER BY bm25(schedule_fts) LIMIT ?",
+        (" OR ".join(map(_fts_phrase, sorted(grams))), FUZZY_CANDIDATES),
+    )
+    compact = "".join(words)
+    word_grams = [_trigrams([word]) for word in words]
+    scored = []
+    for row in candidates:
+        subject_words = row[2].lower().split()
+        subject_grams = [_trigrams([word]) for word in subject_words]
+        scores = [_word_similarity(grams, subject_grams) for grams in word_grams]
+        similarity = min(scores)
+        if similarity >= FUZZY_MIN_SIMILARITY:
+            scored.append((sum(scores) / len(scores), row))
+        elif _is_abbreviation(compact, subject_words):
+            scored.append((FUZZY_MIN_SIMILARITY, row))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [row for _, row in scored]
+
+
+def _search_subject_like(keyword):
+    return _query(
+        "SELECT day_of_week, time, subject FROM schedule WHERE LOWER(subject) LIKE ? ORDER BY day_of_week, time",
+        (f"%{keyword}%",),
+    )
 
 
 def delete_all_user_reminders(user_id):
     """Delete all reminders for a specific user"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    with _transaction() as c:
         c.execute("DELETE FROM reminders WHERE user_id = ?", (user_id,))
-        conn.commit()
         return c.rowcount
 
 
@@ -145,47 +630,108 @@ def delete_all_user_reminders(user_id):
 
 def add_personality(personality_id, name, description, system_prompt, emoji="🤖"):
     """Add a new AI personality"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    with _transaction() as c:
         c.execute(
             "INSERT OR REPLACE INTO personalities (id, name, description, system_prompt, emoji) VALUES (?, ?, ?, ?, ?)",
             (personality_id, name, description, system_prompt, emoji),
         )
-        conn.commit()
 
 
 def get_all_personalities():
-    """Get all available personalities"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-        c.execute("SELECT id, name, description, emoji FROM personalities ORDER BY id")
-        return c.fetchall()
+    """Get all available personalities (id, name, description, system_prompt, emoji)"""
+    return _query("SELECT id, name, description, system_prompt, emoji FROM personalities ORDER BY id")
+
+
+PERSONALITY_SEED_KEY = "personality_seed_hash"
+
+
+def seed_personalities(personalities, digest):
+    """Tulis personality default kalau `digest` beda dengan seed terakhir.
+
+    personalities: list (id, name, description, system_prompt, emoji)
+    Return True kalau ada yang ditulis.
+    """
+    with _transaction() as c:
+        row = c.execute("SELECT value FROM meta WHERE key = ?", (PERSONALITY_SEED_KEY,)).fetchone()
+        if row and row[0] == digest:
+            return False
+        c.executemany(
+            "INSERT OR REPLACE INTO personalities (id, name, description, system_prompt, emoji) VALUES (?, ?, ?, ?, ?)",
+            personalities,
+        )
+        c.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (PERSONALITY_SEED_KEY, digest)
+        )
+        return True
 
 
 def get_personality(personality_id):
     """Get personality system prompt"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-        c.execute("SELECT system_prompt FROM personalities WHERE id = ?", (personality_id,))
-        result = c.fetchone()
-        return result[0] if result else None
+    result = _query_one("SELECT system_prompt FROM personalities WHERE id = ?", (personality_id,))
+    return result[0] if result else None
 
 
 def set_user_personality(user_id, personality_id):
     """Set user's preferred personality"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
+    with _transaction() as c:
         c.execute(
             "INSERT OR REPLACE INTO user_personality (user_id, personality_id) VALUES (?, ?)",
             (user_id, personality_id),
         )
-        conn.commit()
 
 
 def get_user_personality(user_id, default="friendly"):
     """Get user's personality preference"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-        c.execute("SELECT personality_id FROM user_personality WHERE user_id = ?", (user_id,))
-        result = c.fetchone()
-        return result[0] if result else default
+    result = _query_one("SELECT personality_id FROM user_personality WHERE user_id = ?", (user_id,))
+    return result[0] if result else default
+
+
+# --- ANALYTICS ROLLUP ---
+
+def record_usage(events):
+    """Tambahkan event analytics ke tabel rollup.
+
+    events: list (timestamp "YYYY-mm-dd HH:MM:SS", user_id, command_name)
+    """
+    from collections import Counter
+
+    daily, commands, users, last_used = Counter(), Counter(), Counter(), {}
+    for timestamp, user_id, command in events:
+        daily[(timestamp[:10], command)] += 1
+        commands[command] += 1
+        users[(user_id, command)] += 1
+        last_used[command] = max(timestamp, last_used.get(command, timestamp))
+
+    with _transaction() as c:
+        c.executemany(
+            """INSERT INTO usage_daily (day, command, count) VALUES (?, ?, ?)
+               ON CONFLICT (day, command) DO UPDATE SET count = count + excluded.count""",
+            [(day, command, n) for (day, command), n in daily.items()],
+        )
+        c.executemany(
+            """INSERT INTO usage_commands (command, count, last_used) VALUES (?, ?, ?)
+               ON CONFLICT (command) DO UPDATE SET count = count + excluded.count, last_used = excluded.last_used""",
+            [(command, n, last_used[command]) for command, n in commands.items()],
+        )
+        c.executemany(
+            """INSERT INTO usage_users (user_id, command, count) VALUES (?, ?, ?)
+               ON CONFLICT (user_id, command) DO UPDATE SET count = count + excluded.count""",
+            [(user_id, command, n) for (user_id, command), n in users.items()],
+        )
+
+
+def get_usage_stats(day, user_id, top=5):
+    """Statistik dari tabel rollup: per hari, per command, dan per user"""
+    return {
+        "today": _query(
+            "SELECT command, count FROM usage_daily WHERE day = ? ORDER BY count DESC", (day,)
+        ),
+        "top_commands": _query(
+            "SELECT command, count, last_used FROM usage_commands ORDER BY count DESC LIMIT ?", (top,)
+        ),
+        "user": _query(
+            "SELECT command, count FROM usage_users WHERE user_id = ? ORDER BY count DESC LIMIT ?",
+            (user_id, top),
+        ),
+        "total": _query_one("SELECT COALESCE(SUM(count), 0) FROM usage_commands")[0],
+    }
@@ -0,0 +1,228 @@
+"""Antrian pusat untuk semua request ke Groq.
+
+- Konkurensi global dibatasi `concurrency` (pengganti Semaphore groq_slots).
+- Slot dibagi round-robin: bergiliran per channel, lalu per user di dalam
+  channel, lalu FIFO per user. Satu user yang mengirim banyak pertanyaan
+  (atau satu channel yang rame) tidak bisa menyerobot antrian yang lain.
+- Kalau Groq membalas 429/503, seluruh antrian di-pause sesuai header
+  retry-after (atau x-ratelimit-reset-*), lalu request itu diantrikan lagi
+  maksimal `max_retries` kali. Client Groq sebaiknya dibuat dengan
+  max_retries=0 supaya retry hanya terjadi di sini.
+- Load shedding: kalau antrian sudah `max_queue` atau estimasi waktu tunggu
+  lebih dari `max_wait` detik, request langsung ditolak dengan Overloaded
+  (bot membalas "lagi rame") daripada menunggu sampai timeout.
+"""
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+
+RETRY_STATUS = {429, 503}
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class Overloaded(Exception):
+    """Antrian Groq penuh / estimasi tunggu terlalu lama"""
+
+    def __init__(self, expected_wait, queued):
+        super().__init__(f"Groq overloaded: {queued} antri, estimasi tunggu {expected_wait:.1f} detik")
+        self.expected_wait = expected_wait
+        self.queued = queued
+
+
+def parse_duration(value):
+    """Detik dari header retry-after ("2", "1.5") atau x-ratelimit-reset-* ("1m2.5s", "120ms")"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_delay(error):
+    """Detik backoff untuk error 429/503 dari Groq, None kalau error lain"""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status not in RETRY_STATUS:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    for header in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        delay = parse_duration(headers.get(header))
+        if delay is not None:
+            return min(max(delay, 0.0), MAX_BACKOFF)
+    return DEFAULT_BACKOFF
+
+
+class GroqScheduler:
+    """Antrian round-robin (channel -> user -> FIFO) dengan batas konkurensi"""
+
+    def __init__(self, concurrency=4, max_queue=50, max_wait=20.0, max_retries=2,
+                 observe_wait=None, clock=time.monotonic):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        # observe_wait(detik, retry) dipanggil tiap attempt dapat slot (untuk metrics);
+        # retry=True kalau attempt ini antri ulang setelah 429/503 (termasuk pause backoff)
+        self.observe_wait = observe_wait
+        self._clock = clock
+        self._channels = OrderedDict()   # channel -> OrderedDict(user -> deque[Future])
+        self.queued = 0
+        self.active = 0
+        self._paused_until = 0.0
+        self._resume_handle = None
+        # Rata-rata (EWMA) lama satu request memegang slot, untuk estimasi tunggu
+        self.service_time = 2.0
+        self.waits = deque(maxlen=256)
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.shed = 0
+        self.backoffs = 0
+
+    def expected_wait(self):
+        """Estimasi detik sampai request baru dapat slot"""
+        wait = max(0.0, self._paused_until - self._clock())
+        if self.active + self.queued >= self.concurrency:
+            wait += (self.queued + 1) / self.concurrency * self.service_time
+        return wait
+
+    def check_load(self):
+        """Raise Overloaded kalau request baru sebaiknya tidak diantrikan"""
+        expected = self.expected_wait()
+        if self.queued >= self.max_queue or expected > self.max_wait:
+            self.shed += 1
+            raise Overloaded(expected, self.queued)
+
+    async def run(self, user_id, channel_id, call):
+        """Jalankan `call` (coroutine function tanpa argumen) saat dapat slot.
+
+        Error 429/503 di-retry setelah backoff selama estimasi tunggunya masih
+        di bawah max_wait; error lain langsung diteruskan ke caller.
+        """
+        self.check_load()
+        attempt = 0
+        while True:
+            await self._acquire(user_id, channel_id, attempt > 0)
+            started = self._clock()
+            try:
+                result = await call()
+            except Exception as e:
+                self._release(started)
+                delay = retry_delay(e)
+                if delay is None:
+                    self.failed += 1
+                    raise
+                self._pause(delay)
+                if attempt >= self.max_retries or self.expected_wait() > self.max_wait:
+                    self.failed += 1
+                    raise
+                attempt += 1
+                self.retries += 1
+                print(f"[GROQ] {getattr(e, 'status_code', '?')}, antrian di-pause {delay:.1f} detik (retry {attempt})")
+                continue
+            except BaseException:
+                self._release(started)
+                raise
+            self._release(started)
+            self.completed += 1
+            return result
+
+    async def _acquire(self, user_id, channel_id, retry=False):
+        future = asyncio.get_running_loop().create_future()
+        users = self._channels.setdefault(channel_id, OrderedDict())
+        users.setdefault(user_id, deque()).append(future)
+        self.queued += 1
+        queued_at = self._clock()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot sudah diberikan tapi task keburu dibatalkan (timeout)
+                self._release(None)
+            else:
+                self._discard(user_id, channel_id, future)
+            raise
+        wait = self._clock() - queued_at
+        self.waits.append(wait)
+        if self.observe_wait is not None:
+            self.observe_wait(wait, retry)
+
+    def _discard(self, user_id, channel_id, future):
+        users = self._channels.get(channel_id)
+        waiters = users.get(user_id) if users else None
+        if waiters is None or future not in waiters:
+            return
+        waiters.remove(future)
+        self.queued -= 1
+        if not waiters:
+            del users[user_id]
+            if not users:
+                del self._channels[channel_id]
+
+    def _release(self, started):
+        self.active -= 1
+        if started is not None:
+            self.service_time = 0.8 * self.service_time + 0.2 * (self._clock() - started)
+        self._dispatch()
+
+    def _pause(self, delay):
+        self.backoffs += 1
+        self._paused_until = max(self._paused_until, self._clock() + delay)
+
+    def _dispatch(self):
+        """Beri slot ke waiter berikutnya (giliran channel, lalu user) selama masih ada slot"""
+        while self.queued and self.active < self.concurrency:
+            paused_for = self._paused_until - self._clock()
+            if paused_for > 0:
+                if self._resume_handle is None:
+                    self._resume_handle = asyncio.get_running_loop().call_later(paused_for, self._resume)
+                return
+            channel_id, users = next(iter(self._channels.items()))
+            user_id, waiters = next(iter(users.items()))
+            future = waiters.popleft()
+            self.queued -= 1
+            # Giliran berikutnya: user lain di channel ini, lalu channel lain
+            if waiters:
+                users.move_to_end(user_id)
+            else:
+                del users[user_id]
+            if users:
+                self._channels.move_to_end(channel_id)
+            else:
+                del self._channels[channel_id]
+            if future.done():
+                continue
+            self.active += 1
+            future.set_result(None)
+
+    def _resume(self):
+        self._resume_handle = None
+        self._dispatch()
+
+    def stats(self):
+        waits = sorted(self.waits)
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "expected_wait": self.expected_wait(),
+            "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            "service_time": self.service_time,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "backoffs": self.backoffs,
+            "shed": self.shed,
+        }
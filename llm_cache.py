@@ -0,0 +1,136 @@
+"""Cache jawaban AI + penggabungan request identik (single-flight).
+
+Key cache = (personality id, pertanyaan yang dinormalisasi, versi data). Versi
+data adalah digest dari blok [DATA DARI DATABASE] yang dikirim ke Groq, jadi
+jawaban otomatis tidak dipakai lagi begitu jadwal/reminder yang relevan
+berubah. Entry kadaluarsa setelah `ttl` detik dan yang paling lama tidak
+dipakai dibuang saat cache penuh (LRU).
+
+Kalau pertanyaan yang sama datang saat jawabannya masih diproses, request
+kedua menunggu hasil request pertama alih-alih memanggil Groq lagi. Kalau
+request pertama dibatalkan, yang menunggu tidak ikut batal: salah satunya
+mengambil alih dan memanggil Groq sendiri.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = 512
+TTL_SECONDS = 300
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.,~]+$")
+
+
+def normalize_question(text):
+    """Lowercase, rapikan spasi, buang tanda baca di akhir"""
+    return _TRAILING.sub("", _SPACES.sub(" ", text.lower())).strip()
+
+
+def data_version(*parts):
+    """Digest pendek dari data yang ikut dikirim ke model"""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class _LeaderCancelled(Exception):
+    """Request yang sedang menghitung jawaban dibatalkan (hanya dipakai internal)"""
+
+
+class ResponseCache:
+    """LRU + TTL cache dengan single-flight per key"""
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._inflight = {}             # key -> Future
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(personality_id, question, version):
+        return (personality_id, normalize_question(question), version)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key, compute, cacheable=lambda value: True):
+        """Return (value, source) dengan source 'hit', 'coalesced', atau 'miss'.
+
+        compute: coroutine function tanpa argumen, hanya dipanggil saat miss.
+        cacheable: hasil yang return False tidak disimpan (mis. jawaban terpotong).
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, "hit"
+
+        pending = self._inflight.get(key)
+        while pending is not None:
+            try:
+                value = await asyncio.shield(pending)
+            except _LeaderCancelled:
+                # Yang pertama bangun jadi leader baru, sisanya menunggu leader itu
+                pending = self._inflight.get(key)
+                continue
+            self.coalesced += 1
+            return value, "coalesced"
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            # CancelledError hanya untuk task yang benar-benar dibatalkan
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Hindari warning "exception never retrieved" kalau tidak ada yang menunggu
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if cacheable(value):
+                self.put(key, value)
+            return value, "miss"
+        finally:
+            del self._inflight[key]
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
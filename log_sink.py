@@ -0,0 +1,114 @@
+"""Sink async untuk log embed ke LOG_CHANNEL_ID.
+
+Embed diantrikan lalu dikirim berkelompok (maksimal 10 embed per pesan, sesuai
+batas Discord) setiap FLUSH_INTERVAL detik atau saat batch sudah penuh, jadi
+log tidak berebut rate limit dengan balasan ke user. Channel di-resolve sekali
+lalu di-cache. Kalau antrian penuh, log baru dibuang dan jumlahnya dilaporkan
+sebagai satu embed ringkasan.
+"""
+import asyncio
+from collections import deque
+
+import discord
+
+# Batas Discord: 10 embed dan total 6000 karakter per pesan
+EMBEDS_PER_MESSAGE = 10
+EMBED_CHARS_PER_MESSAGE = 6000
+FLUSH_INTERVAL = 2.0
+MAX_QUEUE = 200
+
+
+class LogSink:
+    """Antrian embed log yang di-flush berkelompok ke satu channel"""
+
+    def __init__(self, bot, channel_id, flush_interval=FLUSH_INTERVAL, max_queue=MAX_QUEUE):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._queue = deque()
+        self._channel = None
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = None
+        self._closing = False
+
+    def emit(self, embed: discord.Embed):
+        """Masukkan embed ke antrian (tidak menunggu pengiriman)"""
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(embed)
+        self._pending.set()
+        if len(self._queue) >= EMBEDS_PER_MESSAGE:
+            self._full.set()
+        if not self._closing and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop loop flush lalu kirim semua log yang tersisa.
+
+        Loop dihentikan baik-baik (tidak di-cancel), supaya batch yang sedang
+        dikirim tidak hilang di tengah jalan.
+        """
+        self._closing = True
+        if self._task:
+            self._pending.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        """Kirim semua embed di antrian, maksimal 10 embed per pesan"""
+        if self.dropped:
+            summary = discord.Embed(
+                title="⚠️ Log Dibuang",
+                description=f"{self.dropped} log dibuang karena antrian log penuh",
+                color=discord.Color.orange(),
+            )
+            self.dropped = 0
+            self._queue.append(summary)
+
+        while self._queue:
+            batch, size = [], 0
+            while self._queue and len(batch) < EMBEDS_PER_MESSAGE:
+                embed_size = len(self._queue[0])
+                if batch and size + embed_size > EMBED_CHARS_PER_MESSAGE:
+                    break
+                batch.append(self._queue.popleft())
+                size += embed_size
+            await self._send(batch)
+
+    async def _send(self, embeds):
+        try:
+            channel = await self._resolve_channel()
+            if not channel:
+                print(f"[LOG] Channel {self.channel_id} tidak ditemukan, {len(embeds)} log dibuang")
+                return
+            await channel.send(embeds=embeds)
+        except Exception as e:
+            print(f"[LOG ERROR] Failed to send {len(embeds)} log: {e}")
+
+    async def _resolve_channel(self):
+        if self._channel is None:
+            channel = self.bot.get_channel(self.channel_id)
+            if not channel:
+                channel = await self.bot.fetch_channel(self.channel_id)
+            self._channel = channel
+        return self._channel
+
+    async def _run(self):
+        while True:
+            await self._pending.wait()
+            if not self._closing and len(self._queue) < EMBEDS_PER_MESSAGE:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            self._pending.clear()
+            await self.flush()
+            if self._closing:
+                return
@@ -0,0 +1,325 @@
+"""Metrics in-process dengan format teks Prometheus.
+
+Counter, histogram, dan gauge disimpan di memori (tanpa library atau service
+luar) lalu dibaca lewat endpoint HTTP lokal:
+
+    curl http://127.0.0.1:9108/metrics
+
+Catat nilai di hot path cukup murah: child per kombinasi label di-cache di
+dict, histogram memakai bisect ke bucket, dan semuanya dijaga satu lock kecil
+karena timing database dicatat dari thread async_db. Teks Prometheus baru
+dirangkai saat endpoint di-scrape.
+
+Metrics yang dipakai bot didefinisikan di bawah (GROQ_SECONDS, DB_SECONDS, dst).
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from functools import partial
+
+# Bucket default dalam detik, dari 1 ms sampai 30 detik
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+TOKEN_BUCKETS = (50, 100, 200, 400, 800, 1200, 1600, 2400, 3200, 4800, 8000)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300, 900)
+
+LOOP_LAG_INTERVAL = 0.5
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """Metric berlabel; new_child(lock) membuat child per kombinasi label"""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames, new_child):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._new_child = new_child
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Child untuk satu kombinasi label (dibuat sekali, lalu dari cache)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: butuh label {self.labelnames}, dapat {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child(self._lock))
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            children = sorted(self._children.items())
+            lines.extend(self._render_child(values, child) for values, child in children)
+        return "\n".join(line for line in lines if line)
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock):
+        self.value = 0
+        self._lock = lock
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Nilai yang hanya bertambah (jumlah request, error, dll)"""
+
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames, _CounterChild)
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _render_child(self, values, child):
+        return f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_number(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds, lock):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # bucket terakhir = +Inf
+        self.sum = 0.0
+        self._lock = lock
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribusi nilai (latensi, jumlah token) dalam bucket kumulatif"""
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, partial(_HistogramChild, self.buckets))
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _render_child(self, values, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, (("le", _format_number(float(bound))),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_number(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return "\n".join(lines)
+
+
+class Gauge:
+    """Nilai sesaat (tanpa label) yang dibaca dari fungsi saat scrape (panjang antrian, dll)"""
+
+    def __init__(self, name, documentation, func=None):
+        self.name = name
+        self.documentation = documentation
+        self.func = func
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def render(self):
+        value = self.value
+        if self.func is not None:
+            try:
+                value = self.func()
+            except Exception as e:
+                print(f"[METRICS] Gauge {self.name} error: {e}")
+                return ""
+        return "\n".join((
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_number(value)}",
+        ))
+
+
+class Registry:
+    """Kumpulan metrics yang di-render jadi satu halaman /metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} sudah terdaftar")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, func=None):
+        return self.register(Gauge(name, documentation, func))
+
+    def render(self):
+        blocks = (metric.render() for metric in self._metrics.values())
+        return "\n".join(block for block in blocks if block) + "\n"
+
+
+REGISTRY = Registry()
+
+GROQ_SECONDS = REGISTRY.histogram(
+    "bot_groq_request_seconds", "Durasi request Groq setelah dapat slot (tanpa antri)", ("mode", "outcome"),
+)
+GROQ_QUEUE_SECONDS = REGISTRY.histogram(
+    "bot_groq_queue_wait_seconds",
+    "Waktu antri per attempt di groq_scheduler (attempt=retry termasuk pause backoff 429/503)",
+    ("attempt",),
+)
+GROQ_TOKENS = REGISTRY.histogram(
+    "bot_groq_tokens", "Token per jawaban Groq (dari usage, atau estimasi)", ("kind",), TOKEN_BUCKETS,
+)
+DB_SECONDS = REGISTRY.histogram(
+    "bot_db_seconds", "Durasi fungsi database.py yang dipanggil lewat async_db", ("function", "kind"), DB_BUCKETS,
+)
+INTENT_SECONDS = REGISTRY.histogram(
+    "bot_intent_seconds", "Waktu on_message menangani pesan per intent", ("intent",),
+)
+REMINDER_LAG_SECONDS = REGISTRY.histogram(
+    "bot_reminder_lag_seconds", "Selisih waktu DM reminder terkirim dengan remind_at", (), LAG_BUCKETS,
+)
+DISCORD_REST = REGISTRY.counter(
+    "bot_discord_rest_requests", "Request REST ke Discord per route dan status", ("method", "route", "status"),
+)
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "bot_event_loop_lag_seconds", "Keterlambatan event loop (sleep yang molor)", (), LATENCY_BUCKETS,
+)
+
+
+def instrument_discord_http(http):
+    """Hitung setiap request REST Discord yang lewat HTTPClient.request milik bot"""
+    request = http.request
+
+    async def counted_request(route, *args, **kwargs):
+        method, path = getattr(route, "method", "?"), getattr(route, "path", "?")
+        try:
+            result = await request(route, *args, **kwargs)
+        except Exception as e:
+            DISCORD_REST.labels(method, path, str(getattr(e, "status", "error"))).inc()
+            raise
+        DISCORD_REST.labels(method, path, "ok").inc()
+        return result
+
+    http.request = counted_request
+
+
+async def _monitor_loop_lag(interval):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - expected))
+
+
+class MetricsServer:
+    """Endpoint HTTP minimal (GET /metrics) plus monitor lag event loop"""
+
+    def __init__(self, registry=REGISTRY, host="127.0.0.1", port=9108, loop_lag_interval=LOOP_LAG_INTERVAL):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.loop_lag_interval = loop_lag_interval
+        self._server = None
+        self._monitor = None
+
+    def is_running(self):
+        return self._server is not None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self._monitor = asyncio.create_task(_monitor_loop_lag(self.loop_lag_interval))
+        print(f"[METRICS] Endpoint aktif di http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._monitor:
+            self._monitor.cancel()
+            self._monitor = None
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Header request tidak dipakai, cukup dibaca sampai baris kosong
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.registry.render()
+            else:
+                status, body = "404 Not Found", "Not Found\n"
+            payload = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def timed(histogram, *labels):
+    """Context manager untuk mencatat durasi blok ke histogram"""
+    return _Timer(histogram.labels(*labels))
+
+
+class _Timer:
+    __slots__ = ("child", "started")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
@@ -0,0 +1,206 @@
+"""Ekstraksi perintah natural language dalam satu kali scan.
+
+`extract()` menjalankan satu regex token gabungan (finditer) di pesan dan
+mengumpulkan semua informasi sekaligus ke Extraction:
+- trigger: kata kerja pertama ("remind", "add", "delete")
+- target: objek pertama ("schedule", "reminder")
+- day_eng/day_indo, time ("HH:MM"), duration (detik)
+- scope: "all" / "latest" (hanya kalau menempel di kepala perintah,
+  mis. "hapus semua reminder", bukan "hapus reminder kumpul semua tugas")
+- payload: sisa teks (untuk pesan reminder / kata kunci pencarian)
+- subject: payload tanpa hari dan jam (untuk nama mata kuliah)
+
+Trigger dan target hanya diambil di kepala perintah (sebelum ada teks
+payload), jadi "ingatkan aku dalam 5 menit untuk cek jadwal" tetap
+reminder dengan payload "cek jadwal". Kata pengisi di awal payload
+("aku", "untuk", "yang", ...) dibuang.
+
+parse_*_natural() adalah interface lama yang dipakai intent router,
+sekarang dibangun di atas extract().
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from schedule_cache import ENG_TO_INDO
+
+Extraction = namedtuple(
+    "Extraction", "trigger target day_eng day_indo time duration scope payload subject"
+)
+
+_UNITS = {
+    "detik": 1, "dtk": 1, "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+    "menit": 60, "mnt": 60, "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "jam": 3600, "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "hari": 86400, "d": 86400, "day": 86400, "days": 86400,
+}
+_DAYS = {
+    "senin": "monday", "monday": "monday", "mon": "monday",
+    "selasa": "tuesday", "tuesday": "tuesday", "tue": "tuesday",
+    "rabu": "wednesday", "wednesday": "wednesday", "wed": "wednesday",
+    "kamis": "thursday", "thursday": "thursday", "thu": "thursday",
+    "jumat": "friday", "jum'at": "friday", "friday": "friday", "fri": "friday",
+    "sabtu": "saturday", "saturday": "saturday", "sat": "saturday",
+    "minggu": "sunday", "sunday": "sunday", "sun": "sunday",
+}
+_VERBS = {
+    "ingatkan": "remind", "ingetin": "remind", "ingat": "remind", "remind": "remind",
+    "tambahkan": "add", "tambah": "add", "add": "add",
+    "hapus": "delete", "delete": "delete", "remove": "delete", "clear": "delete",
+}
+_TARGETS = {"jadwal": "schedule", "schedule": "schedule", "reminder": "reminder", "reminders": "reminder"}
+_SCOPES = {
+    "semua": "all", "semuanya": "all", "all": "all",
+    "terbaru": "latest", "latest": "latest", "terakhir": "latest",
+}
+_FILLERS = {
+    "aku", "saya", "gue", "gw", "ku", "kami", "kita", "me", "untuk", "utk", "buat", "to",
+    "apa", "yang", "ya", "dong", "tolong", "please", "bahwa", "tentang", "soal", "about",
+}
+
+
+def _words(table):
+    return "|".join(sorted(map(re.escape, table), key=len, reverse=True))
+
+
+_UNIT = rf"(?:{_words(_UNITS)})(?![a-z])"
+_AMOUNT = rf"\d+\s*{_UNIT}(?:\s*(?:dan\s+)?\d+\s*{_UNIT})*"
+_UNIT_PART = re.compile(rf"(\d+)\s*({_words(_UNITS)})(?![a-z])", re.IGNORECASE)
+# Dicoba hanya di awal kata; dijalankan di teks lowercase (lebih cepat dari IGNORECASE)
+_TOKEN_PATTERN = (
+    rf"(?<!\w)(?:"
+    rf"(?P<duration>\b(?:dalam|in|within)\s+(?P<amount>{_AMOUNT})(?:\s+lagi\b)?|\b(?P<amount_lagi>{_AMOUNT})\s+lagi\b)"
+    rf"|(?P<time>\b(?:(?:jam|pukul)\s*)?(?P<hour>\d{{1,2}})[:.](?P<minute>\d{{2}})\b)"
+    rf"|\b(?P<day>{_words(_DAYS)})\b"
+    rf"|\b(?P<verb>{_words(_VERBS)})\b"
+    rf"|\b(?P<target>{_words(_TARGETS)})\b"
+    rf"|\b(?P<scope>{_words(_SCOPES)})\b"
+    rf")"
+)
+_TOKEN = re.compile(_TOKEN_PATTERN)
+_TOKEN_IGNORECASE = re.compile(_TOKEN_PATTERN, re.IGNORECASE)
+
+
+def parse_duration_to_seconds(text):
+    """Total detik dari teks durasi: '45m', '1h30m', '2 jam 15 menit' (0 kalau tidak ada)"""
+    return sum(int(value) * _UNITS[unit.lower()] for value, unit in _UNIT_PART.findall(text))
+
+
+@lru_cache(maxsize=256)
+def extract(text):
+    """Scan pesan sekali, return Extraction.
+
+    Di-cache per teks karena router memanggil beberapa parse_*_natural()
+    berturut-turut untuk pesan yang sama.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        tokens = _TOKEN.finditer(lowered)
+    else:
+        # Lowercase unicode tertentu mengubah panjang teks, span tidak sejajar lagi
+        tokens = _TOKEN_IGNORECASE.finditer(text)
+    trigger = target = day_eng = time_val = duration = scope = None
+    payload, subject = [], []
+    head_open = True   # belum ada teks payload sejak awal perintah
+    pos = 0
+
+    def add_text(chunk):
+        nonlocal head_open
+        words = chunk.split()
+        if not subject:
+            while words and words[0].lower() in _FILLERS:
+                words.pop(0)
+        if words:
+            payload.extend(words)
+            subject.extend(words)
+            head_open = False
+
+    for match in tokens:
+        add_text(text[pos:match.start()])
+        pos = match.end()
+        kind = match.lastgroup
+        word = text[match.start():pos]
+
+        if kind == "duration" and duration is None:
+            duration = parse_duration_to_seconds(match.group("amount") or match.group("amount_lagi"))
+            continue
+        if kind == "time" and time_val is None:
+            hour, minute = int(match.group("hour")), int(match.group("minute"))
+            if hour <= 23 and minute <= 59:
+                time_val = f"{hour:02d}:{minute:02d}"
+                payload.append(word)
+                continue
+        if kind == "day":
+            day_eng = day_eng or _DAYS[word.lower()]
+            payload.append(word)
+            continue
+        if head_open:
+            if kind == "verb" and trigger is None:
+                trigger = _VERBS[word.lower()]
+                continue
+            if kind == "target" and target is None:
+                target = _TARGETS[word.lower()]
+                continue
+            if kind == "scope" and scope is None:
+                scope = _SCOPES[word.lower()]
+                continue
+        add_text(word)
+    add_text(text[pos:])
+
+    return Extraction(
+        trigger,
+        target,
+        day_eng,
+        ENG_TO_INDO.get(day_eng),
+        time_val,
+        duration,
+        scope,
+        " ".join(payload),
+        " ".join(subject),
+    )
+
+
+def parse_add_reminder_natural(text):
+    """Parse natural language: 'ingatkan/reminder dalam 5 menit untuk [teks]'
+    Return: (duration_seconds, reminder_text) atau (None, None) jika parse gagal
+
+    Examples:
+    - "ingatkan aku dalam 5 menit untuk belajar"
+    - "reminder dalam 2 jam untuk makan siang"
+    - "ingat 30 detik lagi submit tugas"
+    """
+    info = extract(text)
+    is_reminder = info.trigger == "remind" or (info.target == "reminder" and info.trigger in (None, "add"))
+    if is_reminder and info.duration and info.payload:
+        return info.duration, info.payload
+    return None, None
+
+
+def parse_add_schedule_natural(text):
+    """Parse natural language: 'tambah/tambahkan jadwal [hari] [jam] [subject]'
+    Return: (day_eng, day_indo, time, subject) atau None jika parse gagal
+    """
+    info = extract(text)
+    if info.trigger == "add" and info.target == "schedule" and info.day_eng and info.time and info.subject:
+        return info.day_eng, info.day_indo, info.time, info.subject
+    return None
+
+
+def parse_delete_schedule_natural(text):
+    """Parse natural language: 'hapus jadwal [hari] [jam]'
+    Return: (day_eng, day_indo, time) atau None jika parse gagal
+    """
+    info = extract(text)
+    if info.trigger == "delete" and info.target == "schedule" and info.day_eng and info.time:
+        return info.day_eng, info.day_indo, info.time
+    return None
+
+
+def parse_delete_reminder_natural(text):
+    """Parse natural language: 'hapus reminder [teks/terbaru]' atau 'hapus semua reminder'
+    Return: reminder_text atau 'latest' atau 'all' atau None jika parse gagal
+    """
+    info = extract(text)
+    if info.trigger != "delete" or info.target != "reminder":
+        return None
+    return info.scope or info.payload or None
@@ -0,0 +1,166 @@
+"""Registry personality AI di memori.
+
+Personality default didefinisikan di sini (DEFAULT_PERSONALITIES) dan hanya
+ditulis ke database kalau isinya berubah: hash konten default disimpan di
+tabel meta, jadi restart / reconnect gateway tanpa perubahan tidak menulis apa
+pun. Setelah load(), semua personality ada di memori (lookup by id O(1)).
+
+Pilihan personality per user di-cache LRU; set_user_personality() menulis ke
+database lalu langsung memperbarui cache (write-through).
+"""
+import hashlib
+import json
+from collections import OrderedDict, namedtuple
+
+import async_db
+
+Personality = namedtuple("Personality", "id name description system_prompt emoji")
+
+DEFAULT_PERSONALITY = "friendly"
+# Jumlah user yang pilihan personality-nya disimpan di memori
+USER_CACHE_SIZE = 4096
+
+DEFAULT_PERSONALITIES = {
+    "friendly": {
+        "name": "Teman Baik",
+        "description": "Ramah, ceria, dan santai",
+        "emoji": "😊",
+        "prompt": "Kamu adalah asisten friendly untuk mahasiswa Sistem Informasi IS 1 bernama IS 1 Assistant! "
+                 "Kamu ramah, ceria, perhatian, dan suka ngobrol santai dengan teman-teman IS 1. "
+                 "Kamu bisa jawab pertanyaan umum, diskusi topik kuliah, atau sekadar ngobrol. "
+                 "Jawab dengan natural dan enak dibaca, boleh pakai emoji sesekali. "
+                 "PENTING: Untuk data jadwal/reminder, HANYA gunakan data dari database yang diberikan. "
+                 "Jangan mengarang jadwal atau reminder yang tidak ada. Kalau tidak ada data, bilang terus terang."
+    },
+    "professional": {
+        "name": "Asisten Profesional",
+        "description": "Formal, informatif, fokus data",
+        "emoji": "💼",
+        "prompt": "Kamu adalah IS 1 Assistant, asisten profesional untuk mahasiswa Sistem Informasi IS 1. "
+                 "Berikan jawaban yang terstruktur, spesifik, dan berbasis data. "
+                 "Hindari obrolan santai dan fokus pada informasi yang akurat. "
+                 "Gunakan format yang jelas dengan poin-poin. "
+                 "PENTING: Hanya gunakan data jadwal/reminder dari database. Tidak ada spekulasi atau data fiktif. "
+                 "Jika data tidak tersedia, katakan dengan jelas."
+    },
+    "tutor": {
+        "name": "Tutor Edukatif",
+        "description": "Mengajar, menjelaskan konsep dengan detail",
+        "emoji": "📚",
+        "prompt": "Kamu adalah IS 1 Assistant yang berperan sebagai tutor untuk mahasiswa IS 1. "
+                 "Ketika menjawab pertanyaan, jelaskan konsep dengan detail dan berikan contoh nyata. "
+                 "Gunakan analogi yang mudah dipahami. Dorong critical thinking dengan memberikan pertanyaan balik. "
+                 "Pecah topik kompleks menjadi bagian-bagian yang lebih kecil. "
+                 "PENTING: Untuk jadwal/reminder, hanya gunakan data dari database. Tunjukkan sumbernya jika relevan."
+    },
+    "energik": {
+        "name": "Motivator Energik",
+        "description": "Motivasi, semangat, penuh energi",
+        "emoji": "🚀",
+        "prompt": "Kamu adalah IS 1 Assistant dengan kepribadian yang super energik dan motivatif! "
+                 "Berikan semangat dan dorongan positif kepada mahasiswa IS 1 dalam setiap interaksi. "
+                 "Gunakan banyak emoji yang menyenangkan dan kata-kata inspiratif. "
+                 "Jadilah cheerleader yang mendukung semangat belajar mereka! "
+                 "PENTING: Untuk info jadwal/reminder, tetap akurat dan gunakan data dari database saja. "
+                 "Delivery semangat, tapi content tetap berdasarkan data nyata."
+    },
+    "helpful": {
+        "name": "Asisten Membantu",
+        "description": "Fokus solusi, praktis, action-oriented",
+        "emoji": "🤝",
+        "prompt": "Kamu adalah IS 1 Assistant yang berfokus pada solusi praktis. "
+                 "Ketika mahasiswa IS 1 minta bantuan, berikan langkah-langkah konkret dan actionable. "
+                 "Ringkas poin penting dan berikan rekomendasi spesifik. "
+                 "Setiap jawaban harus membawa nilai dan membantu mereka mengambil aksi nyata. "
+                 "PENTING: Jadwal dan reminder hanya dari database. Tawarkan bantuan konkret berdasarkan data tersebut."
+    }
+}
+
+
+def seed_hash(personalities):
+    """Hash konten personality default (berubah kalau ada teks yang diedit)"""
+    payload = json.dumps(personalities, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PersonalityRegistry:
+    """Semua personality + cache LRU user -> personality id"""
+
+    def __init__(self, defaults=DEFAULT_PERSONALITIES, default_id=DEFAULT_PERSONALITY,
+                 user_cache_size=USER_CACHE_SIZE):
+        self.defaults = defaults
+        self.default_id = default_id
+        self.user_cache_size = user_cache_size
+        self.by_id = {}                 # id -> Personality, urut id
+        self._users = OrderedDict()     # user_id -> personality id
+        self.loaded = False
+        self.seeded = False
+        self.hits = 0
+        self.misses = 0
+
+    async def load(self):
+        """Seed default kalau berubah, lalu muat semua personality ke memori.
+
+        Cukup sekali per proses; on_ready yang terpanggil lagi saat reconnect
+        tidak menyentuh database.
+        """
+        if self.loaded:
+            return self
+        rows = [
+            (personality_id, data["name"], data["description"], data["prompt"], data["emoji"])
+            for personality_id, data in self.defaults.items()
+        ]
+        self.seeded = await async_db.seed_personalities(rows, seed_hash(self.defaults))
+        self.by_id = {row[0]: Personality(*row) for row in await async_db.get_all_personalities()}
+        self.loaded = True
+        return self
+
+    def get(self, personality_id):
+        """Personality by id (case-insensitive), None kalau tidak ada"""
+        return self.by_id.get(personality_id.lower())
+
+    def all(self):
+        return list(self.by_id.values())
+
+    def prompt(self, personality_id):
+        personality = self.by_id.get(personality_id)
+        return personality.system_prompt if personality else None
+
+    async def user_personality_id(self, user_id):
+        """Id personality pilihan user (default kalau belum pernah memilih)"""
+        try:
+            personality_id = self._users[user_id]
+        except KeyError:
+            self.misses += 1
+            personality_id = await async_db.get_user_personality(user_id, default=self.default_id)
+            # Kalau user mengganti personality selama query berjalan, yang baru menang
+            personality_id = self._users.get(user_id, personality_id)
+            self._remember(user_id, personality_id)
+            return personality_id
+        self.hits += 1
+        self._users.move_to_end(user_id)
+        return personality_id
+
+    async def user_personality(self, user_id):
+        """Personality pilihan user, None kalau id-nya sudah tidak ada"""
+        return self.by_id.get(await self.user_personality_id(user_id))
+
+    async def set_user_personality(self, user_id, personality_id):
+        await async_db.set_user_personality(user_id, personality_id)
+        self._remember(user_id, personality_id)
+
+    def _remember(self, user_id, personality_id):
+        self._users[user_id] = personality_id
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.user_cache_size:
+            self._users.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "personalities": len(self.by_id),
+            "cached_users": len(self._users),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,156 @@
+"""Rate limit untuk AI chat.
+
+Tiga level token bucket, dicek bersamaan untuk setiap pertanyaan:
+- user: mencegah satu orang spam (default ~1 pertanyaan / 3 detik, burst 3)
+- channel: satu channel yang rame tidak menghabiskan jatah semua channel
+- global: menjaga total request ke Groq tetap di bawah limit API
+
+Token hanya diambil kalau ketiga level mengizinkan. Selain itu ada budget
+token Groq harian per user, diisi dari field `usage` jawaban Groq lewat
+record_usage(); pemakaian di-reset saat ganti hari.
+
+Bucket yang tidak dipakai selama `idle_ttl` detik dibuang. TTL minimal sama
+dengan waktu isi ulang bucket sampai penuh, jadi bucket yang dibuang pasti
+sudah penuh lagi dan membuangnya tidak mengubah hasil rate limit; memori
+hanya sebanding dengan user/channel yang aktif belakangan ini.
+"""
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+Decision = namedtuple("Decision", "allowed scope retry_after")
+
+ALLOWED = Decision(True, None, 0.0)
+
+
+class TokenBucket:
+    """Bucket dengan kapasitas `capacity` yang terisi `rate` token per detik"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now, cost=1):
+        """Detik sampai `cost` token tersedia (0 kalau sudah ada)"""
+        self._refill(now)
+        missing = cost - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, cost=1):
+        self.tokens -= cost
+
+
+class BucketTable:
+    """Token bucket per key (user id / channel id), dibuang setelah idle"""
+
+    def __init__(self, rate, capacity, idle_ttl=0):
+        self.rate = rate
+        self.capacity = capacity
+        refill_time = capacity / rate if rate > 0 else 0
+        self.idle_ttl = max(idle_ttl, refill_time)
+        self._buckets = OrderedDict()   # key -> TokenBucket, urut terakhir dipakai
+        self.evictions = 0
+
+    def get(self, key, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity, now)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def evict(self, now):
+        """Buang bucket yang idle lebih dari idle_ttl (yang paling lama ada di depan)"""
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket.updated < self.idle_ttl:
+                break
+            del self._buckets[key]
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """Bucket user + channel + global dan budget token harian per user.
+
+    rate_* dalam request per menit; daily_token_budget 0 = tanpa batas.
+    day_fn: fungsi yang mengembalikan tanggal hari ini (string), untuk reset budget.
+    """
+
+    def __init__(self, user_rate=20, user_burst=3, channel_rate=60, channel_burst=10,
+                 global_rate=30, global_burst=10, daily_token_budget=0, idle_ttl=600,
+                 day_fn=None, clock=time.monotonic):
+        self.users = BucketTable(user_rate / 60, user_burst, idle_ttl)
+        self.channels = BucketTable(channel_rate / 60, channel_burst, idle_ttl)
+        self.global_bucket = TokenBucket(global_rate / 60, global_burst, clock())
+        self.daily_token_budget = daily_token_budget
+        self._day_fn = day_fn or (lambda: time.strftime("%Y-%m-%d"))
+        self._clock = clock
+        self._day = None
+        self._tokens_used = {}   # user_id -> token Groq hari ini
+        self.denied = Counter()
+
+    def check(self, user_id, channel_id):
+        """Cek dan (kalau boleh) pakai jatah satu pertanyaan AI, return Decision.
+
+        scope yang ditolak: "budget", "user", "channel", atau "global".
+        """
+        now = self._clock()
+        self.users.evict(now)
+        self.channels.evict(now)
+
+        if self.daily_token_budget and self.tokens_used(user_id) >= self.daily_token_budget:
+            self.denied["budget"] += 1
+            return Decision(False, "budget", 0.0)
+
+        buckets = (
+            ("user", self.users.get(user_id, now)),
+            ("channel", self.channels.get(channel_id, now)),
+            ("global", self.global_bucket),
+        )
+        waits = [(bucket.wait_time(now), scope) for scope, bucket in buckets]
+        retry_after, scope = max(waits)
+        if retry_after > 0:
+            self.denied[scope] += 1
+            return Decision(False, scope, retry_after)
+        for _, bucket in buckets:
+            bucket.take()
+        return ALLOWED
+
+    def _roll_day(self):
+        today = self._day_fn()
+        if today != self._day:
+            self._day = today
+            self._tokens_used.clear()
+
+    def tokens_used(self, user_id):
+        """Token Groq yang sudah dipakai user hari ini"""
+        self._roll_day()
+        return self._tokens_used.get(user_id, 0)
+
+    def record_usage(self, user_id, tokens):
+        """Tambahkan pemakaian token Groq (usage.total_tokens) ke budget harian user"""
+        self._roll_day()
+        if tokens:
+            self._tokens_used[user_id] = self._tokens_used.get(user_id, 0) + tokens
+
+    def stats(self):
+        return {
+            "users": len(self.users),
+            "channels": len(self.channels),
+            "budget_users": len(self._tokens_used),
+            "denied": dict(self.denied),
+            "evictions": self.users.evictions + self.channels.evictions,
+        }
@@ -0,0 +1,296 @@
+"""Scheduler reminder berbasis min-heap.
+
+Reminder yang jatuh tempo dalam HORIZON_SECONDS ke depan disimpan di heap
+(remind_at, id). Loop scheduler tidur tepat sampai reminder terdekat, jadi
+saat idle tidak ada query sama sekali dan reminder terkirim < 1 detik dari
+waktunya. Reminder yang lebih jauh dimuat bertahap saat horizon maju, supaya
+memori tetap kecil walaupun ada ratusan ribu reminder di database.
+
+Data reminder (user, pesan) baru diambil dari database saat jatuh tempo, jadi
+reminder yang sudah dihapus (termasuk lewat delete_all_user_reminders) otomatis
+tidak ikut terkirim.
+"""
+import asyncio
+import heapq
+import random
+import time
+from collections import defaultdict
+
+import async_db
+
+# Rentang waktu ke depan yang disimpan di memori
+HORIZON_SECONDS = 6 * 3600
+# Jumlah user yang dikirimi DM bersamaan
+DISPATCH_WORKERS = 8
+# Retry untuk kegagalan sementara (429, 5xx, network)
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 15 * 60
+
+
+class ReminderScheduler:
+    """Heap reminder yang menunggu jatuh tempo.
+
+    dispatch: coroutine function yang menerima list row
+    (id, user_id, message, remind_at) yang sudah jatuh tempo, dan boleh return
+    list (reminder_id, retry_at) untuk reminder yang perlu dicoba lagi.
+    """
+
+    def __init__(self, dispatch, horizon=HORIZON_SECONDS):
+        self._dispatch = dispatch
+        self._horizon = horizon
+        self._heap = []        # (remind_at, reminder_id), entry basi dibuang saat pop
+        self._pending = {}     # reminder_id -> remind_at yang berlaku
+        self._loaded_until = None
+        self._wake = asyncio.Event()
+        self._task = None
+        self._dispatching = set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.is_running():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def add(self, reminder_id, remind_at):
+        """Daftarkan reminder baru (panggil setelah add_reminder)"""
+        if self._loaded_until is None or remind_at > self._loaded_until:
+            # Di luar horizon, nanti dimuat dari database saat refill
+            return
+        self._push(reminder_id, remind_at)
+        if self._heap[0][1] == reminder_id:
+            self._wake.set()
+
+    def reschedule(self, reminder_id, retry_at):
+        """Jadwalkan ulang reminder yang gagal terkirim (row tetap di database)"""
+        self._push(reminder_id, retry_at)
+        if self._heap[0][1] == reminder_id:
+            self._wake.set()
+
+    def discard(self, reminder_id):
+        """Lupakan reminder yang sudah dihapus dari database"""
+        self._pending.pop(reminder_id, None)
+
+    def next_due(self):
+        """remind_at terdekat yang masih berlaku, atau None"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def _push(self, reminder_id, remind_at):
+        if self._pending.get(reminder_id) == remind_at:
+            return
+        self._pending[reminder_id] = remind_at
+        heapq.heappush(self._heap, (remind_at, reminder_id))
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and self._pending.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _pop_due(self, now):
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            remind_at, reminder_id = heapq.heappop(heap)
+            if self._pending.get(reminder_id) == remind_at:
+                del self._pending[reminder_id]
+                due.append((remind_at, reminder_id))
+        return due
+
+    async def _refill(self):
+        after = self._loaded_until
+        until = int(time.time()) + self._horizon
+        # Set dulu sebelum query: reminder yang ditambah selama query tetap masuk
+        # lewat add(), duplikat dengan hasil query diabaikan oleh _push()
+        self._loaded_until = until
+        try:
+            rows = await async_db.get_pending_reminders(until, after)
+        except Exception:
+            self._loaded_until = after
+            raise
+        for reminder_id, remind_at in rows:
+            self._push(reminder_id, remind_at)
+        print(f"[REMINDER] {len(rows)} reminder dimuat, {len(self._pending)} menunggu")
+
+    async def _dispatch_rows(self, rows):
+        try:
+            retries = await self._dispatch(rows)
+        except Exception as e:
+            # Row masih ada di database, coba lagi nanti daripada hilang
+            print(f"[REMINDER ERROR] Dispatch gagal: {e}")
+            retries = [(row[0], time.time() + RETRY_BASE_SECONDS) for row in rows]
+        for reminder_id, retry_at in retries or ():
+            self.reschedule(reminder_id, retry_at)
+
+    async def _run(self):
+        while True:
+            try:
+                if self._loaded_until is None or time.time() >= self._loaded_until:
+                    await self._refill()
+
+                self._wake.clear()
+                self._drop_stale()
+                next_at = self._heap[0][0] if self._heap else self._loaded_until
+                delay = min(next_at, self._loaded_until) - time.time()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                due = self._pop_due(time.time())
+                if due:
+                    try:
+                        rows = await async_db.get_reminders_by_ids([reminder_id for _, reminder_id in due])
+                    except Exception:
+                        # Kembalikan ke heap, dicoba lagi di putaran berikutnya
+                        for remind_at, reminder_id in due:
+                            self._push(reminder_id, remind_at)
+                        raise
+                    if rows:
+                        task = asyncio.create_task(self._dispatch_rows(rows))
+                        self._dispatching.add(task)
+                        task.add_done_callback(self._dispatching.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[REMINDER ERROR] {e}")
+                await asyncio.sleep(1)
+
+
+class PermanentDeliveryError(Exception):
+    """Reminder tidak mungkin terkirim (DM tertutup, user tidak ada)"""
+
+
+class TransientDeliveryError(Exception):
+    """Gagal sementara (429, 5xx, network), boleh dicoba lagi.
+
+    retry_after: detik yang diminta Discord sebelum mencoba lagi (kalau ada)
+    is_global: True kalau rate limit berlaku untuk semua request bot
+    """
+
+    def __init__(self, message, retry_after=None, is_global=False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.is_global = is_global
+
+
+class ReminderDispatcher:
+    """Kirim reminder jatuh tempo ke banyak user secara paralel.
+
+    Reminder milik user yang sama digabung jadi satu DM dan maksimal `workers`
+    user diproses bersamaan. Hasilnya:
+    - terkirim: dihapus dalam satu transaksi
+    - PermanentDeliveryError: langsung dipindah ke reminder_dead_letters
+    - TransientDeliveryError / error lain: dicoba lagi dengan exponential backoff
+      (mengikuti retry_after dari Discord), setelah max_attempts masuk dead letter
+
+    Selama rate limit aktif, semua worker menunggu dulu supaya tidak membanjiri
+    REST API.
+
+    deliver: coroutine function deliver(user_id, items) dengan items berupa list
+    (reminder_id, message, remind_at) milik user tersebut.
+    report: coroutine function opsional report(kind, user_id, items, error) untuk
+    logging, kind = 'retry' atau 'dead_letter'.
+    """
+
+    def __init__(self, deliver, workers=DISPATCH_WORKERS, report=None,
+                 max_attempts=MAX_ATTEMPTS, base_delay=RETRY_BASE_SECONDS,
+                 max_delay=RETRY_MAX_SECONDS):
+        self._deliver = deliver
+        self._report = report
+        self._slots = asyncio.Semaphore(workers)
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._attempts = {}       # reminder_id -> jumlah gagal sementara
+        self._paused_until = 0.0  # rate limit global
+
+    async def __call__(self, rows):
+        """Proses rows, return list (reminder_id, retry_at) yang perlu dijadwal ulang"""
+        by_user = defaultdict(list)
+        for reminder_id, user_id, message, remind_at in rows:
+            by_user[user_id].append((reminder_id, message, remind_at))
+
+        outcomes = await asyncio.gather(*(
+            self._deliver_one(user_id, items) for user_id, items in by_user.items()
+        ))
+
+        delivered, dead, retries = [], [], []
+        for (user_id, items), error in zip(by_user.items(), outcomes):
+            ids = [reminder_id for reminder_id, _, _ in items]
+            if error is None:
+                delivered.extend(ids)
+            elif isinstance(error, PermanentDeliveryError):
+                dead.extend((reminder_id, self._attempts.get(reminder_id, 0) + 1, str(error)) for reminder_id in ids)
+            else:
+                attempt = max(self._attempts.get(reminder_id, 0) for reminder_id in ids) + 1
+                if attempt >= self._max_attempts:
+                    dead.extend((reminder_id, attempt, f"{type(error).__name__}: {error}") for reminder_id in ids)
+                else:
+                    retry_at = time.time() + self._backoff(attempt, error)
+                    for reminder_id in ids:
+                        self._attempts[reminder_id] = attempt
+                        retries.append((reminder_id, retry_at))
+                    await self._notify("retry", user_id, items, error)
+                    continue
+            if error is not None:
+                await self._notify("dead_letter", user_id, items, error)
+            for reminder_id in ids:
+                self._attempts.pop(reminder_id, None)
+
+        writes = []
+        if delivered:
+            writes.append(async_db.delete_reminders(delivered))
+        if dead:
+            writes.append(async_db.dead_letter_reminders(dead))
+        await asyncio.gather(*writes)
+        return retries
+
+    def _backoff(self, attempt, error):
+        delay = min(self._max_delay, self._base_delay * 2 ** (attempt - 1))
+        delay *= random.uniform(0.8, 1.2)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def _deliver_one(self, user_id, items):
+        async with self._slots:
+            wait = self._paused_until - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                await self._deliver(user_id, items)
+            except PermanentDeliveryError as e:
+                return e
+            except TransientDeliveryError as e:
+                if e.is_global and e.retry_after:
+                    self._paused_until = max(self._paused_until, time.time() + e.retry_after)
+                return e
+            except Exception as e:
+                print(f"[REMINDER ERROR] Gagal kirim ke {user_id}: {e}")
+                return e
+            return None
+
+    async def _notify(self, kind, user_id, items, error):
+        if self._report is None:
+            return
+        try:
+            await self._report(kind, user_id, items, error)
+        except Exception as e:
+            print(f"[REMINDER ERROR] Gagal report {kind}: {e}")
@@ -0,0 +1,124 @@
+"""Routing intent untuk pesan teks (on_message).
+
+Setiap intent didaftarkan dengan nama, prioritas (angka kecil dicek duluan),
+dan handler. Ada dua jenis intent:
+- anchored: `pattern` harus cocok dari awal pesan ("jadwal senin", "help")
+- keyword: aktif kalau salah satu `keywords` muncul di mana saja di pesan
+  ("ingatkan aku dalam 5 menit ..."); `pattern` (opsional) lalu di-search
+
+Per pesan router hanya melakukan satu scan keyword gabungan
+`\\b(?:ingatkan|hapus|jam|...)\\b` dan satu match regex anchored gabungan
+`(?P<r0>...)|(?P<r1>...)|...` (urutan alternation = prioritas). Pesan yang
+tidak cocok dengan intent apa pun (kebanyakan chat AI) berhenti di situ.
+Keduanya jalan di teks lowercase, jadi pattern ditulis lowercase; group
+diambil dari teks asli lewat regex milik intent (IGNORECASE).
+
+Pattern hanya boleh memakai group bernomor (named group dipakai router untuk
+menandai intent). Kalau intent punya `parse` dan hasilnya None (mis. keyword
+"reminder" ada tapi durasinya tidak), router lanjut ke intent berikutnya.
+"""
+import re
+import time
+from collections import Counter, namedtuple
+
+Route = namedtuple("Route", "name priority regex keywords parse handler")
+
+FALLBACK = "ai_chat"
+
+
+class IntentRouter:
+    """Tabel intent berprioritas dengan dispatch satu pass"""
+
+    def __init__(self, observe=None):
+        # observe(nama_intent, detik) dipanggil setelah handler selesai (untuk metrics)
+        self.observe = observe
+        self.routes = []
+        self.hits = Counter()
+        self._anchored = None   # index route -> regex gabungan anchored mulai route itu
+        self._gate = None
+        self._first_anchored = None
+
+    def route(self, name, priority, pattern=None, keywords=(), parse=None):
+        """Decorator untuk mendaftarkan handler `async def handler(message, text, args)`.
+
+        args = hasil parse(match, text) kalau parse diisi, selain itu match object.
+        Handler yang sama boleh didaftarkan lebih dari sekali (decorator ditumpuk).
+        """
+        keywords = tuple(keywords)
+        if pattern is None:
+            pattern = r"\b(?:" + "|".join(map(re.escape, keywords)) + r")\b"
+        regex = re.compile(pattern, re.IGNORECASE)
+
+        def decorator(handler):
+            self.routes.append(Route(name, priority, regex, frozenset(keywords), parse, handler))
+            self.routes.sort(key=lambda r: r.priority)
+            self._anchored = None
+            return handler
+        return decorator
+
+    def _compile(self):
+        words = sorted({w for route in self.routes for w in route.keywords}, key=len, reverse=True)
+        self._gate = re.compile(r"\b(" + "|".join(map(re.escape, words)) + r")\b") if words else None
+        anchored = [(i, route) for i, route in enumerate(self.routes) if not route.keywords]
+        self._anchored = {}
+        for k, (i, _) in enumerate(anchored):
+            self._anchored[i] = re.compile("|".join(
+                f"(?P<r{j}>{route.regex.pattern})" for j, route in anchored[k:]
+            ))
+        self._first_anchored = anchored[0][0] if anchored else None
+
+    def _next_anchored(self, lowered, start):
+        """Index route anchored pertama mulai `start` yang cocok, atau None"""
+        while start is not None and start < len(self.routes):
+            combined = self._anchored.get(start)
+            if combined is not None:
+                found = combined.match(lowered)
+                return int(found.lastgroup[1:]) if found else None
+            start += 1
+        return None
+
+    def resolve(self, text):
+        """Cari intent untuk `text`, return (route, args) atau (None, None)"""
+        if self._anchored is None:
+            self._compile()
+        lowered = text.lower()
+        found = set(self._gate.findall(lowered)) if self._gate else set()
+        anchored = self._next_anchored(lowered, self._first_anchored)
+        if not found and anchored is None:
+            return None, None
+
+        for index, route in enumerate(self.routes):
+            if route.keywords:
+                if found.isdisjoint(route.keywords):
+                    continue
+                match = route.regex.search(text)
+            elif index == anchored:
+                match = route.regex.match(text)
+            else:
+                continue
+            if match:
+                args = route.parse(match, text) if route.parse else match
+                if args is not None:
+                    return route, args
+            if index == anchored:
+                anchored = self._next_anchored(lowered, index + 1)
+        return None, None
+
+    async def dispatch(self, message, text):
+        """Jalankan handler intent yang cocok. Return False kalau tidak ada (lanjut ke AI)"""
+        route, args = self.resolve(text)
+        if route is None:
+            self.hits[FALLBACK] += 1
+            return False
+        self.hits[route.name] += 1
+        started = time.perf_counter()
+        try:
+            await route.handler(message, text, args)
+        finally:
+            if self.observe is not None:
+                self.observe(route.name, time.perf_counter() - started)
+        return True
+
+    def stats(self):
+        """Jumlah pesan per intent, terbanyak dulu"""
+        return self.hits.most_common()
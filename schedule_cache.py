@@ -0,0 +1,103 @@
+"""Cache jadwal kuliah di memori.
+
+Tabel schedule jarang berubah tapi dibaca terus (command `jadwal`, AI chat,
+announcement). ScheduleCache menyimpan semua baris jadwal per hari dan hanya
+memuat ulang dari database saat database.schedule_version() berubah
+(add_schedule, remove_schedule, clear_schedule, delete_schedule_by_subject).
+Hasil render (teks per hari, teks seminggu, embed, dll) juga di-cache dan
+otomatis dibuang saat versi berubah.
+"""
+import asyncio
+from collections import defaultdict
+
+import async_db
+import database
+
+INDO_TO_ENG = {
+    "Senin": "monday",
+    "Selasa": "tuesday",
+    "Rabu": "wednesday",
+    "Kamis": "thursday",
+    "Jumat": "friday",
+    "Sabtu": "saturday",
+    "Minggu": "sunday",
+}
+ENG_TO_INDO = {eng: indo for indo, eng in INDO_TO_ENG.items()}
+DAY_ORDER = list(INDO_TO_ENG.values())
+
+# Batas jumlah hasil render yang disimpan per versi (kunci search bisa banyak)
+MAX_RENDERED = 256
+
+
+class ScheduleCache:
+    """Snapshot tabel schedule + hasil render, di-invalidate oleh versi data"""
+
+    def __init__(self):
+        self.version = None
+        self.rows = []                    # (day_eng, time, subject) urut Senin..Minggu
+        self.by_day = {}                  # day_eng -> [(time, subject)], urut Senin..Minggu
+        self._rendered = {}
+        self._lock = asyncio.Lock()
+
+    async def refresh(self):
+        """Muat ulang dari database kalau versi berubah, return self"""
+        if self.version == database.schedule_version():
+            return self
+        async with self._lock:
+            # Baca versi SEBELUM query: kalau ada write selama query, versi yang
+            # disimpan lebih lama dan request berikutnya memuat ulang lagi
+            version = database.schedule_version()
+            if version != self.version:
+                rows = await async_db.get_all_schedules()
+                self._load(rows)
+                self.version = version
+        return self
+
+    def _load(self, rows):
+        by_day = defaultdict(list)
+        for day_eng, time_val, subject in rows:
+            by_day[day_eng].append((time_val, subject))
+        for entries in by_day.values():
+            entries.sort()
+        order = {day: i for i, day in enumerate(DAY_ORDER)}
+        self.by_day = {
+            day_eng: by_day[day_eng]
+            for day_eng in sorted(by_day, key=lambda d: order.get(d, len(order)))
+        }
+        self.rows = [
+            (day_eng, time_val, subject)
+            for day_eng, entries in self.by_day.items()
+            for time_val, subject in entries
+        ]
+        self._rendered = {}
+
+    def day(self, day_eng):
+        """Jadwal satu hari: [(time, subject)]"""
+        return self.by_day.get(day_eng, [])
+
+    async def search(self, keyword):
+        """Cari jadwal by nama mata kuliah lewat index FTS di database
+        (substring + fuzzy, lihat database.search_schedule_by_subject).
+
+        Hasil disimpan bersama hasil render, jadi ikut dibuang saat versi berubah.
+        """
+        await self.refresh()
+        version = self.version
+        key = ("search_rows", " ".join(keyword.lower().split()))
+        rows = self._rendered.get(key)
+        if rows is None:
+            rows = await async_db.search_schedule_by_subject(keyword)
+            if self.version == version:
+                self.render(key, lambda: rows)
+        return rows
+
+    def render(self, key, builder):
+        """Ambil hasil render `key` dari cache, atau build dan simpan"""
+        try:
+            return self._rendered[key]
+        except KeyError:
+            pass
+        if len(self._rendered) >= MAX_RENDERED:
+            self._rendered.clear()
+        value = self._rendered[key] = builder()
+        return value
@@ -0,0 +1,115 @@
+"""Filter kata kunci data sensitif (password, PIN, OTP, ...).
+
+Semua keyword dikompilasi sekali jadi satu regex berbentuk trie
+(`p(?:ass(?:word)?|in|wd)|...`), jadi satu kali scan teks menemukan semua
+keyword sekaligus dan biayanya hampir tidak bertambah walaupun keyword-nya
+ribuan. Hit hanya dihitung kalau keyword berdiri sebagai kata sendiri: "pin"
+cocok di "pin atm" atau "pinnya" (akhiran -nya/-ku/-mu), tapi tidak di
+"pindah"; "pass" tidak cocok di "passing".
+
+Keyword default ada di DEFAULT_KEYWORDS; admin bisa menambah keyword lewat
+/issensitive (disimpan di tabel sensitive_keywords).
+"""
+import re
+
+DEFAULT_KEYWORDS = [
+    "password", "pwd", "pass", "kata sandi", "sandi",
+    "pin", "ktp", "nik", "npwp", "rekening", "kartu kredit",
+    "credit card", "cvv", "otp", "token api", "api key",
+    "secret", "private key", "kunci"
+]
+
+# Akhiran yang boleh menempel di keyword ("passwordnya", "pinku")
+SUFFIXES = ("nya", "ku", "mu", "lah", "kah")
+
+_SPACES = re.compile(r"\s+")
+# Tanda ada nilai rahasia setelah keyword: "pin: 1234", "otp aku 889012"
+_VALUE_HINT = re.compile(r"[:=]\s*\S|\d{4,}")
+VALUE_WINDOW = 30
+
+
+def normalize(text):
+    return _SPACES.sub(" ", text.lower())
+
+
+class KeywordMatcher:
+    """Matcher banyak keyword sekaligus (trie yang dikompilasi jadi satu regex)"""
+
+    def __init__(self, keywords):
+        self.keywords = sorted({normalize(k).strip() for k in keywords if k and k.strip()})
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        suffixes = "|".join(SUFFIXES)
+        self._regex = re.compile(
+            # Tidak didahului huruf, dan setelahnya bukan huruf (boleh akhiran -nya/-ku/...)
+            rf"(?<![^\W\d_])({_trie_pattern(trie)})(?=(?:{suffixes})?(?![^\W\d_]))"
+        ) if self.keywords else None
+
+    def finditer(self, text):
+        """Yield (start, end, keyword) untuk setiap keyword utuh di `text` (sudah dinormalisasi)"""
+        if self._regex is None:
+            return
+        for match in self._regex.finditer(text):
+            yield match.start(), match.end(), match.group(1)
+
+
+def _trie_pattern(node):
+    """Regex dari node trie; keyword yang lebih panjang dicoba duluan"""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+class SensitiveFilter:
+    """Keyword default + keyword tambahan admin, dikompilasi ulang saat berubah"""
+
+    def __init__(self, defaults=DEFAULT_KEYWORDS):
+        self.defaults = list(defaults)
+        self.custom = set()
+        self._matcher = KeywordMatcher(self.defaults)
+
+    def load(self, custom_keywords):
+        """Ganti daftar keyword tambahan (dari database)"""
+        self.custom = {normalize(k).strip() for k in custom_keywords}
+        self._rebuild()
+
+    def add(self, keyword):
+        self.custom.add(normalize(keyword).strip())
+        self._rebuild()
+
+    def remove(self, keyword):
+        self.custom.discard(normalize(keyword).strip())
+        self._rebuild()
+
+    def _rebuild(self):
+        self._matcher = KeywordMatcher(self.defaults + sorted(self.custom))
+
+    @property
+    def keywords(self):
+        return self._matcher.keywords
+
+    def find_all(self, text):
+        """Semua keyword sensitif di `text`, urut kemunculan (tanpa duplikat)"""
+        hits = []
+        for _, _, keyword in self._matcher.finditer(normalize(text)):
+            if keyword not in hits:
+                hits.append(keyword)
+        return hits
+
+    def find_secrets(self, text):
+        """Keyword yang diikuti sesuatu yang mirip nilai rahasia ("pin: 1234", "otp 889012").
+
+        Dipakai untuk chat AI: pertanyaan seperti "apa itu OTP?" tidak ikut diblok.
+        """
+        normalized = normalize(text)
+        hits = []
+        for _, end, keyword in self._matcher.finditer(normalized):
+            if keyword not in hits and _VALUE_HINT.search(normalized, end, end + VALUE_WINDOW):
+                hits.append(keyword)
+        return hits